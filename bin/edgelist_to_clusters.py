@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # Source: https://github.com/jolespin/veba
 
-import sys, os, argparse, gzip, pickle, hashlib
+import sys, os, argparse, gzip, pickle, hashlib, json, threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from collections import defaultdict
 import numpy as np
 import pandas as pd
@@ -11,19 +12,355 @@ from tqdm import tqdm
 __program__ = os.path.split(sys.argv[0])[-1]
 __version__ = "2024.11.8"
 
-def generate_unique_cluster_base_label(nodes:set, mode:str, index:int, cluster_prefix_zfill:int):
+FASTA_BUFFER_SIZE = 8*1024*1024
+
+def generate_cluster_labels(node_ids, labels, n_clusters:int, mode:str, cluster_prefix:str="", cluster_suffix:str="", cluster_prefix_zfill:int=0, start:int=1):
+    """
+    Generate cluster labels in bulk from component labels.
+
+    Cluster i (0-indexed component label) is assigned index i + start for numeric and pseudo-random labels.
+    md5 and nodes labels are computed from the sorted node identifiers of each cluster.
+    """
     ALPHANUMERIC=list("1234567890abcdefghijklmnopqrstuvwxyz")
     # {"numeric", "md5", "pseudo-random", "random"}
+    index = np.arange(start, start + n_clusters)
     if mode == "numeric":
-        return str(index).zfill(cluster_prefix_zfill)
-    elif mode == "nodes":
-        return "|".join(sorted(nodes))
-    elif mode == "md5":
-        return hashlib.md5(str(sorted(nodes)).encode()).hexdigest()
+        base_labels = pd.Index(index).astype(str).str.zfill(cluster_prefix_zfill)
+    elif mode in {"md5", "nodes"}:
+        groups = get_sorted_cluster_members(node_ids, labels, n_clusters)
+        if mode == "md5":
+            base_labels = [hashlib.md5(str(group.tolist()).encode()).hexdigest() for group in groups]
+        else:
+            base_labels = ["|".join(group.tolist()) for group in groups]
     elif mode == "pseudo-random":
-        return "".join(np.random.RandomState(seed=index).choice(ALPHANUMERIC, 32))
+        base_labels = ["".join(np.random.RandomState(seed=i).choice(ALPHANUMERIC, 32)) for i in index]
     elif mode == "random":
-        return "".join(np.random.choice(ALPHANUMERIC, 32))
+        base_labels = np.ascontiguousarray(np.random.choice(ALPHANUMERIC, (n_clusters, 32))).view("<U32").ravel()
+
+    return (cluster_prefix + pd.Index(base_labels, dtype=object) + cluster_suffix).values.astype(object)
+
+def get_cluster_membership(node_ids, labels, n_clusters:int):
+    """
+    Get cluster membership in CSR form (grouped by component labels with one sort).
+
+    Node codes of cluster k are `indices[indptr[k]:indptr[k+1]]` sorted by node identifier.
+    """
+    clustered_nodes = np.flatnonzero(labels >= 0)
+    names = np.asarray(node_ids[clustered_nodes], dtype=object)
+    name_rank = np.empty(names.size, dtype=np.int64)
+    name_rank[np.argsort(names, kind="stable")] = np.arange(names.size)
+    order = np.lexsort((name_rank, labels[clustered_nodes]))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(labels[clustered_nodes], minlength=n_clusters))])
+    return indptr, clustered_nodes[order]
+
+def get_sorted_cluster_members(node_ids, labels, n_clusters:int):
+    """
+    Get the sorted node identifiers for each cluster.
+    """
+    indptr, indices = get_cluster_membership(node_ids, labels, n_clusters)
+    return np.split(np.asarray(node_ids[indices], dtype=object), indptr[1:-1])
+
+def write_cluster_export(filepath, node_ids, export_nodes, labels, cluster_ids, source, target, attributes:dict, connectivity, is_representative, metadata:dict):
+    """
+    Write a compact columnar export of the graph and clusters to a compressed .npz archive.
+
+    Nodes are int-coded by their position in `nodes` (same order as the clusters table) and
+    all arrays can be loaded without pickle (`np.load(filepath, allow_pickle=False)`):
+
+        nodes: node identifiers
+        labels: cluster code of each node
+        clusters: cluster identifiers
+        cluster_indptr, cluster_indices: CSR membership where the node codes of cluster k are
+            cluster_indices[cluster_indptr[k]:cluster_indptr[k+1]] (sorted by node identifier)
+        source, target: node codes of each (deduplicated, undirected) edge
+        edge_[attribute]: edge attributes (e.g., edge_weight)
+        intra-cluster_connectivity: weighted degree of each node (NaN for singleton clusters)
+        representative: representative mask
+        metadata: JSON string with the parameters used for clustering
+
+    Use `nichespace.utils.read_cluster_export` to load the export and rebuild networkx or igraph graphs.
+    """
+    n_nodes = len(node_ids)
+    node_to_position = np.full(n_nodes, -1, dtype=np.int64)
+    node_to_position[export_nodes] = np.arange(export_nodes.size)
+    dtype_position = np.int32 if export_nodes.size < np.iinfo(np.int32).max else np.int64
+
+    export_labels = np.full(n_nodes, -1, dtype=np.int64)
+    export_labels[export_nodes] = labels[export_nodes]
+    cluster_indptr, cluster_indices = get_cluster_membership(node_ids, export_labels, len(cluster_ids))
+
+    arrays = {
+        "nodes":np.asarray(node_ids[export_nodes], dtype=str),
+        "labels":labels[export_nodes].astype(dtype_position),
+        "clusters":np.asarray(cluster_ids, dtype=str),
+        "cluster_indptr":cluster_indptr.astype(np.int64),
+        "cluster_indices":node_to_position[cluster_indices].astype(dtype_position),
+        "source":node_to_position[source].astype(dtype_position),
+        "target":node_to_position[target].astype(dtype_position),
+        "intra-cluster_connectivity":connectivity[export_nodes],
+        "representative":is_representative[export_nodes],
+        "metadata":np.asarray(json.dumps(metadata)),
+    }
+    for name, values in attributes.items():
+        arrays["edge_{}".format(name)] = values
+    np.savez_compressed(filepath, **arrays)
+
+def get_basename(x):
+    _, fn = os.path.split(x)
+    if fn.endswith(".gz"):
+        fn = fn[:-3]
+    return ".".join(fn.split(".")[:-1])
+
+def get_edge_attribute_names(n_columns:int):
+    return {
+        2:["weight"],
+        3:["weight"],
+        4:["weight", "weight2"],
+        5:["weight", "alignment_fraction_reference", "alignment_fraction_query"],
+    }[n_columns]
+
+def read_edgelist(
+    filepath_or_buffer, 
+    identifiers:list=None, 
+    threshold:float=0.0, 
+    threshold2:float=0.0, 
+    minimum_af:float=0.0, 
+    af_mode:str="relaxed", 
+    basename:bool=False, 
+    chunksize:int=1000000,
+    usecols:list=None,
+    skiprows:int=0,
+    known_nodes:list=None,
+    ):
+    """
+    Read an edge list in chunks and filter edges with vectorized masks.
+
+    `usecols` (0-indexed, in the order of the file) and `skiprows` select columns and skip header lines
+    (e.g., `usecols=[0,1,2,3,4], skiprows=1` is equivalent to `cut -f1-5 | tail -n +2`).
+
+    `known_nodes` (e.g., nodes of a previous clustering) are coded first, followed by `identifiers`, and are always allowed.
+
+    Node identifiers are integer-coded by their position in `nodes`.  If `identifiers` are provided, they
+    are the first codes in `nodes` and edges are only kept if both nodes are in `identifiers`.
+
+    Returns
+    -------
+    dict
+        nodes: pd.Index of node identifiers
+        n_allowed: number of nodes (first codes) allowed in the graph
+        edgelist_nodes: np.ndarray[bool] mask of nodes in the edge list (before filtering)
+        source, target: np.ndarray[int32] node codes of filtered edges
+        attributes: dict of edge attribute name -> np.ndarray[float] for filtered edges
+        n_columns: number of columns in the edge list
+    """
+    nodes = pd.Index(pd.unique(pd.Series(list(known_nodes if known_nodes is not None else []) + list(identifiers if identifiers is not None else []), dtype=object)), dtype=object)
+    restrict_identifiers = identifiers is not None
+    n_allowed = len(nodes)
+
+    n_columns = None
+    edgelist_node_codes = list()
+    sources = list()
+    targets = list()
+    attributes = defaultdict(list)
+
+    try:
+        id_columns = sorted(usecols)[:2] if usecols is not None else [0, 1]
+        chunks = pd.read_csv(filepath_or_buffer, sep="\t", header=None, usecols=usecols, skiprows=skiprows, dtype={id_columns[0]:str, id_columns[1]:str}, chunksize=chunksize)
+        for df_chunk in tqdm(chunks, "Reading edgelist in chunks of {} edges".format(chunksize), unit=" chunks"):
+            df_chunk.columns = range(df_chunk.shape[1])
+            if n_columns is None:
+                n_columns = df_chunk.shape[1]
+                assert n_columns in  {2,3,4,5}, "Must have 2, 3, 4, or 5 columns.  {} provided.".format(n_columns)
+
+            # Integer-code identifiers
+            local_codes, uniques = pd.factorize(np.concatenate([df_chunk[0].values, df_chunk[1].values]))
+            uniques = pd.Index(uniques)
+            if basename:
+                uniques = uniques.map(get_basename)
+            new_nodes = uniques[nodes.get_indexer(uniques) == -1].unique()
+            if len(new_nodes):
+                nodes = nodes.append(new_nodes)
+            codes = nodes.get_indexer(uniques).astype(np.int32)[local_codes]
+            source, target = codes[:df_chunk.shape[0]], codes[df_chunk.shape[0]:]
+            edgelist_node_codes.append(np.unique(codes))
+
+            # Filter
+            mask = np.ones(df_chunk.shape[0], dtype=bool)
+            if restrict_identifiers:
+                mask &= (source < n_allowed) & (target < n_allowed)
+            if n_columns >= 3:
+                mask &= df_chunk[2].values >= threshold
+            if n_columns == 4:
+                mask &= df_chunk[3].values >= threshold2
+            if n_columns == 5:
+                af_ref, af_query = df_chunk[3].values, df_chunk[4].values
+                if af_mode == "relaxed":
+                    mask &= np.maximum(af_ref, af_query) >= minimum_af
+                if af_mode == "strict":
+                    mask &= (af_ref >= minimum_af) & (af_query >= minimum_af)
+
+            sources.append(source[mask])
+            targets.append(target[mask])
+            for j, name in enumerate(get_edge_attribute_names(n_columns), start=2):
+                attributes[name].append(df_chunk[j].values[mask].astype(float) if j < n_columns else np.ones(mask.sum()))
+
+    except pd.errors.EmptyDataError:
+        pass
+
+    is_empty = n_columns is None
+    if is_empty:
+        n_columns = 2
+    if not restrict_identifiers:
+        n_allowed = len(nodes)
+
+    edgelist_nodes = np.zeros(len(nodes), dtype=bool)
+    for node_codes in edgelist_node_codes:
+        edgelist_nodes[node_codes] = True
+
+    return {
+        "nodes":nodes,
+        "n_allowed":n_allowed,
+        "edgelist_nodes":edgelist_nodes,
+        "source":np.concatenate(sources) if sources else np.zeros(0, dtype=np.int32),
+        "target":np.concatenate(targets) if targets else np.zeros(0, dtype=np.int32),
+        "attributes":{name:(np.concatenate(attributes[name]) if attributes[name] else np.zeros(0)) for name in get_edge_attribute_names(n_columns)},
+        "n_columns":n_columns,
+        "is_empty":is_empty,
+    }
+
+def deduplicate_undirected_edges(source, target, attributes:dict, n_nodes:int):
+    """
+    Keep the last occurrence of each undirected edge (same behavior as updating edges in nx.Graph).
+    """
+    keys = np.minimum(source, target).astype(np.int64) * n_nodes + np.maximum(source, target)
+    _, index_reversed = np.unique(keys[::-1], return_index=True)
+    index = np.sort(keys.size - 1 - index_reversed)
+    return source[index], target[index], {name:values[index] for name, values in attributes.items()}
+
+def get_connected_components(n_nodes:int, source, target, in_graph, node_order):
+    """
+    Compute connected components with scipy.sparse.csgraph on integer-coded edges.
+
+    Components are labeled 0..n_clusters-1 sorted by size (descending) then by first appearance (node_order).
+    Nodes that are not in the graph are labeled -1.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    adjacency = coo_matrix((np.ones(source.size, dtype=np.int8), (source, target)), shape=(n_nodes, n_nodes)).tocsr()
+    _, components = connected_components(adjacency, directed=False)
+    return relabel_components(components, in_graph=in_graph, node_order=node_order)
+
+def relabel_components(components, in_graph, node_order):
+    """
+    Relabel component assignments of nodes to 0..n_clusters-1 sorted by size (descending) then by first appearance (node_order).
+    Nodes that are not in the graph are labeled -1.
+    """
+    n_nodes = components.size
+    graph_nodes = np.flatnonzero(in_graph)
+    components, graph_components = np.unique(components[graph_nodes], return_inverse=True)
+    n_clusters = components.size
+    sizes = np.bincount(graph_components, minlength=n_clusters)
+    first_appearance = np.full(n_clusters, np.iinfo(np.int64).max)
+    np.minimum.at(first_appearance, graph_components, node_order[graph_nodes])
+    cluster_order = np.lexsort((first_appearance, -sizes))
+    relabel = np.empty(n_clusters, dtype=np.int64)
+    relabel[cluster_order] = np.arange(n_clusters)
+
+    labels = np.full(n_nodes, -1, dtype=np.int64)
+    labels[graph_nodes] = relabel[graph_components]
+    return labels, n_clusters
+
+def get_incremental_components(n_nodes:int, previous_labels, n_previous_clusters:int, source, target, in_graph, node_order):
+    """
+    Merge previous clusters with new edges by contracting each previous cluster into a single node.
+
+    Nodes 0..n_previous-1 are the nodes of the previous clustering (with `previous_labels`) and the remaining
+    nodes are new.  Only the new edges need to be provided because the previous clusters are already connected.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n_previous = previous_labels.size
+    contracted = np.arange(n_nodes, dtype=np.int64) - n_previous + n_previous_clusters
+    contracted[:n_previous] = previous_labels
+    n_contracted = n_previous_clusters + n_nodes - n_previous
+    adjacency = coo_matrix((np.ones(source.size, dtype=np.int8), (contracted[source], contracted[target])), shape=(n_contracted, n_contracted)).tocsr()
+    _, contracted_components = connected_components(adjacency, directed=False)
+    return relabel_components(contracted_components[contracted], in_graph=in_graph, node_order=node_order)
+
+def get_incremental_cluster_labels(previous, node_ids, labels, n_clusters:int, mode:str, cluster_prefix:str="", cluster_suffix:str="", cluster_prefix_zfill:int=0):
+    """
+    Assign cluster labels after an incremental update and classify each cluster as unchanged, grown, merged, or created.
+
+    Unchanged clusters keep their previous label.  For content-based labels (md5 and nodes), labels of changed clusters
+    are recomputed from their membership.  Otherwise, grown and merged clusters keep the label of their largest previous
+    cluster and created clusters are labeled starting from the previous `next_cluster_index`.
+
+    Returns
+    -------
+    cluster_ids, pd.DataFrame report of changed clusters, next_cluster_index
+    """
+    previous_labels = previous["labels"].astype(np.int64)
+    previous_ids = previous["clusters"].astype(object)
+    n_previous = previous_labels.size
+    n_previous_clusters = previous_ids.size
+    next_cluster_index = previous.metadata_.get("next_cluster_index", n_previous_clusters + 1)
+
+    # Map previous clusters to the updated clusters
+    previous_to_updated = np.empty(n_previous_clusters, dtype=np.int64)
+    previous_to_updated[previous_labels] = labels[:n_previous]
+    number_of_previous_clusters = np.bincount(previous_to_updated, minlength=n_clusters)
+    new_nodes = np.flatnonzero(labels[n_previous:] >= 0) + n_previous
+    number_of_new_nodes = np.bincount(labels[new_nodes], minlength=n_clusters)
+    status = np.where(number_of_previous_clusters == 0, "created", np.where(number_of_previous_clusters > 1, "merged", np.where(number_of_new_nodes > 0, "grown", "unchanged"))).astype(object)
+
+    # Largest previous cluster (ties broken by previous order)
+    previous_sizes = np.diff(previous["cluster_indptr"])
+    order = np.lexsort((np.arange(n_previous_clusters), -previous_sizes, previous_to_updated))
+    updated_clusters, first_index = np.unique(previous_to_updated[order], return_index=True)
+    largest_previous = np.full(n_clusters, -1, dtype=np.int64)
+    largest_previous[updated_clusters] = order[first_index]
+
+    cluster_ids = np.empty(n_clusters, dtype=object)
+    is_unchanged = status == "unchanged"
+    cluster_ids[is_unchanged] = previous_ids[largest_previous[is_unchanged]]
+    if mode in {"md5", "nodes"}:
+        relabel_clusters = np.flatnonzero(~is_unchanged)
+    else:
+        is_inherited = (status == "grown") | (status == "merged")
+        cluster_ids[is_inherited] = previous_ids[largest_previous[is_inherited]]
+        relabel_clusters = np.flatnonzero(status == "created")
+
+    if relabel_clusters.size:
+        # Last entry keeps unclustered nodes (-1) as -1
+        relabel = np.full(n_clusters + 1, -1, dtype=np.int64)
+        relabel[relabel_clusters] = np.arange(relabel_clusters.size)
+        cluster_ids[relabel_clusters] = generate_cluster_labels(
+            node_ids, 
+            relabel[labels], 
+            relabel_clusters.size, 
+            mode=mode, 
+            cluster_prefix=cluster_prefix, 
+            cluster_suffix=cluster_suffix, 
+            cluster_prefix_zfill=cluster_prefix_zfill, 
+            start=next_cluster_index,
+        )
+        if mode not in {"md5", "nodes"}:
+            next_cluster_index += relabel_clusters.size
+
+    # Report
+    is_changed = ~is_unchanged
+    previous_clusters = pd.Series(previous_ids, index=previous_to_updated)
+    previous_clusters = previous_clusters[is_changed[previous_to_updated]].groupby(level=0).agg(",".join)
+    df_report = pd.DataFrame({
+        "id_cluster":cluster_ids[is_changed],
+        "status":status[is_changed],
+        "previous_clusters":previous_clusters.reindex(np.flatnonzero(is_changed)).fillna("").values,
+        "number_of_nodes":np.bincount(labels[labels >= 0], minlength=n_clusters)[is_changed],
+        "number_of_new_nodes":number_of_new_nodes[is_changed],
+    })
+    return cluster_ids, df_report, next_cluster_index
 
 def main(args=None):
     # Path info
@@ -32,15 +369,15 @@ def main(args=None):
     # Path info
     description = """
     Running: {} v{} via Python v{} | {}""".format(__program__, __version__, sys.version.split(" ")[0], sys.executable)
-    usage = "{} -i <edgelist.tsv [No header]> -o <output.tsv>".format(__program__)
+    usage = "{} -i <edgelist.tsv [No header]> [<edgelist_2.tsv> ...] -o <output.tsv>".format(__program__)
     epilog = "Copyright 2021 Josh L. Espinoza (jespinoz@jcvi.org)"
 
     # Parser
     parser = argparse.ArgumentParser(description=description, usage=usage, epilog=epilog, formatter_class=argparse.RawTextHelpFormatter)
     # Pipeline
 
-    parser.add_argument("-i","--input", type=str, default="stdin", help = \
-                        "path/to/edgelist.tsv, No header. Accepted formats:\n"
+    parser.add_argument("-i","--input", type=str, nargs="+", default=["stdin"], help = \
+                        "path/to/edgelist.tsv, No header (see --skiprows). Multiple inputs are clustered as separate partitions in parallel and written to a single --output. Accepted formats:\n"
                         "[id_1]<tab>[id_2]\n"
                         "[id_1]<tab>[id_2]<tab>[weight]\n"
                         "[id_1]<tab>[id_2]<tab>[weight_1]<tab>[weight_2]\n"
@@ -53,10 +390,16 @@ def main(args=None):
     parser.add_argument("-m","--af_mode", type=str, default="relaxed",  choices={"relaxed", "strict"}, help = "Minimum alignment fraction mode with either `relaxed = max([AF_ref, AF_query]) > minimum_af` or `strict = (AF_ref > minimum_af) & (AF_query > minimum_af)`. `strict` will be biased against fragmented or partial genomes likely derived from metagenomes [Default: relaxed]") 
     parser.add_argument("-n", "--no_singletons", action="store_true", help = "Don't include self-interactions. Self-interactions will ensure unclustered genomes make it into the output")
     parser.add_argument("-b", "--basename", action="store_true", help = "Removes filepath prefix and extension.  Support for gzipped filepaths.")
-    parser.add_argument("--identifiers", type=str, help = "Identifiers to include.  If missing identifiers and singletons are allowed, then they will be included as singleton clusters with weight of np.nan")
+    parser.add_argument("--identifiers", type=str, nargs="+", help = "Identifiers to include.  If missing identifiers and singletons are allowed, then they will be included as singleton clusters with weight of np.nan.  One file per --input")
+    parser.add_argument("--chunksize", type=int, default=1000000, help = "Number of edges to read and filter at a time. [Default: 1000000]")
+    parser.add_argument("--usecols", type=int, nargs="+", help = "Columns (0-indexed) to read from each --input (e.g., --usecols 0 1 2 3 4 is equivalent to `cut -f1-5`) [Default: all columns]")
+    parser.add_argument("--skiprows", type=int, default=0, help = "Number of header lines to skip in each --input (e.g., --skiprows 1 is equivalent to `tail -n +2`) [Default: 0]")
+    parser.add_argument("-u", "--update_from", type=str, nargs="+", help = "path/to/clusters.npz from a previous --export_clusters.  Incremental mode where --input only has the new edges which are merged into the previous clusters.  Unchanged clusters keep their labels.  One per --input")
+    parser.add_argument("--update_report", type=str, nargs="+", help = "path/to/update_report.tsv with the clusters that were created, merged, or grown in incremental mode.  One per --input")
+    parser.add_argument("--n_partition_jobs", type=int, default=-1, help = "Number of processes to cluster multiple --input partitions.  Use -1 for one process per partition [Default: -1]")
 
     parser_labels = parser.add_argument_group('Label arguments')
-    parser_labels.add_argument("-p", "--cluster_prefix", type=str, default="c-", help="Cluster prefix [Default: 'c-']")
+    parser_labels.add_argument("-p", "--cluster_prefix", type=str, nargs="+", default=["c-"], help="Cluster prefix.  Either one prefix or one per --input [Default: 'c-']")
     parser_labels.add_argument("-z", "--cluster_prefix_zfill", type=int, default=0, help="Cluster prefix zfill. Use 7 to match identifiers from OrthoFinder.  Use 0 to add no zfill. Only applicable when --cluster_label_mode numeric. [Default: 0]") #7
     parser_labels.add_argument("-s", "--cluster_suffix", type=str, default="", help="Cluster suffix [Default: '']")
     parser_labels.add_argument("-c", "--cluster_label_mode", type=str, default="md5", choices={"numeric", "random", "pseudo-random", "md5", "nodes"}, help="Cluster label. [Default: 'md5']")
@@ -65,11 +408,15 @@ def main(args=None):
     parser_fasta.add_argument("-f","--fasta", type=str,  help = "path/to/sequences.fasta")
     parser_fasta.add_argument("--output_fasta_directory", type=str, default="clusters", help = "path/to/clusters/cluster_x.fasta [Default: clusters]")
     parser_fasta.add_argument("-x", "--output_fasta_extension", type=str, default="fasta", help = "path/to/clusters/cluster_x.[extension] [Default: fasta]")
+    parser_fasta.add_argument("--fasta_mode", type=str, default="memory", choices={"memory", "indexed"}, help = "Load all sequences into memory or use random access with an on-disk pyfastx index (path/to/sequences.fasta.fxi) [Default: memory]")
+    parser_fasta.add_argument("--output_fasta_multicluster", type=str, help = "path/to/clusters.fasta with all clusters in one file instead of one file per cluster.  Byte offsets of each cluster are written to [path].index.tsv")
+    parser_fasta.add_argument("--n_jobs", type=int, default=1, help = "Number of threads for writing fasta files [Default: 1]")
 
     parser_export = parser.add_argument_group('Export arguments')
-    parser_export.add_argument("-g", "--export_graph", type=str,   help = "prefix/to/graph pickled output files: nx.Graph suggested prefix is .graph.pkl")
-    parser_export.add_argument("-d", "--export_dict", type=str,   help = "prefix/to/dict pickled output file: {id_cluster: {id_a, id_b, ...}} suggested prefix is .dict.pkl")
-    parser_export.add_argument("-r", "--export_representatives", type=str,   help = "prefix/to/representatives.tsv table")
+    parser_export.add_argument("-g", "--export_graph", type=str, nargs="+", help = "prefix/to/graph pickled output files: nx.Graph suggested prefix is .graph.pkl.  One per --input")
+    parser_export.add_argument("-d", "--export_dict", type=str, nargs="+", help = "prefix/to/dict pickled output file: {id_cluster: {id_a, id_b, ...}} suggested prefix is .dict.pkl.  One per --input")
+    parser_export.add_argument("-r", "--export_representatives", type=str, nargs="+", help = "prefix/to/representatives.tsv table.  One per --input")
+    parser_export.add_argument("-e", "--export_clusters", type=str, nargs="+", help = "path/to/clusters.npz compact export with int-coded nodes, cluster labels, CSR cluster membership, edges, and representatives.  Load with `nichespace.utils.read_cluster_export` which builds networkx or igraph graphs only when needed.  One per --input")
 
     # parser.add_argument("--export_edgelist", type=str,   help = "prefix/to/edgelist output files")
 
@@ -78,159 +425,237 @@ def main(args=None):
     opts.script_directory  = script_directory
     opts.script_filename = script_filename
 
-    
-    # Input
-    if opts.input == "stdin":
-        opts.input = sys.stdin 
+    # Partitions
+    partitions = get_partitions(opts)
+    if len(partitions) > 1:
+        assert "stdin" not in opts.input, "stdin can only be used with a single --input"
+        assert opts.output_fasta_multicluster is None, "--output_fasta_multicluster can only be used with a single --input"
 
     # Output
     if opts.output == "stdout":
         opts.output = sys.stdout 
 
-    # Edge list
-    try:
-        df_edgelist = pd.read_csv(opts.input, sep="\t", header=None)
-    except pd.errors.EmptyDataError:
-        df_edgelist = pd.DataFrame(columns=["query", "reference"])
-
-    assert df_edgelist.shape[1] in  {2,3,4, 5}, "Must have 2, 3, 4, or 5 columns.  {} provided.".format(df_edgelist.shape[1])
-    if opts.basename:
-        def get_basename(x):
-            _, fn = os.path.split(x)
-            if fn.endswith(".gz"):
-                fn = fn[:-3]
-            return ".".join(fn.split(".")[:-1])
-        
-        # Support for .map superceding .applymap
-        if hasattr(df_edgelist, "map"):
-            df_edgelist.iloc[:,:2] = df_edgelist.iloc[:,:2].map(get_basename)
-        else:
-            df_edgelist.iloc[:,:2] = df_edgelist.iloc[:,:2].applymap(get_basename)
-
-    # Identifiers from edgelist
-    if not df_edgelist.empty:
-        edgelist = df_edgelist.iloc[:,:2].values.tolist()
-        identifiers = set.union(*map(set, edgelist))
+    if len(partitions) == 1:
+        results = [cluster_partition(partitions[0])]
     else:
-        edgelist = list()
-        identifiers = set()
+        n_partition_jobs = min(opts.n_partition_jobs, len(partitions)) if opts.n_partition_jobs > 0 else len(partitions)
+        with ProcessPoolExecutor(max_workers=n_partition_jobs) as executor:
+            results = list(executor.map(cluster_partition, partitions))
+
+    node_to_cluster = pd.concat(results)
+    duplicates = node_to_cluster.index[node_to_cluster.index.duplicated()]
+    if len(duplicates):
+        print("[Warning] {} identifiers are in more than one partition (e.g., {})".format(len(duplicates), duplicates[0]), file=sys.stderr)
+    node_to_cluster.to_frame().to_csv(opts.output, sep="\t", header=None)
+
+def get_partitions(opts):
+    """
+    Split the options into one argparse.Namespace per --input with its own identifiers, cluster prefix, and exports.
+    """
+    n_partitions = len(opts.input)
+    partition_arguments = dict()
+    for name in ["identifiers", "cluster_prefix", "export_graph", "export_dict", "export_representatives", "export_clusters", "update_from", "update_report"]:
+        values = getattr(opts, name)
+        if values is None:
+            values = [None]*n_partitions
+        if (len(values) == 1) and (name == "cluster_prefix"):
+            values = values*n_partitions
+        assert len(values) == n_partitions, "--{} must have one value per --input ({} provided for {} inputs)".format(name, len(values), n_partitions)
+        partition_arguments[name] = values
+
+    partitions = list()
+    for i, input in enumerate(opts.input):
+        partition_opts = argparse.Namespace(**vars(opts))
+        partition_opts.input = input
+        for name, values in partition_arguments.items():
+            setattr(partition_opts, name, values[i])
+        partitions.append(partition_opts)
+    return partitions
+
+def cluster_partition(opts):
+    """
+    Cluster one edge list (partition) and write its exports.  Returns the node to cluster mapping.
+    """
+    # Input
+    if opts.input == "stdin":
+        opts.input = sys.stdin 
 
-    all_identifiers = identifiers
+    # Identifiers to include
+    identifiers = None
     if opts.identifiers:
-        all_identifiers = set()
         with open(opts.identifiers, "r") as f:
-            for line in f.readlines():
-                id = line.strip()
-                all_identifiers.add(id)
+            identifiers = [line.strip() for line in f.readlines() if line.strip()]
+
+    # Previous clustering
+    previous = None
+    n_previous = 0
+    if opts.update_from is not None:
+        # Only needed for incremental updates so plain clustering does not require the nichespace package
+        from nichespace.utils import read_cluster_export
+        with read_cluster_export(opts.update_from) as previous:
+            previous.load()
+        n_previous = previous.nodes.size
+        for name in ["threshold", "threshold2", "minimum_af", "af_mode", "no_singletons", "basename"]:
+            if (name in previous.metadata_) and (previous.metadata_[name] != getattr(opts, name)):
+                print("[Warning] --{} is {} but the previous clustering used {}".format(name, getattr(opts, name), previous.metadata_[name]), file=sys.stderr)
+
+    # Edge list
+    edgelist = read_edgelist(
+        opts.input, 
+        identifiers=identifiers, 
+        threshold=opts.threshold, 
+        threshold2=opts.threshold2, 
+        minimum_af=opts.minimum_af, 
+        af_mode=opts.af_mode, 
+        basename=opts.basename, 
+        chunksize=opts.chunksize,
+        usecols=opts.usecols,
+        skiprows=opts.skiprows,
+        known_nodes=previous["nodes"].astype(object) if previous is not None else None,
+    )
+    if (previous is not None) and edgelist["is_empty"]:
+        # No new edges so use the layout of the previous clustering (which is returned unchanged)
+        edgelist["n_columns"] = previous.metadata_["n_columns"]
+        edgelist["attributes"] = {name:np.zeros(0) for name in get_edge_attribute_names(edgelist["n_columns"])}
+    if previous is not None:
+        assert edgelist["n_columns"] == previous.metadata_["n_columns"], "--input has {} columns but the previous clustering used {}".format(edgelist["n_columns"], previous.metadata_["n_columns"])
+        edgelist["edgelist_nodes"][:n_previous] = True
+    node_ids = edgelist["nodes"]
+    source = edgelist["source"]
+    target = edgelist["target"]
+    attribute_names = list(edgelist["attributes"].keys())
 
     # Read in fasta
     if opts.fasta:
         import pyfastx
-        id_to_sequence = dict()
-        for id, seq in tqdm(pyfastx.Fasta(opts.fasta, build_index=False), "Reading fasta file: {}".format(opts.fasta)):
-            id_to_sequence[id] = seq 
-
-        assert set(id_to_sequence.keys()) >= identifiers, "Not all of the sequences in --input are available in --fasta.  Either add the sequences to --fasta file or remove --fasta argument."
-        os.makedirs(opts.output_fasta_directory, exist_ok=True)
-
-    # Construct graph
-    graph = nx.Graph()
-
-    # Unweighted
-    if df_edgelist.shape[1] == 2:
-        for i, (id_query, id_target) in tqdm(df_edgelist.iterrows(), "Reading edgelist: {}".format(opts.input), total=df_edgelist.shape[0]):
-            if {id_query, id_target}.issubset(all_identifiers):
-                graph.add_edge(id_query, id_target, weight=1)
-        if not opts.no_singletons:
-            for id in all_identifiers:
-                if id not in graph.nodes():
-                    graph.add_edge(id, id, weight=np.nan)
-
-    # Weighted
-    if df_edgelist.shape[1] == 3:
-        for i, (id_query, id_target, w) in tqdm(df_edgelist.iterrows(), "Reading edgelist with weights (≥ {}): {}".format(opts.threshold, opts.input), total=df_edgelist.shape[0]):
-            if w >= opts.threshold:
-                if {id_query, id_target}.issubset(all_identifiers):
-                    graph.add_edge(id_query, id_target, weight=w)
-        if not opts.no_singletons:
-            for id in all_identifiers:
-                if id not in graph.nodes():
-                    graph.add_edge(id, id, weight=np.nan)
-
-    # Weighted with alignment fraction
-    if df_edgelist.shape[1] == 4:
-        for i, (id_query, id_target, w1, w2) in tqdm(df_edgelist.iterrows(), "Reading edgelist with weights (≥ {}) and weights2 (≥ {}): {}".format(opts.threshold, opts.threshold2, opts.input), total=df_edgelist.shape[0]):
-            if all([
-                w1 >= opts.threshold,
-                w2 >= opts.threshold2,
-                ]):
-                if {id_query, id_target}.issubset(all_identifiers):
-                    graph.add_edge(id_query, id_target, weight=w1, weight2=w2)
-        if not opts.no_singletons:
-            for id in all_identifiers:
-                if id not in graph.nodes():
-                    graph.add_edge(id, id, weight=np.nan, weight2=np.nan)
-                    
-    # Weighted with alignment fraction
-    if df_edgelist.shape[1] == 5:
-        if opts.af_mode == "relaxed":
-            for i, (id_query, id_target, w, af_ref, af_query) in tqdm(df_edgelist.iterrows(), "Reading edgelist with weights (≥ {}) and alignment fractions (≥ {}) using {} mode: {}".format(opts.threshold, opts.minimum_af, opts.af_mode, opts.input), total=df_edgelist.shape[0]):
-                if all([
-                    w >= opts.threshold,
-                    max([af_ref, af_query]) >= opts.minimum_af,
-                    ]):
-                    if {id_query, id_target}.issubset(all_identifiers):
-                        graph.add_edge(id_query, id_target, weight=w, alignment_fraction_reference=af_ref, alignment_fraction_query=af_query)
-                        
-        if opts.af_mode == "strict":
-            for i, (id_query, id_target, w, af_ref, af_query) in tqdm(df_edgelist.iterrows(), "Reading edgelist with weights (≥ {}) and alignment fractions (≥ {}) using {} mode: {}".format(opts.threshold, opts.minimum_af, opts.af_mode, opts.input), total=df_edgelist.shape[0]):
-                if all([
-                    w >= opts.threshold,
-                    af_ref >= opts.minimum_af,
-                    af_query >= opts.minimum_af,
-                    ]):
-                    if {id_query, id_target}.issubset(all_identifiers):
-                        graph.add_edge(id_query, id_target, weight=w, alignment_fraction_reference=af_ref, alignment_fraction_query=af_query)
-                        
-        if not opts.no_singletons:
-            for id in all_identifiers:
-                if id not in graph.nodes():
-                    graph.add_edge(id, id, weight=np.nan, alignment_fraction=100.0)
-            
-    # Get connected components
-    node_to_cluster = dict()
-    cluster_to_nodes = dict()
-
-    for i, nodes in tqdm(enumerate(sorted(nx.connected_components(graph), key=len, reverse=True), start=1), "Organizing clusters", unit=" clusters"):
-        id_cluster = generate_unique_cluster_base_label(nodes=nodes, mode=opts.cluster_label_mode, index=i, cluster_prefix_zfill=opts.cluster_prefix_zfill)
-
-        # Add cluster prefix and suffix
-        if bool(opts.cluster_prefix):
-            id_cluster =  "{}{}".format(opts.cluster_prefix, id_cluster)
-        if bool(opts.cluster_suffix):
-            id_cluster =  "{}{}".format(id_cluster, opts.cluster_suffix)
-                    
-        # Get subgraph
-        if len(nodes) > 1:
-            subgraph = graph.subgraph(nodes)
-            node_to_degree = dict(nx.degree(subgraph, weight="weight"))
-            representative = max(node_to_degree, key=node_to_degree.get)
-        else:
-            node_to_degree = dict(zip(nodes, [np.nan]))
-            representative = list(nodes)[0]
-
-        for id_node in nodes:
-            node_to_cluster[id_node] = id_cluster
-            graph.nodes[id_node]["id_cluster"] = id_cluster
-            graph.nodes[id_node]["intra-cluster_connectivity"] = node_to_degree[id_node]
-            graph.nodes[id_node]["representative"] = id_node == representative
-
-        cluster_to_nodes[id_cluster] = set(nodes)
-    node_to_cluster = pd.Series(node_to_cluster, name="Clusters")
-    node_to_cluster.to_frame().to_csv(opts.output, sep="\t", header=None)
+        if opts.fasta_mode == "memory":
+            id_to_sequence = dict()
+            for id, seq in tqdm(pyfastx.Fasta(opts.fasta, build_index=False), "Reading fasta file: {}".format(opts.fasta)):
+                id_to_sequence[id] = seq 
+            sequence_identifiers = id_to_sequence.keys()
+            get_sequence = id_to_sequence.__getitem__
+
+        if opts.fasta_mode == "indexed":
+            # Each thread opens its own handle to the on-disk index
+            fasta_handles = threading.local()
+            def get_sequence(id):
+                if not hasattr(fasta_handles, "fasta"):
+                    fasta_handles.fasta = pyfastx.Fasta(opts.fasta)
+                return fasta_handles.fasta[id].seq
+            print("Building or loading fasta index: {}.fxi".format(opts.fasta), file=sys.stderr)
+            sequence_identifiers = set(pyfastx.Fasta(opts.fasta).keys())
+
+        assert set(sequence_identifiers) >= set(node_ids[edgelist["edgelist_nodes"]]), "Not all of the sequences in --input are available in --fasta.  Either add the sequences to --fasta file or remove --fasta argument."
+        if opts.output_fasta_multicluster is None:
+            os.makedirs(opts.output_fasta_directory, exist_ok=True)
+
+    # Nodes in graph
+    n_nodes = len(node_ids)
+    n_allowed = edgelist["n_allowed"]
+    is_connected = np.zeros(n_nodes, dtype=bool)
+    is_connected[source] = True
+    is_connected[target] = True
+    in_graph = is_connected.copy()
+    if not opts.no_singletons:
+        in_graph[:n_allowed] = True
+    in_graph[:n_previous] = True
+
+    # Order of first appearance (previous nodes, edges, then singletons) for stable cluster ordering
+    node_order = np.arange(n_nodes, dtype=np.int64) + 2*source.size + n_previous
+    interleaved = np.column_stack([source, target]).ravel()
+    appearing_nodes, first_index = np.unique(interleaved, return_index=True)
+    node_order[appearing_nodes] = first_index + n_previous
+    node_order[:n_previous] = np.arange(n_previous)
+
+    # Get connected components (only the new edges are needed to merge previous clusters)
+    if previous is not None:
+        labels, n_clusters = get_incremental_components(n_nodes, previous["labels"].astype(np.int64), previous["clusters"].size, source, target, in_graph=in_graph, node_order=node_order)
+        source = np.concatenate([previous["source"].astype(source.dtype), source])
+        target = np.concatenate([previous["target"].astype(target.dtype), target])
+        previous_attributes = previous.get_edge_attributes()
+        edge_attributes = {name:np.concatenate([previous_attributes[name], values]) for name, values in edgelist["attributes"].items()}
+        is_connected[source] = True
+        is_connected[target] = True
+    else:
+        labels, n_clusters = None, None
+        edge_attributes = edgelist["attributes"]
+
+    # Deduplicate edges and compute weighted degree
+    source, target, attributes = deduplicate_undirected_edges(source, target, edge_attributes, n_nodes)
+    weight = attributes["weight"]
+    degree = np.bincount(source, weights=weight, minlength=n_nodes) + np.bincount(target, weights=weight, minlength=n_nodes)
+
+    if labels is None:
+        labels, n_clusters = get_connected_components(n_nodes, source, target, in_graph=in_graph, node_order=node_order)
+    graph_nodes = np.flatnonzero(in_graph)
+    graph_nodes = graph_nodes[np.lexsort((node_order[graph_nodes], labels[graph_nodes]))]
+    cluster_sizes = np.bincount(labels[graph_nodes], minlength=n_clusters)
+
+    # Cluster labels
+    if previous is None:
+        cluster_ids = generate_cluster_labels(
+            node_ids, 
+            labels, 
+            n_clusters, 
+            mode=opts.cluster_label_mode, 
+            cluster_prefix=opts.cluster_prefix, 
+            cluster_suffix=opts.cluster_suffix, 
+            cluster_prefix_zfill=opts.cluster_prefix_zfill,
+        )
+        next_cluster_index = n_clusters + 1
+    else:
+        cluster_ids, df_report, next_cluster_index = get_incremental_cluster_labels(
+            previous, 
+            node_ids, 
+            labels, 
+            n_clusters, 
+            mode=opts.cluster_label_mode, 
+            cluster_prefix=opts.cluster_prefix, 
+            cluster_suffix=opts.cluster_suffix, 
+            cluster_prefix_zfill=opts.cluster_prefix_zfill,
+        )
+        status_counts = df_report["status"].value_counts()
+        print("Incremental update of {}: {} new nodes, {} created, {} merged, {} grown, and {} unchanged clusters".format(
+            opts.update_from, 
+            in_graph[n_previous:].sum(), 
+            status_counts.get("created", 0), 
+            status_counts.get("merged", 0), 
+            status_counts.get("grown", 0), 
+            n_clusters - len(df_report),
+            ), file=sys.stderr)
+        if opts.update_report is not None:
+            df_report.to_csv(opts.update_report, sep="\t", index=False)
+
+    # Representatives with the highest intra-cluster weighted degree (ties broken by first appearance)
+    order = np.lexsort((node_order[graph_nodes], -degree[graph_nodes], labels[graph_nodes]))
+    is_representative = np.zeros(n_nodes, dtype=bool)
+    is_representative[graph_nodes[order][np.concatenate([[0], np.cumsum(cluster_sizes)[:-1]])]] = True
+    connectivity = np.full(n_nodes, np.nan)
+    connectivity[graph_nodes] = np.where(cluster_sizes[labels[graph_nodes]] > 1, degree[graph_nodes], np.nan)
+
+    node_to_cluster = pd.Series(cluster_ids[labels[graph_nodes]], index=node_ids[graph_nodes], name="Clusters")
+
+    cluster_to_nodes = None
+    if (opts.export_dict is not None) or opts.fasta:
+        cluster_to_nodes = dict(zip(cluster_ids, map(set, get_sorted_cluster_members(node_ids, labels, n_clusters))))
 
     # Export pickle
     if opts.export_graph is not None:
+        graph = nx.Graph()
+        attribute_names = list(attributes.keys())
+        graph.add_edges_from(zip(
+            node_ids[source], 
+            node_ids[target], 
+            map(lambda values: dict(zip(attribute_names, values)), zip(*attributes.values())),
+        ))
+        singleton_attributes = {name:np.nan for name in attribute_names}
+        if edgelist["n_columns"] == 5:
+            singleton_attributes = {"weight":np.nan, "alignment_fraction":100.0}
+        for id in node_ids[in_graph & ~is_connected]:
+            graph.add_edge(id, id, **singleton_attributes)
+        nx.set_node_attributes(graph, dict(zip(node_ids[graph_nodes], cluster_ids[labels[graph_nodes]])), "id_cluster")
+        nx.set_node_attributes(graph, dict(zip(node_ids[graph_nodes], connectivity[graph_nodes])), "intra-cluster_connectivity")
+        nx.set_node_attributes(graph, dict(zip(node_ids[graph_nodes], is_representative[graph_nodes])), "representative")
         with open("{}".format(opts.export_graph), "wb") as f:
             pickle.dump(graph, f)
 
@@ -238,6 +663,37 @@ def main(args=None):
         with open("{}".format(opts.export_dict), "wb") as f:
             pickle.dump(cluster_to_nodes, f)
 
+    # Export compact arrays
+    if opts.export_clusters is not None:
+        write_cluster_export(
+            opts.export_clusters, 
+            node_ids=node_ids, 
+            export_nodes=graph_nodes, 
+            labels=labels, 
+            cluster_ids=cluster_ids, 
+            source=source, 
+            target=target, 
+            attributes=attributes, 
+            connectivity=connectivity, 
+            is_representative=is_representative, 
+            metadata={
+                "program":__program__,
+                "version":__version__,
+                "n_columns":edgelist["n_columns"],
+                "threshold":opts.threshold,
+                "threshold2":opts.threshold2,
+                "minimum_af":opts.minimum_af,
+                "af_mode":opts.af_mode,
+                "no_singletons":opts.no_singletons,
+                "basename":opts.basename,
+                "cluster_label_mode":opts.cluster_label_mode,
+                "cluster_prefix":opts.cluster_prefix,
+                "cluster_suffix":opts.cluster_suffix,
+                "cluster_prefix_zfill":opts.cluster_prefix_zfill,
+                "next_cluster_index":int(next_cluster_index),
+            },
+        )
+
     # Export representatives
     if opts.export_representatives is not None:
         if opts.export_representatives.endswith(".gz"):
@@ -245,17 +701,14 @@ def main(args=None):
         else:
             f_representatives = open("{}".format(opts.export_representatives), "w")
 
-        print("id_node", "id_cluster", "intra-cluster_connectivity", "representative", sep="\t", file=f_representatives)
-        for id_node, node_metadata in graph.nodes(data=True):
-            k = node_metadata["intra-cluster_connectivity"]
-            print(
-                id_node, 
-                node_metadata["id_cluster"], 
-                k if pd.notnull(k) else "", 
-                node_metadata["representative"], 
-                sep="\t", 
-                file=f_representatives,
-            )
+        representative_nodes = graph_nodes[np.argsort(node_order[graph_nodes])]
+        df_representatives = pd.DataFrame({
+            "id_node":node_ids[representative_nodes],
+            "id_cluster":cluster_ids[labels[representative_nodes]],
+            "intra-cluster_connectivity":connectivity[representative_nodes],
+            "representative":is_representative[representative_nodes],
+        })
+        df_representatives.to_csv(f_representatives, sep="\t", index=False)
         f_representatives.close()
 
 
@@ -264,10 +717,30 @@ def main(args=None):
     #     nx.write_weighted_edgelist(graph, "{}.edgelist.tsv".format(opts.export_pickle), delimiter="\t")
 
     if opts.fasta:
-        for id_cluster, nodes in tqdm(cluster_to_nodes.items(), "Writing fasta files for each cluster: {}".format(opts.output_fasta_directory)):
-            with open(os.path.join(opts.output_fasta_directory, "{}.{}".format(id_cluster, opts.output_fasta_extension)), "w") as f:
-                for id_node in sorted(nodes):
-                    print(">{} {}\n{}".format(id_node, id_cluster, id_to_sequence[id_node]), file=f)
+        def format_cluster_fasta(item):
+            id_cluster, nodes = item
+            return "".join(">{} {}\n{}\n".format(id_node, id_cluster, get_sequence(id_node)) for id_node in sorted(nodes))
+
+        def write_cluster_fasta(item):
+            id_cluster, _ = item
+            with open(os.path.join(opts.output_fasta_directory, "{}.{}".format(id_cluster, opts.output_fasta_extension)), "w", buffering=FASTA_BUFFER_SIZE) as f:
+                f.write(format_cluster_fasta(item))
+
+        with ThreadPoolExecutor(max_workers=opts.n_jobs) as executor:
+            if opts.output_fasta_multicluster is None:
+                for _ in tqdm(executor.map(write_cluster_fasta, cluster_to_nodes.items()), "Writing fasta files for each cluster: {}".format(opts.output_fasta_directory), total=len(cluster_to_nodes)):
+                    pass
+            else:
+                # Records are formatted in parallel and written in cluster order to record byte offsets
+                offsets = list()
+                with open(opts.output_fasta_multicluster, "wb", buffering=FASTA_BUFFER_SIZE) as f:
+                    for id_cluster, records in tqdm(zip(cluster_to_nodes.keys(), executor.map(format_cluster_fasta, cluster_to_nodes.items())), "Writing multi-cluster fasta file: {}".format(opts.output_fasta_multicluster), total=len(cluster_to_nodes)):
+                        records = records.encode()
+                        offsets.append([id_cluster, f.tell(), len(records), len(cluster_to_nodes[id_cluster])])
+                        f.write(records)
+                pd.DataFrame(offsets, columns=["id_cluster", "offset", "length", "number_of_sequences"]).to_csv("{}.index.tsv".format(opts.output_fasta_multicluster), sep="\t", index=False)
+
+    return node_to_cluster
 
 if __name__ == "__main__":
     main()
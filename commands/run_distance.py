@@ -11,7 +11,7 @@ from ensemble_networkx import write_parquet_nonredundant_pairwise_matrix
 
 
 # Niche Space
-from nichespace.utils import fast_groupby
+from nichespace.utils import cached_groupby
 from nichespace.neighbors import (
     pairwise_distances_kneighbors,
 )
@@ -26,9 +26,9 @@ os.makedirs(output_directory, exist_ok=True)
 
 logger = build_logger(stream=sys.stderr)
 logger.info("Loading X_genomic_traits")
+genome_to_clusterani = pd.read_csv(f"../data/training/v2025.3.3/{quality_label}/genome_to_ani-cluster.tsv.gz", sep="\t", index_col=0).iloc[:,0].astype("category")
 filepath = f"../data/training/v2025.3.3/{quality_label}/X.parquet"
 if not os.path.exists(filepath):
-    genome_to_clusterani = pd.read_csv(f"../data/training/v2025.3.3/{quality_label}/genome_to_ani-cluster.tsv.gz", sep="\t", index_col=0).iloc[:,0].astype("category")
     X_genomic_traits = pd.read_parquet(f"../data/training/v2025.3.3/{quality_label}/global.genomic_traits.kofam.bool.parquet")
 
     X_genomic_traits = X_genomic_traits.loc[genome_to_clusterani.index]
@@ -38,13 +38,9 @@ else:
 logger.info("X_genomic_traits: n_observations {}, n_features {}".format(*X_genomic_traits.shape))
 
 logger.info("Grouping X_genomic_traits by cluster-ani")
-filepath = f"../data/training/v2025.3.3/{quality_label}/X1.parquet"
-if not os.path.exists(filepath):
-    X_genomic_traits_clusterani = fast_groupby(X_genomic_traits, genome_to_clusterani) > 0
-    # X_genomic_traits_clusterani = X_genomic_traits_clusterani.astype(pd.SparseDtype("bool", fill_value=False))
-    X_genomic_traits_clusterani.to_parquet(filepath, index=True)
-else:
-    X_genomic_traits_clusterani = pd.read_parquet(filepath)
+genome_to_clusterani = genome_to_clusterani.loc[X_genomic_traits.index]
+X_genomic_traits_clusterani = cached_groupby(X_genomic_traits, genome_to_clusterani, method="any", cache_directory=f"../data/training/v2025.3.3/{quality_label}/cache", logger=logger)
+# X_genomic_traits_clusterani = X_genomic_traits_clusterani.astype(pd.SparseDtype("bool", fill_value=False))
 logger.info("X_genomic_traits_clusterani: n_observations {}, n_features {}".format(*X_genomic_traits_clusterani.shape))
     
 logger.info("Removing X_genomic_traits from memory")
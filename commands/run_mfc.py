@@ -14,6 +14,7 @@ from nichespace.neighbors import (
     KNeighborsLeidenClustering,
     pairwise_distances_kneighbors,
 )
+from nichespace.utils import symmetrize_inplace
 
 
 # Data
@@ -32,7 +33,11 @@ jaccard_distances = pd.read_parquet(f"{output_directory}/genomic_traits_clustera
 #jaccard_distances = convert_network(jaccard_distances, pd.DataFrame)
 #np.fill_diagonal(jaccard_distances.values, 0)
 logger.info("Forcing symmetry")
-jaccard_distances = (jaccard_distances + jaccard_distances.T)/2
+jaccard_distances = pd.DataFrame(
+    symmetrize_inplace(jaccard_distances.to_numpy(copy=True), method="mean"), 
+    index=jaccard_distances.index, 
+    columns=jaccard_distances.columns,
+)
 logger.info("Starting KNeighborsLeidenClustering")
 n = jaccard_distances.shape[0]
 n_neighbors_params = [int, int(np.log(n)), int(np.sqrt(n)/2)]
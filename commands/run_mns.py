@@ -50,6 +50,7 @@ mns = HierarchicalNicheSpace(
     n_jobs=-1,
     verbose=3,
     checkpoint_directory=f"{output_directory}/checkpoints",
+    groupby_cache_directory=f"../data/training/v2025.3.3/{quality_label}/cache",
     cast_as_float=True,
     #parallel_kws={"require":"sharedmem"},
 )
@@ -1,7 +1,13 @@
 import os
 import sys
+import json
+import threading
 import warnings
 import uuid
+import shutil
+import tempfile
+from copy import copy as shallow_copy
+from functools import lru_cache
 from collections import (
     defaultdict,
     OrderedDict,
@@ -10,6 +16,8 @@ from typing import Optional, Union
 from tqdm import tqdm
 import numpy as np # Can't install NumPy 2.2.2 which is what the pkls were saved with
 import pandas as pd # 'v2.2.3'
+import scipy.sparse as sps
+from scipy.sparse.linalg import lobpcg
 # import anndata as ad
 
 import optuna
@@ -19,6 +27,7 @@ from annoy import AnnoyIndex
 
 from scipy.spatial.distance import (
     pdist, 
+    cdist,
     squareform,
 )
 
@@ -30,12 +39,16 @@ from sklearn.metrics import (
 from sklearn.tree import DecisionTreeRegressor
 # --------------------------------------------------
 from sklearn.utils.validation import check_is_fitted
-from datafold.pcfold import TSCDataFrame
+from datafold.pcfold import (
+    TSCDataFrame,
+    DmapKernelFixed,
+)
 # --------------------------------------------------
 from datafold.dynfold import (
     DiffusionMaps, 
     Roseland,
 )
+from datafold.dynfold.dmap import _DmapKernelAlgorithms
 
 from pyexeggutor import (
     build_logger,
@@ -52,10 +65,19 @@ from clairvoyance.bayesian import (
     BayesianClairvoyanceRegression,
 )
 
-from .neighbors import KNeighborsKernel
+from .neighbors import (
+    KNeighborsKernel,
+    brute_force_kneighbors_graph_from_rectangular_distance,
+    update_kneighbors_graph,
+)
 from .utils import (
     fast_groupby,
+    cached_groupby,
     stop_when_exceeding_trials,
+    TrialResourceMonitor,
+    check_trial_budget,
+    record_trial_cost,
+    sparse_frame_from_spmatrix,
 )
 
 # ========================================================
@@ -73,6 +95,18 @@ DEFAULT_REGRESSOR_PARAM_SPACE = {
 
 DEFAULT_REGRESSOR = DecisionTreeRegressor(random_state=0)
 
+# ========================================================
+# Functions
+# ========================================================
+@lru_cache(maxsize=None)
+def load_annoy_index(filepath:str, dimension:int, metric:str, prefault:bool=False):
+    """
+    Load (memory-map) an AnnoyIndex once per process so parallel workers share the .ann pages from the OS cache.
+    """
+    tree = AnnoyIndex(dimension, metric)
+    tree.load(filepath, prefault=prefault)
+    return tree
+
 # ========================================================
 # Classes 
 # ========================================================
@@ -156,6 +190,10 @@ class NicheSpace(object):
         alpha=[float, 0.0, 1.0],
         scale_by_steadystate:bool=True,
         niche_prefix="n",
+        parallel_backend=None,
+        parallel_prefer="threads",
+        parallel_kws:dict=None,
+        transform_batch_size:int=256,
 
         # Optuna
         n_trials=50,
@@ -171,8 +209,6 @@ class NicheSpace(object):
         stream=sys.stdout,
         ):
         
-        warnings.warn("NicheSpace has not had the performance updates that HierarchicalNicheSpace has recieved")
-        
         # General
         if name is None:
             name = str(uuid.uuid4())
@@ -189,6 +225,13 @@ class NicheSpace(object):
         self.scoring_distance_metric = scoring_distance_metric
         self.scale_by_steadystate = scale_by_steadystate
         self.niche_prefix = niche_prefix
+        self.parallel_kws = dict(
+                backend=parallel_backend,
+                prefer=parallel_prefer,
+        )
+        if parallel_kws:
+            self.parallel_kws.update(parallel_kws)
+        self.transform_batch_size = transform_batch_size
         
         # Optuna
         self.n_jobs = n_jobs
@@ -266,7 +309,7 @@ class NicheSpace(object):
                     model = DiffusionMaps(kernel=kernel, n_eigenpairs=n_components+1, alpha=alpha)
 
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Fitting Diffision Map: n_neighbors={n_neighbors}, n_components={n_components}, alpha={alpha}")
-                    dmap = model.fit_transform(X)
+                    dmap = model.fit_transform(X.values)
 
                     # Score
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Calculating silhouette score: n_neighbors={n_neighbors}, n_components={n_components}, alpha={alpha}")
@@ -325,7 +368,7 @@ class NicheSpace(object):
             n_jobs=self.n_concurrent_trials,
             timeout=self.study_timeout, 
             show_progress_bar=self.verbose >= 2, 
-            callbacks=self.study_callbacks + [stop_when_exceeding_trials], 
+            callbacks=self.study_callbacks + [callback_fn], 
             gc_after_trial=True,
         )
 
@@ -347,7 +390,7 @@ class NicheSpace(object):
             raise IndexError("X.shape[0] must equal y.size")
         if not np.all(X.index == y.index):
             raise IndexError("X.index must equal y.index")
-        if not isinstance(y, pd.CategoricalDtype):
+        if not isinstance(y.dtype, pd.CategoricalDtype):
             y = y.astype("category")
         self.X_ = X.copy()
         self.y_ = y.copy()
@@ -374,7 +417,16 @@ class NicheSpace(object):
         if self.kernel_distance_metric == "jaccard":
             X = X.astype(bool)
             
+        self.features_ = X.columns
+
         # Distance matrix
+        serialized_checkpoint_filepath = None
+        if self.checkpoint_directory:
+            serialized_checkpoint_filepath = os.path.join(self.checkpoint_directory, f"{self.name}.{self.__class__.__name__}.distance_matrix.parquet")
+            if os.path.exists(serialized_checkpoint_filepath):
+                self.logger.info(f"Loading distance matrix from checkpoint: {serialized_checkpoint_filepath}")
+                distance_matrix = pd.read_parquet(serialized_checkpoint_filepath).values
+
         if distance_matrix is None:
             if self.verbose > 0:
                 self.logger.info("[Start] Processing distance matrix")
@@ -385,6 +437,14 @@ class NicheSpace(object):
             
         if len(distance_matrix.shape) == 1:
             distance_matrix = squareform(distance_matrix)
+        if not distance_matrix.shape[0] == X.shape[0]:
+            raise ValueError(f"distance_matrix.shape[0] ({distance_matrix.shape[0]}) does not match X.shape[0] ({X.shape[0]}).  This may be a result of automatic filtering.  If so, please filter before providing input or do not provide distance matrix")
+        if serialized_checkpoint_filepath:
+            if not os.path.exists(serialized_checkpoint_filepath):
+                if not os.path.exists(self.checkpoint_directory):
+                    os.makedirs(self.checkpoint_directory)
+                self.logger.info(f"Writing distance matrix checkpoint: {serialized_checkpoint_filepath}")
+                pd.DataFrame(distance_matrix, index=X.index.astype(str), columns=X.index.astype(str)).to_parquet(serialized_checkpoint_filepath, index=True)
         if self.verbose > 0:
             self.logger.info("[End] Processing distance matrix")
 
@@ -408,7 +468,7 @@ class NicheSpace(object):
             for k, v in self.study_.best_params.items():
                 setattr(self,k,v)
             if self.verbose > 0:
-                self.logger.info(f"Tuned parameters (Score={self.study_.best_value}): {self.study_.best_params}")
+                self.logger.info(f"Tuned parameters (Score={self.study_.best_trial.user_attrs.get('score', self.study_.best_value)}): {self.study_.best_params}")
                 self.logger.info("[End] Hyperparameter Tuning")
             self.is_tuned = True
             
@@ -428,7 +488,7 @@ class NicheSpace(object):
         )
         
         # Fit
-        dmap = self.model_.fit(X)
+        dmap = self.model_.fit(X.values)
 
         # Complete
         dmap = self._parallel_transform(X, self.model_, progressbar_message=f"[Parallel Transformation] Initial data")
@@ -461,13 +521,26 @@ class NicheSpace(object):
         ):
         if not self.is_fitted:
             raise Exception("Please run .fit to build DiffusionMap model before continuing")
-        dmap = self._parallel_transform(self, X, self.model_, progressbar_message=progressbar_message)
+
+        if X.shape[1] != len(self.features_):
+            raise ValueError("Number of X features must match number of fitted features")
+
+        if isinstance(X, pd.DataFrame):
+            if np.any(X.columns != self.features_):
+                raise ValueError("X features must match fitted features")
+
+        dmap = self._parallel_transform(X, self.model_, progressbar_message=progressbar_message)
         if isinstance(X, pd.DataFrame):
             X_dmap = pd.DataFrame(dmap, index=X.index)
             X_dmap.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
             X_dmap.index.name = self.observation_type
             X_dmap.columns.name = self.feature_type
+            if self.scale_by_steadystate:
+                X_dmap = self._scale_by_first_column(X_dmap)
+            return X_dmap
         else:
+            if self.scale_by_steadystate:
+                dmap = self._scale_by_first_column(dmap)
             return dmap
         
     def get_basis(self):
@@ -476,41 +549,49 @@ class NicheSpace(object):
         return self.diffusion_coordinates_
 
     @staticmethod
-    def _scale_by_first_column(X: pd.DataFrame) -> pd.DataFrame:
+    def _scale_by_first_column(X):
         """
         Scale all columns of a DataFrame (except the first one) by the first column.
 
         Parameters:
         -----------
-        X : pd.DataFrame
+        X : pd.DataFrame or np.ndarray
             Input DataFrame where the first column serves as the divisor.
 
         Returns:
         --------
-        pd.DataFrame
+        pd.DataFrame or np.ndarray
             A new DataFrame with the first column removed and the remaining columns scaled.
         """
-        values = X.values  # Convert to NumPy array for efficiency
-        steady_state_vector = values[:, 0].reshape(-1, 1)  # Extract first column as divisor
-        scaled_values = values[:, 1:] / steady_state_vector  # Perform element-wise division
-
-        return pd.DataFrame(
-            scaled_values, 
-            index=X.index, 
-            columns=X.columns[1:]  # Remove first column name from new DataFrame
-        )
+        if isinstance(X, pd.DataFrame):
+            values = X.values  # Convert to NumPy array for efficiency
+            steady_state_vector = values[:, 0].reshape(-1, 1)  # Extract first column as divisor
+            scaled_values = values[:, 1:] / steady_state_vector  # Perform element-wise division
+
+            return pd.DataFrame(
+                scaled_values, 
+                index=X.index, 
+                columns=X.columns[1:]  # Remove first column name from new DataFrame
+            )
+        else:
+            steady_state_vector = X[:, 0].reshape(-1, 1)  # Extract first column as divisor
+            return X[:, 1:] / steady_state_vector  # Perform element-wise division
 
     @staticmethod
-    def _process_row(model, row):
-        """Helper function to apply model.transform to a single row"""
-        return model.transform(row.reshape(1, -1))
+    def _process_rows(model, X):
+        """Embed a batch of out-of-sample points with Nyström extension (see `HierarchicalNicheSpace._process_rows`)"""
+        return HierarchicalNicheSpace._process_rows(model, X)
 
     def _parallel_transform(self, X, model, progressbar_message=None):
-        """Parallelizes the transformation using joblib"""
+        """Parallelizes the batched transformation using joblib (rows are independent in the kNN kernel so batches are exact)"""
+        if isinstance(X, pd.DataFrame):
+            X = X.values
+        batch_size = max(1, getattr(self, "transform_batch_size", 1))
+        batches = range(0, X.shape[0], batch_size)
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, message="X does not have valid feature names")
-            output = joblib.Parallel(n_jobs=self.n_jobs, prefer="threads")(
-                joblib.delayed(self._process_row)(model, row.values) for id, row in tqdm(X.iterrows(), desc=progressbar_message, total=X.shape[0], position=0, leave=True)
+            output = joblib.Parallel(n_jobs=self.n_jobs, **getattr(self, "parallel_kws", dict(prefer="threads")))(
+                joblib.delayed(self._process_rows)(model, X[start:start + batch_size]) for start in tqdm(batches, desc=progressbar_message, total=len(batches), position=0, leave=True, unit=" batches")
             )
             return np.vstack(output)
         
@@ -572,6 +653,7 @@ class HierarchicalNicheSpace(object):
         parallel_backend=None,
         parallel_prefer="threads",
         parallel_kws:dict=None,
+        transform_batch_size:int=256,
 
         # Optuna
         n_trials=50,
@@ -580,12 +662,17 @@ class HierarchicalNicheSpace(object):
         initial_params:dict=None,
         objective_direction="maximize",
         checkpoint_directory=None,
+        groupby_cache_directory=None,
         study_timeout=None,
         study_callbacks=None,
+        time_penalty:float=None,
+        trial_time_budget:float=None,
+        trial_memory_budget:float=None,
         random_state=0,
         verbose=1,
         stream=sys.stdout,
         cast_as_float:bool=True,
+        memory_lean:bool=False,
 
         ):
         
@@ -613,6 +700,7 @@ class HierarchicalNicheSpace(object):
         )
         if parallel_kws:
             self.parallel_kws.update(parallel_kws)
+        self.transform_batch_size = transform_batch_size
         
         # Optuna
         self.n_jobs = n_jobs
@@ -620,6 +708,9 @@ class HierarchicalNicheSpace(object):
         self.n_concurrent_trials = n_concurrent_trials
         self.initial_params = initial_params
         self.checkpoint_directory = checkpoint_directory
+        if groupby_cache_directory is None:
+            groupby_cache_directory = checkpoint_directory
+        self.groupby_cache_directory = groupby_cache_directory
         self.random_state = random_state
         self.study_timeout = study_timeout
         if study_callbacks is None:
@@ -627,6 +718,11 @@ class HierarchicalNicheSpace(object):
         self.study_callbacks = study_callbacks
         self.objective_direction = objective_direction
 
+        # Cost-aware tuning
+        self.time_penalty = time_penalty
+        self.trial_time_budget = trial_time_budget
+        self.trial_memory_budget = trial_memory_budget
+
         # Hyperparameters
         self.is_tuned = True
         if isinstance(n_neighbors, list):
@@ -650,6 +746,7 @@ class HierarchicalNicheSpace(object):
         self.logger = build_logger(self.name, stream=stream)
         self.verbose = verbose
         self.cast_as_float = cast_as_float
+        self.memory_lean = memory_lean
         self.is_fitted = False
         
     def tune(
@@ -663,6 +760,7 @@ class HierarchicalNicheSpace(object):
         ):
 
         def _objective(trial):
+            monitor = None
             try:
 
                 # Compile parameters
@@ -679,6 +777,10 @@ class HierarchicalNicheSpace(object):
                 if n_neighbors >= X1.shape[0]:
                     return -1 #np.nan
                 else:
+                    # Skip configurations predicted to exceed the per-trial budget
+                    check_trial_budget(study, trial, params, trial_time_budget=self.trial_time_budget, trial_memory_budget=self.trial_memory_budget, logger=self.logger)
+                    monitor = TrialResourceMonitor(memory_tracker="rss" if self.trial_memory_budget is None else "tracemalloc").start()
+
                     # Build kernel
                     kernel = KNeighborsKernel( 
                         metric=self.kernel_distance_metric, 
@@ -701,13 +803,18 @@ class HierarchicalNicheSpace(object):
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Calculating silhouette score: n_neighbors={n_neighbors}, n_components={n_components}, alpha={alpha}")
                     score = silhouette_score(dmap_X[:,1:], y.values, metric=self.scoring_distance_metric, sample_size=None, random_state=None) # Ignore steady state vector
 
-                    return score
+                    return record_trial_cost(trial, score, monitor, study=study, direction=self.objective_direction, time_penalty=getattr(self, "time_penalty", None))
+
+            except optuna.TrialPruned:
+                raise
 
             except Exception as e:
                 self.logger.error(f"[Trial {trial.number}] Failed due to error: {e}. Marking as pruned.")
                 raise optuna.TrialPruned()  # Prevents skipping trials
 
             finally:
+                if monitor is not None:
+                    monitor.stop()
                 if self.checkpoint_directory:
                     joblib.dump(study, os.path.join(self.checkpoint_directory, f"{self.name}.Optuna.{self.__class__.__name__}.pkl"))  # Save checkpoint
 
@@ -775,176 +882,495 @@ class HierarchicalNicheSpace(object):
         copy=True,
         **study_kws,
         ):
+        # Memory-lean mode stores references to the filtered inputs once (instead of copies at entry and after filtering) 
+        # and shares the distance matrix with the kernel.  Inputs are not modified in place so this is safe unless 
+        # the caller modifies X, y1, y2, or distance_matrix after fitting.  `estimated_memory_savings_` is the sum of 
+        # the sizes of the copies that were skipped (an estimate, not measured) and `fit_peak_memory_` is measured.
+        monitor = TrialResourceMonitor().start()
+        estimated_memory_savings = 0
+        try:
+            # Check inputs
+            ys = [y1]
+            if y2 is not None:
+                ys.append(y2)
+            for i, y in enumerate(ys, start=1):
+                y_name = f"y{i}"
+                if not np.all(X.shape[0] == y.size):
+                    raise IndexError(f"X.shape[0] must equal {y_name}.size")
+                if not np.all(X.index == y.index):
+                    raise IndexError(f"X.index must equal {y_name}.index")
+
+                if self.memory_lean:
+                    estimated_memory_savings += self._get_nbytes(y)
+                else:
+                    setattr(self, f"{y_name}_", y.copy())
+            if self.memory_lean:
+                estimated_memory_savings += self._get_nbytes(X)
+            else:
+                self.X_ = X.copy()
+        
+            # Group values (cached by content if a cache directory is available)
+            X1 = cached_groupby(X, y1, method="sum", cache_directory=self.groupby_cache_directory, logger=self.logger if self.verbose > 0 else None)
+
+            if not set(X1.index) <= set(y1.unique()):
+                raise IndexError("X1.index must be ≤ y1 categories")
+            
+            # Minimum number of features
+            if self.minimum_nfeatures > 0:
+                if self.verbose > 0:
+                    self.logger.info(f"[Start] Filtering observations and classes below feature threshold: {self.minimum_nfeatures}")
+
+                number_of_features_per_class = (X1 > 0).sum(axis=1)
+                index_classes = number_of_features_per_class.index[number_of_features_per_class > self.minimum_nfeatures]
+
+                mask = y1.map(lambda x: x not in index_classes)
+                if mask.any():
+                    y1 = y1.loc[~mask]
+                    if y2 is not None:
+                        y2 = y2.loc[y1.index]
+                    X = X.loc[y1.index]
+                if self.verbose > 0:
+                    self.logger.info(f"[Dropping] N = {X1.shape[0] - len(index_classes)} y1 classes")
+                    self.logger.info(f"[Dropping] N = {sum(mask)} observations")
+                    self.logger.info(f"[Remaining] N = {y1.nunique()} y1 classes")
+                    if y2 is not None:
+                        self.logger.info(f"[Remaining] N = {y2.nunique()} y2 classes")
+                    self.logger.info(f"[Remaining] N = {X.shape[0]} observations")
+                    self.logger.info(f"[Remaining] N = {X.shape[1]} features")
+                    self.logger.info(f"[End] Filtering observations and classes below feature threshold")
+                X1 = X1.loc[index_classes]
+            
+            # Dtype
+            if self.kernel_distance_metric == "jaccard":
+                X = X.astype(bool)
+                X1 = X1.astype(bool)
+            
+            self.observations_ = X.index
+            self.observations1_ = X1.index
+            self.features_ = X.columns
+            
+            # Distance matrix
+            serialized_checkpoint_filepath = None
+            if self.checkpoint_directory:
+                serialized_checkpoint_filepath = os.path.join(self.checkpoint_directory, f"{self.name}.{self.__class__.__name__}.distance_matrix.parquet")
+                if os.path.exists(serialized_checkpoint_filepath):
+                    self.logger.info(f"Loading distance matrix from checkpoint: {serialized_checkpoint_filepath}")
+                    distance_matrix = pd.read_parquet(serialized_checkpoint_filepath).values
+                
+            if distance_matrix is None:
+                if self.verbose > 0:
+                    self.logger.info("[Start] Processing distance matrix")
+                if self.kernel_distance_metric == "euclidean":
+                    distance_matrix = squareform(pdist(X1, metric=self.kernel_distance_metric))
+                else:
+                    distance_matrix = pairwise_distances(X=X1.values, metric=self.kernel_distance_metric, n_jobs=self.n_jobs)
+            if len(distance_matrix.shape) == 1:
+                distance_matrix = squareform(distance_matrix)
+            if not distance_matrix.shape[0] == X1.shape[0]:
+                raise ValueError(f"distance_matrix.shape[0] ({distance_matrix.shape[0]}) does not match X1.shape[0] ({X1.shape[0]}).  This may be a result of automatic filtering.  If so, please filter before providing input or do not provide distance matrix")
+            if serialized_checkpoint_filepath:
+                if not os.path.exists(serialized_checkpoint_filepath):
+                    self.logger.info(f"Writing distance matrix checkpoint: {serialized_checkpoint_filepath}")
+                    pd.DataFrame(distance_matrix, index=X1.index, columns=X1.index).to_parquet(serialized_checkpoint_filepath, index=True)
+            if self.verbose > 0:
+                self.logger.info("[End] Processing distance matrix")
+            
+            # Cast as float
+            if self.cast_as_float: # Decrease overhead for parallel transform
+                X = X.astype(float)
+                X1 = X1.astype(float)
+
+            # Store
+            if not isinstance(y1.dtype, pd.CategoricalDtype):
+                y1 = y1.astype("category")
+            self.classes1_ = y1.cat.categories
+
+            if y2 is not None:
+                if not isinstance(y2.dtype, pd.CategoricalDtype):
+                    y2 = y2.astype("category")
+                self.classes2_ = y2.cat.categories
+
+            if self.memory_lean:
+                self.X_ = X
+                self.y1_ = y1
+                if y2 is not None:
+                    self.y2_ = y2
+                self.X1_ = X1
+                if copy:
+                    estimated_memory_savings += sum(map(self._get_nbytes, [X, y1, y2, X1]))
+            elif copy:
+                self.X_ = X.copy()
+                self.y1_ = y1.copy()
+                if y2 is not None:
+                    self.y2_ = y2.copy()
+                self.X1_ = X1.copy()
+        
+            if self.memory_lean:
+                y = y2 if y2 is not None else y1
+                estimated_memory_savings += self._get_nbytes(y)
+            elif y2 is not None:
+                y = self.y2_.copy()
+            else:
+                y = self.y1_.copy()
+            # Tune
+            if not self.is_tuned:
+                if self.verbose > 0:
+                    self.logger.info("[Begin] Hyperparameter Tuning")
+
+                self.study_ = self.tune(
+                    X=X,
+                    y=y,
+                    X1=X1,
+                    distance_matrix=distance_matrix,
+                    sampler=sampler, 
+                    **study_kws,
+                    )
+                for k, v in self.study_.best_params.items():
+                    setattr(self,k,v)
+                if self.verbose > 0:
+                    self.logger.info(f"Tuned parameters (Score={self.study_.best_trial.user_attrs.get('score', self.study_.best_value)}): {self.study_.best_params}")
+                    self.logger.info("[End] Hyperparameter Tuning")
+                self.is_tuned = True
+            
+            # Build kernel
+            self.kernel_ = KNeighborsKernel( 
+                metric=self.kernel_distance_metric, 
+                n_neighbors=self.n_neighbors, 
+                distance_matrix=distance_matrix, 
+                copy_distance_matrix=not self.memory_lean,
+            )
+            if self.memory_lean:
+                estimated_memory_savings += self._get_nbytes(distance_matrix)
+
+            # Calculate Diffusion Maps using KNeighbors
+            self.model_ = DiffusionMaps(kernel=self.kernel_, n_eigenpairs=self.n_components+1, alpha=self.alpha)
+        
+            # Fit
+            dmap = self.model_.fit(X1.values)
+
+            # Grouped
+            if self.robust_transform:
+                dmap = self._parallel_transform(X1, self.model_, progressbar_message=f"[Parallel Transformation] Grouped data") # More accurate to recalculate
+            self.diffusion_coordinates_grouped_ = pd.DataFrame(dmap, index=X1.index)
+            self.diffusion_coordinates_grouped_.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
+            self.diffusion_coordinates_grouped_.index.name = self.class1_type
+            self.diffusion_coordinates_grouped_.columns.name = self.feature_type
+
+            # Complete
+            dmap = self._parallel_transform(X, self.model_, progressbar_message=f"[Parallel Transformation] Initial data")
+            self.diffusion_coordinates_initial_ = pd.DataFrame(dmap, index=X.index)
+            self.diffusion_coordinates_initial_.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
+            self.diffusion_coordinates_initial_.index.name = self.observation_type
+            self.diffusion_coordinates_initial_.columns.name = self.feature_type
+
+            # Scale
+            if self.scale_by_steadystate:
+                if self.verbose > 0: self.logger.info("Scaling embeddings by steady-state vector")
+                self.diffusion_coordinates_grouped_ = self._scale_by_first_column(self.diffusion_coordinates_grouped_)
+                self.diffusion_coordinates_initial_ = self._scale_by_first_column(self.diffusion_coordinates_initial_)
+                # Score
+                if self.verbose > 0: self.logger.info("Calculating silhouette score for initial data")
+                self.score_ = silhouette_score(self.diffusion_coordinates_initial_.values, y.values, metric=self.scoring_distance_metric, sample_size=None, random_state=self.random_state)
+            else:
+                # Score
+                if self.verbose > 0: self.logger.info("Calculating silhouette score for initial data excluding steady-state vector")
+                self.score_ = silhouette_score(self.diffusion_coordinates_initial_.values[:,1:], y.values, metric=self.scoring_distance_metric, sample_size=None, random_state=self.random_state)
+        finally:
+            monitor.stop()
+
+        # Memory
+        self.fit_peak_memory_ = monitor.peak_memory_
+        self.estimated_memory_savings_ = estimated_memory_savings
+        if self.verbose > 0:
+            if self.fit_peak_memory_ is not None:
+                self.logger.info(f"Peak memory during fit: {self.fit_peak_memory_/1024**2:.1f} MB")
+            if self.memory_lean:
+                self.logger.info(f"Memory-lean fit avoided an estimated {self.estimated_memory_savings_/1024**2:.1f} MB of input copies")
+        self.is_fitted = True
+
+        return self
+
+    def update(
+        self,
+        X:pd.DataFrame,
+        y1:pd.Series,
+        y2:pd.Series=None,
+        reproject_observations:bool=True,
+        tol:float=1e-6,
+        maxiter:int=500,
+        drift_threshold:float=0.1,
+        ):
+        """
+        Add observations (new y1 classes or new members of fitted classes) to a fitted model without refitting.
+
+        Only the distance matrix rows of added and changed classes are computed (updated × all), the kNN graph is 
+        updated locally (see `update_kneighbors_graph`), and the eigenpairs are refreshed with LOBPCG warm-started 
+        from the previous eigenvectors (Nyström extension for added classes).  If LOBPCG does not converge within 
+        `tol`, the eigenproblem is solved from scratch.  Hyperparameters are not re-tuned and `score_` is from the 
+        last `.fit`.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            New observations with the fitted features
+        y1 : pd.Series
+            Classes of the new observations (classes below `minimum_nfeatures` are dropped)
+        y2 : pd.Series
+            Required if the model was fit with y2
+        reproject_observations : bool
+            Re-project the previous observations with the updated model (requires `X_`).  If False, 
+            previous coordinates are kept as is.
+        tol : float
+            LOBPCG tolerance and maximum residual norm accepted for the warm-started eigenpairs
+        maxiter : int
+            Maximum number of LOBPCG iterations
+        drift_threshold : float
+            Log a warning to refit when the relative change of the grouped embedding exceeds this value
+
+        Returns
+        -------
+        self
+            `drift_` is the relative Frobenius norm change of the previous classes' grouped coordinates and 
+            `update_report_` has eigenvalue drift, solver, and counts
+        """
+        if not self.is_fitted:
+            raise Exception("Please run .fit to build DiffusionMap model before continuing")
 
         # Check inputs
         ys = [y1]
         if y2 is not None:
             ys.append(y2)
+        elif hasattr(self, "y2_"):
+            raise ValueError("y2 is required because the model was fit with y2")
         for i, y in enumerate(ys, start=1):
             y_name = f"y{i}"
             if not np.all(X.shape[0] == y.size):
                 raise IndexError(f"X.shape[0] must equal {y_name}.size")
             if not np.all(X.index == y.index):
                 raise IndexError(f"X.index must equal {y_name}.index")
+        if np.any(X.columns != self.features_):
+            raise ValueError("X features must match fitted features")
+        if X.index.isin(self.observations_).any():
+            raise IndexError("X.index must not contain fitted observations")
+        y1 = pd.Series(np.asarray(y1), index=y1.index)
 
-            setattr(self, f"{y_name}_", y.copy())
-        self.X_ = X.copy()
-        
         # Group values
-        X1 = fast_groupby(X, y1, method="sum")
+        X1_update = fast_groupby(X, y1, method="sum")
+        is_existing = X1_update.index.isin(self.observations1_)
+        existing_classes = X1_update.index[is_existing]
+        new_classes = X1_update.index[~is_existing]
+        new_values = X1_update.loc[new_classes].values
 
-        if not set(X1.index) <= set(y1.unique()):
-            raise IndexError("X1.index must be ≤ y1 categories")
-            
-        # Minimum number of features
+        # Minimum number of features (added classes only)
         if self.minimum_nfeatures > 0:
-            if self.verbose > 0:
-                self.logger.info(f"[Start] Filtering observations and classes below feature threshold: {self.minimum_nfeatures}")
-
-            number_of_features_per_class = (X1 > 0).sum(axis=1)
-            index_classes = number_of_features_per_class.index[number_of_features_per_class > self.minimum_nfeatures]
-
-            mask = y1.map(lambda x: x not in index_classes)
-            y1 = y1.loc[~mask]
-            if y2 is not None:
-                y2 = y2.loc[y1.index]
-            X = X.loc[y1.index]
-            if self.verbose > 0:
-                self.logger.info(f"[Dropping] N = {X1.shape[0] - len(index_classes)} y1 classes")
-                self.logger.info(f"[Dropping] N = {sum(mask)} observations")
-                self.logger.info(f"[Remaining] N = {y1.nunique()} y1 classes")
+            mask_classes = (new_values > 0).sum(axis=1) > self.minimum_nfeatures
+            if not np.all(mask_classes):
+                mask = y1.isin(new_classes[~mask_classes])
+                if self.verbose > 0:
+                    self.logger.info(f"[Dropping] N = {np.sum(~mask_classes)} y1 classes below feature threshold: {self.minimum_nfeatures}")
+                    self.logger.info(f"[Dropping] N = {mask.sum()} observations")
+                y1 = y1.loc[~mask]
                 if y2 is not None:
-                    self.logger.info(f"[Remaining] N = {y2.nunique()} y2 classes")
-                self.logger.info(f"[Remaining] N = {X.shape[0]} observations")
-                self.logger.info(f"[Remaining] N = {X.shape[1]} features")
-                self.logger.info(f"[End] Filtering observations and classes below feature threshold")
-            X1 = X1.loc[index_classes]
-            
-        # Dtype
+                    y2 = y2.loc[y1.index]
+                X = X.loc[y1.index]
+                new_classes = new_classes[mask_classes]
+                new_values = new_values[mask_classes]
+
+        # Updated grouped matrix (previous classes keep their positions)
+        X_fit = np.asarray(self.model_.X_fit_)
+        n_previous = X_fit.shape[0]
+        positions = self.observations1_.get_indexer(existing_classes)
+        changed_values = X_fit[positions] + X1_update.loc[existing_classes].values
+        if self.kernel_distance_metric == "jaccard":
+            changed_values = changed_values > 0
+            new_values = new_values > 0
+        X1_values = np.vstack([X_fit, new_values.astype(X_fit.dtype)])
+        X1_values[positions] = changed_values.astype(X_fit.dtype)
+        is_changed = np.any(X1_values[positions] != X_fit[positions], axis=1)
+        updated_nodes = np.concatenate([positions[is_changed], np.arange(n_previous, X1_values.shape[0])])
+        X1_index = self.observations1_.append(new_classes)
+
+        # Observations
         if self.kernel_distance_metric == "jaccard":
             X = X.astype(bool)
-            X1 = X1.astype(bool)
-            
-        self.observations_ = X.index
-        self.observations1_ = X1.index
-        self.features_ = X.columns
-            
-        # Distance matrix
-        serialized_checkpoint_filepath = None
-        if self.checkpoint_directory:
-            serialized_checkpoint_filepath = os.path.join(self.checkpoint_directory, f"{self.name}.{self.__class__.__name__}.distance_matrix.parquet")
-            if os.path.exists(serialized_checkpoint_filepath):
-                self.logger.info(f"Loading distance matrix from checkpoint: {serialized_checkpoint_filepath}")
-                distance_matrix = pd.read_parquet(serialized_checkpoint_filepath).values
-                
-        if distance_matrix is None:
-            if self.verbose > 0:
-                self.logger.info("[Start] Processing distance matrix")
-            if self.kernel_distance_metric == "euclidean":
-                distance_matrix = squareform(pdist(X1, metric=self.kernel_distance_metric))
-            else:
-                distance_matrix = pairwise_distances(X=X1.values, metric=self.kernel_distance_metric, n_jobs=self.n_jobs)
-        if len(distance_matrix.shape) == 1:
-            distance_matrix = squareform(distance_matrix)
-        if not distance_matrix.shape[0] == X1.shape[0]:
-            raise ValueError(f"distance_matrix.shape[0] ({distance_matrix.shape[0]}) does not match X1.shape[0] ({X1.shape[0]}).  This may be a result of automatic filtering.  If so, please filter before providing input or do not provide distance matrix")
-        if serialized_checkpoint_filepath:
-            if not os.path.exists(serialized_checkpoint_filepath):
-                self.logger.info(f"Writing distance matrix checkpoint: {serialized_checkpoint_filepath}")
-                pd.DataFrame(distance_matrix, index=X1.index, columns=X1.index).to_parquet(serialized_checkpoint_filepath, index=True)
-        if self.verbose > 0:
-            self.logger.info("[End] Processing distance matrix")
-            
-        # Cast as float
-        if self.cast_as_float: # Decrease overhead for parallel transform
+        if self.cast_as_float:
             X = X.astype(float)
-            X1 = X1.astype(float)
-
-        # Store
-        if not isinstance(y1, pd.CategoricalDtype):
-            y1 = y1.astype("category")
-        self.classes1_ = y1.cat.categories
 
-        if y2 is not None:
-            if not isinstance(y2, pd.CategoricalDtype):
-                y2 = y2.astype("category")
-            self.classes2_ = y2.cat.categories
+        update_report = dict(
+            n_added_observations=X.shape[0],
+            n_added_classes=len(new_classes),
+            n_changed_classes=int(is_changed.sum()),
+            eigensolver=None,
+            eigenvalue_drift=0.0,
+        )
 
-        if copy:
-            self.X_ = X.copy()
-            self.y1_ = y1.copy()
-            if y2 is not None:
-                self.y2_ = y2.copy()
-            self.X1_ = X1.copy()
-        
-        if y2 is not None:
-            y = self.y2_.copy()
-        else:
-            y = self.y1_.copy()
-        # Tune
-        if not self.is_tuned:
+        if updated_nodes.size:
+            # Distance matrix (only updated rows)
             if self.verbose > 0:
-                self.logger.info("[Begin] Hyperparameter Tuning")
-
-            self.study_ = self.tune(
-                X=X,
-                y=y,
-                X1=X1,
-                distance_matrix=distance_matrix,
-                sampler=sampler, 
-                **study_kws,
+                self.logger.info(f"[Start] Processing distance matrix rows for N = {updated_nodes.size} added or changed y1 classes")
+            distance_matrix_previous = self.kernel_.distance_matrix
+            n = X1_values.shape[0]
+            distance_matrix = np.empty((n, n), dtype=distance_matrix_previous.dtype)
+            distance_matrix[:n_previous,:n_previous] = distance_matrix_previous
+            if self.kernel_distance_metric == "euclidean":
+                distance_matrix_updated = cdist(X1_values[updated_nodes], X1_values, metric=self.kernel_distance_metric)
+            else:
+                distance_matrix_updated = pairwise_distances(X=X1_values[updated_nodes], Y=X1_values, metric=self.kernel_distance_metric, n_jobs=self.n_jobs)
+            distance_matrix[updated_nodes] = distance_matrix_updated
+            distance_matrix[:,updated_nodes] = distance_matrix_updated.T
+            if self.verbose > 0:
+                self.logger.info("[End] Processing distance matrix rows")
+
+            # kNN graph
+            kernel = KNeighborsKernel( 
+                metric=self.kernel_distance_metric, 
+                n_neighbors=self.n_neighbors, 
+                distance_matrix=distance_matrix, 
+                copy_distance_matrix=False,
+            )
+            connectivities_previous = getattr(self.model_._dmap_kernel.internal_kernel, "connectivities_", None)
+            if connectivities_previous is not None:
+                connectivities = update_kneighbors_graph(connectivities_previous, distance_matrix, n_neighbors=self.n_neighbors, updated_nodes=updated_nodes)
+                kernel.connectivities_ = connectivities.copy()
+            else:
+                if self.verbose > 0:
+                    self.logger.info("Previous kNN graph is not available.  Recomputing kNN graph from updated distance matrix")
+                connectivities = kernel.evaluate(distance_matrix, is_pdist=True)
+
+            # Diffusion Maps kernel (same steps as DiffusionMaps.fit without solving the eigenproblem)
+            model = DiffusionMaps(kernel=kernel, n_eigenpairs=self.n_components+1, alpha=self.alpha)
+            model._validate_settings()
+            X1_values = model._validate_datafold_data(X=X1_values, ensure_min_samples=max(2, model.n_eigenpairs))
+            model._setup_feature_attrs_fit(X1_values)
+            model._dmap_kernel = DmapKernelFixed(
+                internal_kernel=kernel,
+                is_stochastic=model.is_stochastic,
+                alpha=model.alpha,
+                symmetrize_kernel=model.symmetrize_kernel,
+            )
+            model.X_fit_ = X1_values
+            kernel_matrix = model._dmap_kernel._eval_kernel_matrix(connectivities, is_pdist=True)
+
+            # Warm start: previous eigenvectors and Nyström extension for added classes
+            eigenvectors_previous = np.asarray(self.model_.eigenvectors_)
+            eigenvectors_initial = np.empty((X1_values.shape[0], eigenvectors_previous.shape[1]))
+            eigenvectors_initial[:n_previous] = eigenvectors_previous
+            if X1_values.shape[0] > n_previous:
+                eigenvectors_initial[n_previous:] = self.model_._nystrom(
+                    self.model_._dmap_kernel(self.model_.X_fit_, X1_values[n_previous:]),
+                    eigvec=eigenvectors_previous,
+                    eigvals=self.model_.eigenvalues_,
+                    index_from=None,
                 )
-            for k, v in self.study_.best_params.items():
-                setattr(self,k,v)
             if self.verbose > 0:
-                self.logger.info(f"Tuned parameters (Score={self.study_.best_value}): {self.study_.best_params}")
-                self.logger.info("[End] Hyperparameter Tuning")
-            self.is_tuned = True
-            
-        # Build kernel
-        self.kernel_ = KNeighborsKernel( 
-            metric=self.kernel_distance_metric, 
-            n_neighbors=self.n_neighbors, 
-            distance_matrix=distance_matrix, 
-            copy_distance_matrix=True,
-        )
-
-        # Calculate Diffusion Maps using KNeighbors
-        self.model_ = DiffusionMaps(kernel=self.kernel_, n_eigenpairs=self.n_components+1, alpha=self.alpha)
-        
-        # Fit
-        dmap = self.model_.fit(X1.values)
+                self.logger.info("[Start] Refreshing eigenpairs")
+            eigenvalues, eigenvectors, update_report["eigensolver"] = self._solve_eigenproblem_warm_start(model, kernel_matrix, eigenvectors_initial, tol=tol, maxiter=maxiter)
+            if self.verbose > 0:
+                self.logger.info(f"[End] Refreshing eigenpairs ({update_report['eigensolver']})")
 
-        # Grouped
-        if self.robust_transform:
-            dmap = self._parallel_transform(X1, self.model_, progressbar_message=f"[Parallel Transformation] Grouped data") # More accurate to recalculate
-        self.diffusion_coordinates_grouped_ = pd.DataFrame(dmap, index=X1.index)
-        self.diffusion_coordinates_grouped_.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
-        self.diffusion_coordinates_grouped_.index.name = self.class1_type
-        self.diffusion_coordinates_grouped_.columns.name = self.feature_type
+            # Align signs with the previous eigenvectors
+            signs = np.sign(np.sum(eigenvectors[:n_previous] * eigenvectors_previous, axis=0))
+            signs[signs == 0] = 1
+            model.eigenvalues_ = eigenvalues
+            model.eigenvectors_ = eigenvectors * signs
+            update_report["eigenvalue_drift"] = float(np.max(np.abs(eigenvalues - self.model_.eigenvalues_)))
 
-        # Complete
-        dmap = self._parallel_transform(X, self.model_, progressbar_message=f"[Parallel Transformation] Initial data")
-        self.diffusion_coordinates_initial_ = pd.DataFrame(dmap, index=X.index)
-        self.diffusion_coordinates_initial_.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
-        self.diffusion_coordinates_initial_.index.name = self.observation_type
-        self.diffusion_coordinates_initial_.columns.name = self.feature_type
+            self.kernel_ = kernel
+            self.model_ = model
 
-        # Scale
-        if self.scale_by_steadystate:
-            if self.verbose > 0: self.logger.info("Scaling embeddings by steady-state vector")
-            self.diffusion_coordinates_grouped_ = self._scale_by_first_column(self.diffusion_coordinates_grouped_)
-            self.diffusion_coordinates_initial_ = self._scale_by_first_column(self.diffusion_coordinates_initial_)
-            # Score
-            if self.verbose > 0: self.logger.info("Calculating silhouette score for initial data")
-            self.score_ = silhouette_score(self.diffusion_coordinates_initial_.values, y.values, metric=self.scoring_distance_metric, sample_size=None, random_state=self.random_state)
+        # Grouped
+        if updated_nodes.size and self.robust_transform:
+            dmap = self._parallel_transform(X1_values, self.model_, progressbar_message=f"[Parallel Transformation] Grouped data")
         else:
-            # Score
-            if self.verbose > 0: self.logger.info("Calculating silhouette score for initial data excluding steady-state vector")
-            self.score_ = silhouette_score(self.diffusion_coordinates_initial_.values[:,1:], y.values, metric=self.scoring_distance_metric, sample_size=None, random_state=self.random_state)
-        self.is_fitted = True
+            dmap = self.model_._perform_dmap_embedding(np.asarray(self.model_.eigenvectors_))
+        diffusion_coordinates_grouped = self._format_diffusion_coordinates(dmap, index=X1_index)
+        diffusion_coordinates_grouped.index.name = self.class1_type
+
+        # Drift
+        previous = self.diffusion_coordinates_grouped_
+        current = diffusion_coordinates_grouped.loc[previous.index]
+        self.drift_ = float(np.linalg.norm(current.values - previous.values) / np.linalg.norm(previous.values))
+        update_report["drift"] = self.drift_
+        self.update_report_ = update_report
+        if self.verbose > 0:
+            self.logger.info(f"Update: {update_report}")
+            if self.drift_ > drift_threshold:
+                self.logger.warning(f"Embedding drift ({self.drift_:.4f}) exceeds drift_threshold ({drift_threshold}).  Refitting with .fit is recommended")
+        self.diffusion_coordinates_grouped_ = diffusion_coordinates_grouped
+
+        # Observations
+        diffusion_coordinates_added = self._format_diffusion_coordinates(self._parallel_transform(X, self.model_, progressbar_message=f"[Parallel Transformation] Added data"), index=X.index)
+        diffusion_coordinates_previous = self.diffusion_coordinates_initial_
+        if updated_nodes.size and reproject_observations:
+            if hasattr(self, "X_"):
+                X_previous = self.X_.loc[self.observations_]
+                diffusion_coordinates_previous = self._format_diffusion_coordinates(self._parallel_transform(X_previous, self.model_, progressbar_message=f"[Parallel Transformation] Initial data"), index=self.observations_)
+            elif self.verbose > 0:
+                self.logger.warning("X_ is not available (fit with copy=False) so previous observations were not re-projected")
+        self.diffusion_coordinates_initial_ = pd.concat([diffusion_coordinates_previous, diffusion_coordinates_added], axis=0)
+
+        # Store
+        self.observations_ = self.observations_.append(X.index)
+        self.observations1_ = X1_index
+        self.classes1_ = self.classes1_.append(pd.Index(new_classes).difference(self.classes1_))
+        if hasattr(self, "X_"):
+            self.X_ = pd.concat([self.X_, X], axis=0)
+        if hasattr(self, "X1_"):
+            self.X1_ = pd.DataFrame(X1_values, index=X1_index, columns=self.features_)
+        if hasattr(self, "y1_"):
+            self.y1_ = pd.concat([self.y1_.astype(object), y1.astype(object)]).astype("category")
+        if y2 is not None:
+            self.classes2_ = self.classes2_.append(pd.Index(y2.unique()).difference(self.classes2_))
+            if hasattr(self, "y2_"):
+                self.y2_ = pd.concat([self.y2_.astype(object), y2.astype(object)]).astype("category")
 
         return self
+
+    @staticmethod
+    def _solve_eigenproblem_warm_start(model, kernel_matrix, eigenvectors_initial, tol:float=1e-6, maxiter:int=500):
+        """
+        Solve the (conjugate) diffusion kernel eigenproblem with LOBPCG from initial eigenvectors and fall back 
+        to the solver used by DiffusionMaps.fit if the residuals are above `tol`.
+
+        Returns
+        -------
+        eigenvalues, eigenvectors, solver
+        """
+        dmap_kernel = model._dmap_kernel
+        if dmap_kernel.is_conjugate and sps.issparse(kernel_matrix):
+            # Previous eigenvectors in the basis of the symmetric conjugate matrix
+            basis_change_matrix = dmap_kernel.basis_change_matrix_
+            X0 = eigenvectors_initial / basis_change_matrix.diagonal()[:,None]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                eigenvalues, eigenvectors = lobpcg(kernel_matrix, X0, largest=True, tol=tol, maxiter=maxiter)
+            residuals = np.linalg.norm(kernel_matrix @ eigenvectors - eigenvectors * eigenvalues, axis=0)
+            if np.all(np.isfinite(residuals)) and np.max(residuals) <= tol:
+                order = np.argsort(-eigenvalues)
+                eigenvalues = eigenvalues[order]
+                eigenvectors = basis_change_matrix @ eigenvectors[:,order]
+                eigenvectors /= np.linalg.norm(eigenvectors, axis=0)[np.newaxis, :]
+                return eigenvalues, eigenvectors, "lobpcg"
+
+        eigenvalues, eigenvectors = _DmapKernelAlgorithms.solve_eigenproblem(
+            kernel=dmap_kernel,
+            kernel_matrix=kernel_matrix,
+            n_eigenpairs=model.n_eigenpairs,
+        )
+        return eigenvalues, np.asarray(eigenvectors), "eigsh"
+
+    @staticmethod
+    def _get_nbytes(obj):
+        """Shallow size in bytes of a pd.DataFrame, pd.Series, or array (0 for None)"""
+        if obj is None:
+            return 0
+        if isinstance(obj, pd.DataFrame):
+            return int(obj.memory_usage(index=True, deep=False).sum())
+        if isinstance(obj, pd.Series):
+            return int(obj.memory_usage(index=True, deep=False))
+        if sps.issparse(obj):
+            return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+        return int(np.asarray(obj).nbytes)
     
     def transform(
         self,
@@ -963,19 +1389,127 @@ class HierarchicalNicheSpace(object):
                 
         dmap = self._parallel_transform(X, self.model_, progressbar_message=progressbar_message)
         if isinstance(X, pd.DataFrame):
-
-            X_dmap = pd.DataFrame(dmap, index=X.index)
-            X_dmap.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
-            X_dmap.index.name = self.observation_type
-            X_dmap.columns.name = self.feature_type
-            if self.scale_by_steadystate:
-                X_dmap = self._scale_by_first_column(X_dmap)
-            return X_dmap
+            return self._format_diffusion_coordinates(dmap, index=X.index)
         else:
             if self.scale_by_steadystate:
                 dmap = self._scale_by_first_column(dmap)
             return dmap
-        
+
+    def transform_iter(
+        self,
+        X,
+        block_size:int=10000,
+        progressbar_message=None,
+        ):
+        """
+        Project observations in row blocks so memory is bounded by the block size.
+
+        Parameters
+        ----------
+        X : pd.DataFrame, np.ndarray, np.memmap, or str
+            Observations with the fitted features.  Filepaths can be .npy (memory-mapped) or .parquet 
+            (read one row group at a time with fastparquet and split into blocks)
+        block_size : int
+            Maximum number of observations per block
+
+        Yields
+        ------
+        pd.DataFrame
+            Diffusion coordinates of each block (scaled by the steady-state vector if scale_by_steadystate=True)
+        """
+        if not self.is_fitted:
+            raise Exception("Please run .fit to build DiffusionMap model before continuing")
+        for i, (index, values) in enumerate(self._iter_row_blocks(X, block_size=block_size, features=self.features_)):
+            if values.shape[1] != len(self.features_):
+                raise ValueError("Number of X features must match number of fitted features")
+            dmap = self._parallel_transform(values, self.model_, progressbar_message=f"{progressbar_message} [Block {i}]" if progressbar_message else None)
+            yield self._format_diffusion_coordinates(dmap, index=index)
+
+    def transform_to_file(
+        self,
+        X,
+        filepath:str,
+        block_size:int=10000,
+        progressbar_message=None,
+        ):
+        """
+        Project observations in row blocks (see `transform_iter`) and append each block to a .parquet (fastparquet) 
+        or .npy (memory-mapped, rows in input order) file.
+
+        Returns
+        -------
+        str
+            filepath
+        """
+        if filepath.endswith(".npy"):
+            n_observations = self._get_number_of_rows(X)
+            n_coordinates = self.n_components + int(not self.scale_by_steadystate)
+            output = np.lib.format.open_memmap(filepath, mode="w+", dtype=float, shape=(n_observations, n_coordinates))
+            start = 0
+            for X_dmap in self.transform_iter(X, block_size=block_size, progressbar_message=progressbar_message):
+                output[start:start + X_dmap.shape[0]] = X_dmap.values
+                start += X_dmap.shape[0]
+            output.flush()
+            del output
+        elif filepath.endswith(".parquet"):
+            import fastparquet
+            for i, X_dmap in enumerate(self.transform_iter(X, block_size=block_size, progressbar_message=progressbar_message)):
+                X_dmap.columns = X_dmap.columns.astype(str)
+                fastparquet.write(filepath, X_dmap, write_index=True, append=i > 0)
+        else:
+            raise ValueError("filepath must end with .parquet or .npy")
+        if self.verbose > 0:
+            self.logger.info(f"Wrote diffusion coordinates: {filepath}")
+        return filepath
+
+    def _format_diffusion_coordinates(self, dmap, index):
+        X_dmap = pd.DataFrame(dmap, index=index)
+        X_dmap.columns = [f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,dmap.shape[1])))
+        X_dmap.index.name = self.observation_type
+        X_dmap.columns.name = self.feature_type
+        if self.scale_by_steadystate:
+            X_dmap = self._scale_by_first_column(X_dmap)
+        return X_dmap
+
+    @staticmethod
+    def _get_number_of_rows(X):
+        if isinstance(X, str):
+            if X.endswith(".parquet"):
+                import fastparquet
+                return fastparquet.ParquetFile(X).count()
+            return np.load(X, mmap_mode="r").shape[0]
+        return X.shape[0]
+
+    @staticmethod
+    def _iter_row_blocks(X, block_size:int, features=None):
+        """
+        Yield (index, values) row blocks from a pd.DataFrame, np.ndarray, np.memmap, or .npy/.parquet filepath.
+        """
+        if isinstance(X, str):
+            if X.endswith(".parquet"):
+                import fastparquet
+                parquet = fastparquet.ParquetFile(X)
+                columns = [str(feature) for feature in features] if features is not None else None
+                for df in parquet.iter_row_groups(columns=columns):
+                    for start in range(0, df.shape[0], block_size):
+                        block = df.iloc[start:start + block_size]
+                        yield block.index, block.to_numpy()
+                return
+            elif X.endswith(".npy"):
+                X = np.load(X, mmap_mode="r")
+            else:
+                raise ValueError("X filepath must end with .parquet or .npy")
+
+        if isinstance(X, pd.DataFrame):
+            if features is not None:
+                if np.any(X.columns != features):
+                    raise ValueError("X features must match fitted features")
+            for start in range(0, X.shape[0], block_size):
+                block = X.iloc[start:start + block_size]
+                yield block.index, block.to_numpy()
+        else:
+            for start in range(0, X.shape[0], block_size):
+                yield pd.RangeIndex(start, min(start + block_size, X.shape[0])), np.asarray(X[start:start + block_size])
         
     def get_basis(self):
         if not self.is_fitted:
@@ -1026,7 +1560,12 @@ class HierarchicalNicheSpace(object):
     
     @staticmethod
     def _process_row(model, row):
-        r"""Embed out-of-sample points with Nyström extension.
+        """Embed a single out-of-sample point with Nyström extension (see `_process_rows`)"""
+        return HierarchicalNicheSpace._process_rows(model, row.reshape(1,-1))
+
+    @staticmethod
+    def _process_rows(model, X):
+        r"""Embed a batch of out-of-sample points with Nyström extension.
 
         From solving the eigenproblem of the diffusion kernel :math:`K`
         (:class:`.DmapKernelFixed`)
@@ -1055,7 +1594,6 @@ class HierarchicalNicheSpace(object):
         TSCDataFrame, pandas.DataFrame, numpy.ndarray
             same type as `X` of shape `(n_samples, n_coords)`
         """
-        X = row.reshape(1,-1)
         # check_is_fitted(model, ("X_fit_", "eigenvalues_", "eigenvectors_"))
 
         # X = model._validate_datafold_data(X)
@@ -1088,13 +1626,15 @@ class HierarchicalNicheSpace(object):
         return model._perform_dmap_embedding(eigvec_nystroem)
 
     def _parallel_transform(self, X, model, progressbar_message=None):
-        """Parallelizes the transformation using joblib"""
+        """Parallelizes the batched transformation using joblib (rows are independent in the kNN kernel so batches are exact)"""
         if isinstance(X, pd.DataFrame):
             X = X.values
+        batch_size = max(1, getattr(self, "transform_batch_size", 1))
+        batches = range(0, X.shape[0], batch_size)
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, message="X does not have valid feature names")
             output = joblib.Parallel(n_jobs=self.n_jobs, **self.parallel_kws)(
-                joblib.delayed(self._process_row)(model, row) for row in tqdm(X, desc=progressbar_message, total=X.shape[0], position=0, leave=True)
+                joblib.delayed(self._process_rows)(model, X[start:start + batch_size]) for start in tqdm(batches, desc=progressbar_message, total=len(batches), position=0, leave=True, unit=" batches")
             )
             return np.vstack(output)
 
@@ -1106,6 +1646,68 @@ class HierarchicalNicheSpace(object):
     def to_file(self, filepath):
         write_pickle(self, filepath)
 
+    def export_inference_model(self, directory:str):
+        """
+        Write the minimal state required for out-of-sample projection (see `HierarchicalNicheSpaceInferenceModel`).
+
+        Files
+        -----
+        manifest.json
+            kernel_distance_metric, n_neighbors, alpha, scale_by_steadystate, features, and output columns
+        X_fit.npy
+            Grouped observations the kernel was fit on (bool for jaccard)
+        nystrom_basis.npy
+            Selected eigenvectors scaled by eigenvalues**(time_exponent - 1) so Nyström is a single product
+        row_sums_alpha.npy
+            Sampling density normalization of the fitted kernel (only if alpha > 0)
+
+        Returns
+        -------
+        str
+            directory
+        """
+        if not self.is_fitted:
+            raise Exception("Please run .fit to build DiffusionMap model before continuing")
+        os.makedirs(directory, exist_ok=True)
+
+        model = self.model_
+        eigvec, eigvals = model._select_eigenpairs_target_coords()
+        eigvec = np.asarray(eigvec)
+        eigvals = np.asarray(eigvals)
+        if model.time_exponent == 0:
+            basis = eigvec / eigvals
+        else:
+            basis = eigvec * np.power(eigvals, model.time_exponent - 1)
+        np.save(os.path.join(directory, "nystrom_basis.npy"), basis)
+
+        X_fit = np.asarray(model.X_fit_)
+        if self.kernel_distance_metric == "jaccard":
+            X_fit = X_fit.astype(bool)
+        np.save(os.path.join(directory, "X_fit.npy"), X_fit)
+
+        row_sums_alpha = getattr(model._dmap_kernel, "row_sums_alpha_", None)
+        if row_sums_alpha is not None:
+            np.save(os.path.join(directory, "row_sums_alpha.npy"), np.asarray(row_sums_alpha))
+
+        manifest = dict(
+            name=self.name,
+            observation_type=self.observation_type,
+            feature_type=self.feature_type,
+            kernel_distance_metric=self.kernel_distance_metric,
+            n_neighbors=int(self.n_neighbors),
+            alpha=float(self.alpha),
+            is_stochastic=bool(model._dmap_kernel.is_stochastic),
+            scale_by_steadystate=bool(self.scale_by_steadystate),
+            niche_prefix=self.niche_prefix,
+            features=self.features_.tolist(),
+            columns=[f"{self.niche_prefix}0_steady-state"] + list(map(lambda i: f"{self.niche_prefix}{i}", range(1,basis.shape[1]))),
+        )
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=4, default=str)
+        if self.verbose > 0:
+            self.logger.info(f"Wrote inference model: {directory}")
+        return directory
+
     # =======
     # Built-in
     # =======
@@ -1131,7 +1733,140 @@ class HierarchicalNicheSpace(object):
             ]
 
         return "\n".join(fields)
-    
+
+class HierarchicalNicheSpaceInferenceModel(object):
+    """
+    Out-of-sample projection from a `HierarchicalNicheSpace.export_inference_model` directory without
+    unpickling the fitted model (arrays are memory-mapped so workers share pages).
+
+    Computes the same kNN connectivity kernel, alpha normalization, and Nyström extension as
+    `HierarchicalNicheSpace.transform` with NumPy/SciPy only.
+    """
+    def __init__(
+        self,
+        X_fit:np.ndarray,
+        nystrom_basis:np.ndarray,
+        kernel_distance_metric:str,
+        n_neighbors:int,
+        alpha:float=0.0,
+        row_sums_alpha:np.ndarray=None,
+        is_stochastic:bool=True,
+        scale_by_steadystate:bool=True,
+        features:list=None,
+        columns:list=None,
+        name:str=None,
+        observation_type:str=None,
+        feature_type:str=None,
+        niche_prefix:str="n",
+        ):
+        if X_fit.shape[0] != nystrom_basis.shape[0]:
+            raise ValueError(f"X_fit.shape[0] ({X_fit.shape[0]}) must equal nystrom_basis.shape[0] ({nystrom_basis.shape[0]})")
+        if is_stochastic and alpha > 0:
+            if row_sums_alpha is None:
+                raise ValueError("row_sums_alpha is required when alpha > 0")
+        self.X_fit_ = X_fit
+        self.nystrom_basis_ = nystrom_basis
+        self.kernel_distance_metric = kernel_distance_metric
+        self.n_neighbors = n_neighbors
+        self.alpha = alpha
+        self.row_sums_alpha_ = row_sums_alpha
+        self.is_stochastic = is_stochastic
+        self.scale_by_steadystate = scale_by_steadystate
+        if features is not None:
+            features = pd.Index(features)
+        self.features_ = features
+        if columns is None:
+            columns = [f"{niche_prefix}0_steady-state"] + list(map(lambda i: f"{niche_prefix}{i}", range(1,nystrom_basis.shape[1])))
+        self.columns_ = pd.Index(columns)
+        self.name = name
+        self.observation_type = observation_type
+        self.feature_type = feature_type
+        self.niche_prefix = niche_prefix
+
+    @classmethod
+    def from_directory(cls, directory:str, mmap_mode="r"):
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        row_sums_alpha = None
+        filepath = os.path.join(directory, "row_sums_alpha.npy")
+        if os.path.exists(filepath):
+            row_sums_alpha = np.load(filepath)
+        return cls(
+            X_fit=np.load(os.path.join(directory, "X_fit.npy"), mmap_mode=mmap_mode),
+            nystrom_basis=np.load(os.path.join(directory, "nystrom_basis.npy"), mmap_mode=mmap_mode),
+            row_sums_alpha=row_sums_alpha,
+            **manifest,
+        )
+
+    def _kernel(self, X):
+        # kNN connectivity of each query row against the fitted observations (same as KNeighborsKernel for component-wise blocks)
+        distance_matrix = cdist(X, self.X_fit_, metric=self.kernel_distance_metric)
+        kernel_matrix = brute_force_kneighbors_graph_from_rectangular_distance(distance_matrix, n_neighbors=self.n_neighbors, include_self=True, mode="connectivity")
+        if self.is_stochastic:
+            if self.alpha > 0:
+                row_sums = np.asarray(kernel_matrix.sum(axis=1)).ravel()
+                if self.alpha < 1:
+                    row_sums = np.power(row_sums, self.alpha)
+                kernel_matrix = sps.diags(1/row_sums) @ kernel_matrix @ sps.diags(1/np.asarray(self.row_sums_alpha_))
+            row_sums = np.asarray(kernel_matrix.sum(axis=1)).ravel()
+            row_sums[row_sums == 0] = 1.0
+            kernel_matrix = sps.diags(1/row_sums) @ kernel_matrix
+        return kernel_matrix
+
+    def _transform_values(self, X):
+        dmap = np.asarray(self._kernel(X) @ self.nystrom_basis_)
+        if self.scale_by_steadystate:
+            dmap = dmap[:,1:] / dmap[:,[0]]
+        return dmap
+
+    def transform(self, X, block_size:int=10000):
+        """
+        Project observations into the fitted diffusion space.
+
+        Parameters
+        ----------
+        X : pd.DataFrame, np.ndarray, np.memmap, or str
+            Observations with the fitted features (.npy and .parquet filepaths are read in blocks)
+        block_size : int
+            Maximum number of observations per distance block
+
+        Returns
+        -------
+        pd.DataFrame or np.ndarray
+            pd.DataFrame with niche columns unless X is a np.ndarray
+        """
+        n_features = self.X_fit_.shape[1]
+        if isinstance(X, np.ndarray):
+            if X.shape[1] != n_features:
+                raise ValueError("Number of X features must match number of fitted features")
+            return np.vstack([self._transform_values(X[start:start + block_size]) for start in range(0, X.shape[0], block_size)])
+
+        blocks = list()
+        for index, values in HierarchicalNicheSpace._iter_row_blocks(X, block_size=block_size, features=self.features_):
+            if values.shape[1] != n_features:
+                raise ValueError("Number of X features must match number of fitted features")
+            blocks.append(pd.DataFrame(self._transform_values(values), index=index))
+        X_dmap = pd.concat(blocks, axis=0)
+        X_dmap.columns = self.columns_[1:] if self.scale_by_steadystate else self.columns_
+        X_dmap.index.name = self.observation_type
+        X_dmap.columns.name = self.feature_type
+        return X_dmap
+
+    def __repr__(self):
+        pad = 4
+        header = format_header(f"{self.__class__.__name__}(Name:{self.name}, ObservationType: {self.observation_type}, FeatureType: {self.feature_type})", line_character="=")
+
+        fields = [
+            header,
+            pad*" " + "* kernel_distance_metric: {}".format(self.kernel_distance_metric),
+            pad*" " + "* n_neighbors: {}".format(self.n_neighbors),
+            pad*" " + "* alpha: {}".format(self.alpha),
+            pad*" " + "* number_of_fitted_observations: {}".format(self.X_fit_.shape[0]),
+            pad*" " + "* number_of_features: {}".format(self.X_fit_.shape[1]),
+            pad*" " + "* number_of_components: {}".format(self.nystrom_basis_.shape[1]),
+        ]
+        return "\n".join(fields)
+
 class QualitativeSpace(object):
    
     def __init__(
@@ -1152,6 +1887,7 @@ class QualitativeSpace(object):
         n_iters=(100, 100, 250),
         initializer="pca",
         scoring_distance_metric:str="euclidean",
+        cache_pairs:bool=True,
 
         # Optuna
         n_trials=25,
@@ -1198,6 +1934,7 @@ class QualitativeSpace(object):
         self.random_state = random_state
         self.pacmap_distance_metric = pacmap_distance_metric
         self.n_iters = n_iters
+        self.cache_pairs = cache_pairs
         
 
         if isinstance(n_neighbors, list):
@@ -1236,11 +1973,14 @@ class QualitativeSpace(object):
         **study_kws,
         ):
 
+        # Preprocessing (and PCA initialization) is shared by all trials and nearest neighbor pairs are shared by trials with the same n_neighbors
+        pacmap_cache = None
+        if getattr(self, "cache_pairs", False):
+            pacmap_cache = self._build_pacmap_cache(X, distance=self.pacmap_distance_metric, n_components=self.n_components, random_state=self.random_state)
+
         def _objective(trial):
             try:
                 # Compile parameters
-
-                    
                 params = compile_parameter_space(
                     trial, 
                     self.param_space,
@@ -1253,6 +1993,7 @@ class QualitativeSpace(object):
                 n_neighbors = params["n_neighbors"]
                 MN_ratio = params["MN_ratio"]
                 FP_ratio = params["FP_ratio"]
+                lr = params["lr"]
                 
                 continue_tuning = True
                 if isinstance(n_neighbors, int):
@@ -1265,6 +2006,7 @@ class QualitativeSpace(object):
                         n_neighbors=n_neighbors, 
                         MN_ratio=MN_ratio, 
                         FP_ratio=FP_ratio,
+                        lr=lr,
                         random_state=self.random_state,
                         distance = self.pacmap_distance_metric,
                         num_iters = self.n_iters,
@@ -1272,7 +2014,10 @@ class QualitativeSpace(object):
                     ) 
 
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Fitting PaCMAP: n_neighbors={n_neighbors}, n_components={n_components}, MN_ratio={MN_ratio}, FP_ratio={FP_ratio}")
-                    embedding = model.fit_transform(X, init=self.initializer)
+                    if pacmap_cache is not None:
+                        embedding = self._fit_transform_pacmap_cached(model, pacmap_cache, init=self.initializer)
+                    else:
+                        embedding = model.fit_transform(X, init=self.initializer)
 
                     # Score
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Calculating silhouette score:  n_neighbors={n_neighbors}, n_components={n_components}, MN_ratio={MN_ratio}, FP_ratio={FP_ratio}")
@@ -1333,12 +2078,76 @@ class QualitativeSpace(object):
             n_jobs=self.n_concurrent_trials,
             timeout=self.study_timeout, 
             show_progress_bar=self.verbose >= 2, 
-            callbacks=self.study_callbacks + [stop_when_exceeding_trials], 
+            callbacks=self.study_callbacks + [callback_fn], 
             gc_after_trial=True,
         )
 
         return study
 
+    @staticmethod
+    def _build_pacmap_cache(X, distance:str, n_components:int, random_state:int=0):
+        """
+        Preprocess X once with PaCMAP's preprocessing (centering with TruncatedSVD to 100 dimensions or normalization with 
+        PCA for initialization) for `_fit_transform_pacmap_cached`.
+        """
+        from pacmap.pacmap import preprocess_X
+        X = np.array(X, dtype=np.float32)
+        n, dim = X.shape
+        X, pca_solution, tsvd, xmin, xmax, xmean = preprocess_X(X, distance, True, False, random_state if random_state is not None else 0, dim, n_components)
+        return dict(
+            X=X, 
+            pca_solution=pca_solution, 
+            tsvd=tsvd, 
+            xmin=xmin, 
+            xmax=xmax, 
+            xmean=xmean, 
+            pair_neighbors=dict(), 
+            lock=threading.Lock(),
+        )
+
+    @staticmethod
+    def _fit_transform_pacmap_cached(model, pacmap_cache:dict, init="pca"):
+        """
+        Equivalent of `PaCMAP.fit_transform` that reuses preprocessing and nearest neighbor pairs (by effective n_neighbors) 
+        from `_build_pacmap_cache`.  Mid-near and further pairs depend on MN_ratio and FP_ratio so they are sampled for each model 
+        (from the pair_neighbors support in PaCMAP).
+        """
+        from pacmap.pacmap import pacmap as optimize_pacmap
+        X = pacmap_cache["X"]
+        model.tsvd_transformer = pacmap_cache["tsvd"]
+        model.pca_solution = pacmap_cache["pca_solution"]
+        model.xmin, model.xmax, model.xmean = pacmap_cache["xmin"], pacmap_cache["xmax"], pacmap_cache["xmean"]
+        model.decide_num_pairs(X.shape[0])
+
+        with pacmap_cache["lock"]:
+            pair_neighbors = pacmap_cache["pair_neighbors"].get(model.n_neighbors)
+            if pair_neighbors is None:
+                model.pair_neighbors = model.pair_MN = model.pair_FP = None
+                model.sample_pairs(X, save_tree=False)
+                pacmap_cache["pair_neighbors"][model.n_neighbors] = model.pair_neighbors
+        if pair_neighbors is not None:
+            model.pair_neighbors = pair_neighbors
+            model.pair_MN = model.pair_FP = None
+            model.sample_pairs(X, save_tree=False)
+        model.num_instances = X.shape[0]
+        model.num_dimensions = X.shape[1]
+
+        model.embedding_, model.intermediate_states, model.pair_neighbors, model.pair_MN, model.pair_FP = optimize_pacmap(
+            X,
+            model.n_components,
+            model.pair_neighbors,
+            model.pair_MN,
+            model.pair_FP,
+            model.lr,
+            model.num_iters,
+            init,
+            model.verbose,
+            model.intermediate,
+            model.intermediate_snapshots,
+            model.pca_solution,
+            model.tsvd_transformer,
+        )
+        return model.embedding_
 
     def fit(
         self,
@@ -1379,7 +2188,7 @@ class QualitativeSpace(object):
             for k, v in self.study_.best_params.items():
                 setattr(self,k,v)
             if self.verbose > 0:
-                self.logger.info(f"Tuned parameters (Score={self.study_.best_value}): {self.study_.best_params}")
+                self.logger.info(f"Tuned parameters (Score={self.study_.best_trial.user_attrs.get('score', self.study_.best_value)}): {self.study_.best_params}")
                 self.logger.info("[End] Hyperparameter Tuning")
             self.is_tuned = True
             
@@ -1389,6 +2198,7 @@ class QualitativeSpace(object):
             n_neighbors=self.n_neighbors, 
             MN_ratio=self.MN_ratio, 
             FP_ratio=self.FP_ratio,
+            lr=self.lr,
             random_state=self.random_state,
             distance = self.pacmap_distance_metric,
             num_iters = self.n_iters,
@@ -1420,14 +2230,45 @@ class QualitativeSpace(object):
         self,
         X,
         initializer="pca",
-        
+        batch_size:int=None,
+        n_jobs:int=None,
+        prefer:str="processes",
+        progressbar_message=None,
         ):
+        """
+        Project observations into the fitted PaCMAP embedding.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Observations with the fitted features
+        initializer : str
+            PaCMAP initialization of the new points
+        batch_size : int
+            If provided, observations are projected in batches of this size with `n_jobs` workers.  Each batch 
+            queries the saved Annoy tree for its neighbors in the basis (processes memory-map the same .ann file) 
+            and new points are optimized against the fixed basis embedding independently of each other, so with 
+            initializer="pca" the result does not depend on the batch partitioning.  With initializer="random", 
+            the initialization is drawn per batch.
+        n_jobs : int
+            Number of workers for batches (default: `n_jobs`)
+        prefer : str
+            joblib worker preference: processes or threads
+
+        Returns
+        -------
+        pd.DataFrame or np.ndarray
+        """
         if not self.is_fitted:
             raise Exception("Please run .fit to build PaCMAP model before continuing")
-        if X is self.X_:
+        if ("X_" in self.__dict__) and (X is self.X_):
             return self.embedding_
         
-        X_pacmap = self.model_.transform(X, basis=self.X_, init=initializer)
+        if batch_size is None:
+            tree = self._load_tree()
+            X_pacmap = self.model_.transform(X, basis=self.X_ if tree is None else None, init=initializer)
+        else:
+            X_pacmap = self._parallel_transform(X, initializer=initializer, batch_size=batch_size, n_jobs=n_jobs, prefer=prefer, progressbar_message=progressbar_message)
         
         if isinstance(X, pd.DataFrame): 
             X_pacmap = pd.DataFrame(
@@ -1437,69 +2278,225 @@ class QualitativeSpace(object):
             X_pacmap.columns = X_pacmap.columns.map(lambda i: f"PaCMAP-{i+1}")
             
         return X_pacmap
+
+    @staticmethod
+    def _transform_batch(model, X, initializer, ann_filepath=None, annoy_dimension=None, annoy_metric=None):
+        """
+        Project one batch with a PaCMAP model (loads the Annoy tree in the worker if the model was sent without it).  
+        Each batch uses its own shallow copy so concurrent batches do not write `pair_XP` on a shared model.  The 
+        default save_pairs=True is kept because PaCMAP releases with Annoy trees read `pair_XP` inside `transform`.
+        """
+        model = shallow_copy(model)
+        if model.tree is None and ann_filepath is not None:
+            model.tree = load_annoy_index(ann_filepath, annoy_dimension, annoy_metric)
+        X_pacmap = model.transform(X, basis=None, init=initializer)
+        model.pair_XP = None
+        return X_pacmap
+
+    def _parallel_transform(self, X, initializer="pca", batch_size:int=10000, n_jobs:int=None, prefer:str="processes", progressbar_message=None):
+        """Project batches of observations in parallel (see `transform`)"""
+        if isinstance(X, pd.DataFrame):
+            X = X.values
+        X = np.asarray(X, dtype=np.float32)
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        batches = range(0, X.shape[0], batch_size)
+
+        model = self.model_
+        ann_filepath = getattr(self, "annoy_filepath_", None)
+        if ann_filepath is not None and not os.path.exists(ann_filepath):
+            ann_filepath = None
+        if model.tree is None and ann_filepath is None:
+            raise ValueError("Batched transform requires the Annoy tree (fit with save_tree=True or load with .from_file)")
+
+        temporary_directory = None
+        if prefer == "processes":
+            # AnnoyIndex cannot be pickled so workers memory-map the .ann file and only the lightweight model state is sent
+            if ann_filepath is None:
+                temporary_directory = tempfile.mkdtemp(prefix=f"{self.__class__.__name__}.")
+                ann_filepath = os.path.join(temporary_directory, "model.ann")
+                model.tree.save(ann_filepath)
+            model = shallow_copy(model)
+            model.tree = None
+            model.pair_neighbors = model.pair_MN = model.pair_FP = model.pair_XP = None
+            model.intermediate_states = None
+        elif model.tree is not None:
+            # Threads share the loaded tree
+            ann_filepath = None
+
+        try:
+            output = joblib.Parallel(n_jobs=n_jobs, prefer=prefer)(
+                joblib.delayed(self._transform_batch)(model, X[start:start + batch_size], initializer, ann_filepath, self.annoy_dimension_, self.pacmap_distance_metric) for start in tqdm(batches, desc=progressbar_message, total=len(batches), position=0, leave=True, unit=" batches", disable=progressbar_message is None)
+            )
+        finally:
+            if temporary_directory is not None:
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+        return np.vstack(output)
     
     def plot(
         self, 
         engine:str="matplotlib",
         figsize=(8,8),
         title=None,
+        max_points:Optional[int]=None,
+        random_state:int=0,
+        output_filepath:Optional[str]=None,
+        dpi:int=150,
+        plot_width:int=800,
+        plot_height:int=800,
         **kws,
         ):
+        """
+        Plot the PaCMAP embedding with observations in `classes_` in red and the rest in black.
+
+        Parameters:
+        -----------
+        engine : str
+            "matplotlib" : 3D scatter plot of every observation (default).  If `max_points` is set and there are more 
+                observations, a random subsample (seeded by `random_state`) is drawn, point size is scaled down with 
+                the number of points, and points in `classes_` are drawn last so they are not hidden by the background.
+            "datashader" : Rasterized 2D density (first two components) of all observations rendered with datashader 
+                and displayed with matplotlib `imshow`.  Requires `datashader`.
+        figsize : tuple
+            Figure size
+        title : str, optional
+            Title of the plot
+        max_points : int, optional
+            Opt-in maximum number of points drawn by the "matplotlib" engine (logged when points are dropped).  None draws every point.
+        random_state : int
+            Random seed for subsampling
+        output_filepath : str, optional
+            If provided, the figure is rendered offscreen with the Agg backend (without pyplot) and saved to this path
+        dpi : int
+            Resolution used when saving to `output_filepath`
+        plot_width, plot_height : int
+            Canvas size in pixels for the "datashader" engine
+        **kws
+            Passed to `ax.scatter` ("matplotlib") or `datashader.transfer_functions.shade` ("datashader")
+
+        Returns:
+        --------
+        fig, ax
+        """
         if not hasattr(self, "embedding_"):
             raise Exception("Please run .fit to compute PaCMAP embeddings before continuing")
-        if engine == "matplotlib":
+        if engine not in {"matplotlib", "datashader"}:
+            raise ValueError("engine must be either 'matplotlib' or 'datashader'")
+        
+        from mpl_toolkits.mplot3d import Axes3D        
+
+        # Figure (offscreen if writing to file so no display or pyplot state is required)
+        if output_filepath is not None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        else:
             import matplotlib.pyplot as plt
-            from mpl_toolkits.mplot3d import Axes3D        
-
-            """
-            Plots a 3D scatter plot using matplotlib from a DataFrame with exactly three columns.
-
-            Parameters:
-            -----------
-            df : pd.DataFrame
-                A DataFrame with three numerical columns representing X, Y, and Z coordinates.
-            title : str, optional
-                Title of the plot (default is "3D Scatter Plot").
-            """
             fig = plt.figure(figsize=figsize)
-            ax = fig.add_subplot(111, projection='3d')
 
-            # Extract X, Y, Z from DataFrame
-            df = self.embedding_
-            x, y, z = df.iloc[:, 0], df.iloc[:, 1], df.iloc[:, 2]
+        df = self.embedding_
+        mask = df.index.isin(self.classes_)
 
-            if "c" not in kws:
-                kws["c"] = df.index.map(lambda x: {True:"red", False:"black"}[x in self.classes_])
-
-            # Scatter plot
-            ax.scatter(x, y, z, alpha=0.618, **kws)
+        if engine == "matplotlib":
+            ax = fig.add_subplot(111, projection='3d')
+            values = df.values
+            n = values.shape[0]
 
-            # Labels and title
-            ax.set_xlabel(df.columns[0])
-            ax.set_ylabel(df.columns[1])
+            # Colors
+            c = kws.pop("c", None)
+            if c is None:
+                c = np.where(mask, "red", "black")
+            else:
+                c = np.asarray(c)
+            per_point_colors = (c.ndim > 0) and (c.shape[0] == n)
+
+            # Level of detail (opt-in)
+            index = np.arange(n)
+            if (max_points is not None) and (n > max_points):
+                rng = np.random.RandomState(random_state)
+                index = np.sort(rng.choice(n, size=max_points, replace=False))
+                index = np.concatenate([index[~mask[index]], index[mask[index]]])
+                self.logger.info(f"Plotting a random subsample of {max_points} of {n} observations (max_points={max_points})")
+                kws.setdefault("s", float(np.clip(20 * 1e4/index.size, 0.5, 20)))
+                kws.setdefault("linewidths", 0)
+                kws.setdefault("rasterized", True)
+            kws.setdefault("alpha", 0.618)
+
+            ax.scatter(values[index,0], values[index,1], values[index,2], c=c[index] if per_point_colors else c, **kws)
             ax.set_zlabel(df.columns[2])
-            if title:
-                ax.set_title(title)
 
-            return fig, ax
+        if engine == "datashader":
+            try:
+                import datashader as ds
+                import datashader.transfer_functions as tf
+            except ImportError:
+                raise ImportError("Please install datashader to use engine='datashader'")
+            ax = fig.add_subplot(111)
+            df_points = pd.DataFrame({
+                "x":df.iloc[:,0].values, 
+                "y":df.iloc[:,1].values, 
+                "label":pd.Categorical(np.where(mask, "class", "background"), categories=["background", "class"]),
+            })
+            x_range = (df_points["x"].min(), df_points["x"].max())
+            y_range = (df_points["y"].min(), df_points["y"].max())
+            canvas = ds.Canvas(plot_width=plot_width, plot_height=plot_height, x_range=x_range, y_range=y_range)
+            agg = canvas.points(df_points, "x", "y", agg=ds.count_cat("label"))
+            kws.setdefault("color_key", {"background":"black", "class":"red"})
+            kws.setdefault("how", "eq_hist")
+            image = tf.shade(agg, **kws)
+            ax.imshow(image.to_pil(), extent=(*x_range, *y_range), origin="upper", aspect="auto")
+        
+        # Labels and title
+        ax.set_xlabel(df.columns[0])
+        ax.set_ylabel(df.columns[1])
+        if title:
+            ax.set_title(title)
+
+        if output_filepath is not None:
+            fig.savefig(output_filepath, dpi=dpi, bbox_inches="tight")
+
+        return fig, ax
         
     @classmethod
-    def from_file(cls, filepath): # , stream=sys.stdout):
+    def from_file(cls, filepath, lazy:bool=False): # , stream=sys.stdout):
+        """
+        Load a model written with `to_file`.
 
+        If the model was written with `to_file(memmap=True)`, arrays are memory-mapped from the .npy files next to 
+        `filepath`.  With lazy=True, `X_` and `embedding_` are only materialized on first access and the Annoy 
+        tree is memory-mapped (prefault=False) on first use by `transform`, so many workers can share one on-disk 
+        model with minimal resident memory.
+        """
         cls = read_pickle(filepath)
+        if cls.__dict__.get("_memmap_labels_"):
+            cls._memmap_prefix_ = filepath
+            if not lazy:
+                for name in cls._memmap_labels_:
+                    getattr(cls, name)
         if hasattr(cls, "model_"):
+            for name in cls.__dict__.get("_memmap_model_attributes_", []):
+                setattr(cls.model_, name, np.load(f"{filepath}.pacmap.{name.rstrip('_')}.npy", mmap_mode="r"))
             ann_filepath = f"{filepath}.ann"
             if not os.path.exists(ann_filepath):
                 warnings.warn(f"Could not find AnnoyIndex: {ann_filepath}")
             else:
-                tree = AnnoyIndex(cls.annoy_dimension_, cls.pacmap_distance_metric)
-                tree.load(ann_filepath)
-                cls.model_.tree = tree
+                cls.annoy_filepath_ = ann_filepath
+                if not lazy:
+                    tree = AnnoyIndex(cls.annoy_dimension_, cls.pacmap_distance_metric)
+                    tree.load(ann_filepath)
+                    cls.model_.tree = tree
         # cls.stream = stream
         return cls
 
 
-    def to_file(self, filepath):
+    def to_file(self, filepath, memmap:bool=False):
+        """
+        Write the model as a pickle with the Annoy tree in `{filepath}.ann`.
+
+        If memmap=True, `X_` and `embedding_` (if they have a single dtype) and the PaCMAP embedding and pairs are 
+        written as .npy files next to `filepath` instead of into the pickle so they can be memory-mapped by `from_file`.
+        """
         # # Stream
         # stream =None
         # if hasattr(self, "stream"):
@@ -1512,13 +2509,68 @@ class QualitativeSpace(object):
             if tree is not None:
                 tree.save(f"{filepath}.ann")
                 self.model_.tree = None
-
-        write_pickle(self, filepath)
-        
-        # if stream is not None:
-        #     self.stream = stream
-        if tree is not None:
-            self.model_.tree = tree
+                self.annoy_filepath_ = f"{filepath}.ann"
+
+        # Memory-mappable arrays (materialize lazily loaded arrays first and copy them if their files are overwritten)
+        for name in list(self.__dict__.get("_memmap_labels_", dict())):
+            df = getattr(self, name)
+            if self.__dict__.get("_memmap_prefix_") == filepath:
+                self.__dict__[name] = df.copy()
+        attributes = dict()
+        model_attributes = dict()
+        self._memmap_labels_ = dict()
+        self._memmap_model_attributes_ = list()
+        if memmap:
+            memmap_labels = dict()
+            for name in ["X_", "embedding_"]:
+                df = self.__dict__.get(name)
+                if isinstance(df, pd.DataFrame) and df.dtypes.nunique() == 1:
+                    np.save(f"{filepath}.{name.rstrip('_')}.npy", np.ascontiguousarray(df.values))
+                    memmap_labels[name] = (df.index, df.columns)
+                    attributes[name] = self.__dict__.pop(name)
+            self._memmap_labels_ = memmap_labels
+            if hasattr(self, "model_"):
+                for name in ["embedding_", "pair_neighbors", "pair_MN", "pair_FP"]:
+                    values = getattr(self.model_, name, None)
+                    if isinstance(values, np.memmap) and self.__dict__.get("_memmap_prefix_") == filepath:
+                        values = np.array(values)
+                    if isinstance(values, np.ndarray):
+                        np.save(f"{filepath}.pacmap.{name.rstrip('_')}.npy", values)
+                        model_attributes[name] = values
+                        setattr(self.model_, name, None)
+            self._memmap_model_attributes_ = list(model_attributes)
+
+        try:
+            write_pickle(self, filepath)
+        finally:
+            # if stream is not None:
+            #     self.stream = stream
+            if tree is not None:
+                self.model_.tree = tree
+            self.__dict__.update(attributes)
+            for name, values in model_attributes.items():
+                setattr(self.model_, name, values)
+            if memmap:
+                self._memmap_prefix_ = filepath
+
+    def _load_tree(self):
+        """Memory-map the Annoy tree on first use (see `from_file(lazy=True)`)"""
+        if self.model_.tree is None:
+            ann_filepath = getattr(self, "annoy_filepath_", None)
+            if ann_filepath is not None and os.path.exists(ann_filepath):
+                self.model_.tree = load_annoy_index(ann_filepath, self.annoy_dimension_, self.pacmap_distance_metric)
+        return self.model_.tree
+
+    def __getattr__(self, name):
+        # Only called for missing attributes: materialize arrays written by `to_file(memmap=True)`
+        memmap_labels = self.__dict__.get("_memmap_labels_")
+        memmap_prefix = self.__dict__.get("_memmap_prefix_")
+        if memmap_labels and memmap_prefix and name in memmap_labels:
+            index, columns = memmap_labels[name]
+            df = pd.DataFrame(np.load(f"{memmap_prefix}.{name.rstrip('_')}.npy", mmap_mode="r"), index=index, columns=columns, copy=False)
+            self.__dict__[name] = df
+            return df
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
         
 
 
@@ -1582,10 +2634,19 @@ class EmbeddingAnnotator(object):
         early_stopping=5,
         random_state=0,
         n_jobs=1,
+        n_concurrent_models:Union[int,str]=1,
+        parallel_backend="loky",
+        parallel_kws:dict=None,
         verbose=0,
         save_automl=False,
         stream=sys.stdout,
         ):
+        """
+        n_jobs is the core budget for fitting.  If n_concurrent_models > 1 (or "auto" to use one process per core up 
+        to the number of embedding columns), the embedding columns are fit concurrently in worker processes and 
+        n_jobs is split between the concurrent models (see `_allocate_jobs`).  Each worker writes its own checkpoint 
+        (temporary if checkpoint_directory is None) and records its warnings in `automl_warnings_`.
+        """
 
         # Clairvoyance
         self.estimator=estimator
@@ -1621,6 +2682,12 @@ class EmbeddingAnnotator(object):
         self.early_stopping = early_stopping
         self.random_state = random_state
         self.n_jobs = n_jobs
+        self.n_concurrent_models = n_concurrent_models
+        self.parallel_kws = dict(
+                backend=parallel_backend,
+        )
+        if parallel_kws:
+            self.parallel_kws.update(parallel_kws)
         self.verbose = verbose
         self.save_automl = save_automl
         self.is_fitted = False
@@ -1634,11 +2701,18 @@ class EmbeddingAnnotator(object):
         X_testing,
         Y_testing,
         optimize_with_training_and_testing,
+        n_jobs:int=None,
+        checkpoint_directory:str=None,
         **kws,
         ):
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        if checkpoint_directory is None:
+            checkpoint_directory = self.checkpoint_directory
+            
         model = None
-        if self.checkpoint_directory:
-            serialized_checkpoint_filepath = os.path.join(self.checkpoint_directory, f"{self.name}.BayesianClairvoyanceRegression.{id_column}.pkl")
+        if checkpoint_directory:
+            serialized_checkpoint_filepath = self._get_checkpoint_filepath(id_column, checkpoint_directory)
 
             if os.path.exists(serialized_checkpoint_filepath):
                 self.logger.info(f"[Loading] Checkpoint file: {serialized_checkpoint_filepath}")
@@ -1658,7 +2732,7 @@ class EmbeddingAnnotator(object):
                 n_iter=self.n_iter, 
                 n_trials=self.n_trials, 
                 feature_selection_method="addition", 
-                n_jobs=self.n_jobs, 
+                n_jobs=n_jobs, 
                 verbose=self.verbose,
                 feature_selection_performance_threshold=self.feature_selection_performance_threshold,
                 transformation=self.transformation,
@@ -1689,8 +2763,7 @@ class EmbeddingAnnotator(object):
                     X_testing=X_testing, 
                     y_testing=y_testing,
                 )
-                if self.checkpoint_directory:
-                    serialized_checkpoint_filepath = os.path.join(self.checkpoint_directory, f"{self.name}.BayesianClairvoyanceRegression.{id_column}.pkl")
+                if checkpoint_directory:
                     model.to_file(serialized_checkpoint_filepath)
 
             except AssertionError as e:
@@ -1699,6 +2772,194 @@ class EmbeddingAnnotator(object):
             
         return model
 
+    def _get_checkpoint_filepath(self, id_column, checkpoint_directory=None):
+        if checkpoint_directory is None:
+            checkpoint_directory = self.checkpoint_directory
+        return os.path.join(checkpoint_directory, f"{self.name}.BayesianClairvoyanceRegression.{id_column}.pkl")
+
+    @staticmethod
+    def _run_regression_automl_worker(
+        annotator, 
+        X, 
+        Y, 
+        id_column, 
+        cv, 
+        X_testing, 
+        Y_testing, 
+        optimize_with_training_and_testing, 
+        n_jobs, 
+        checkpoint_directory,
+        **kws,
+        ):
+        """
+        Fit a single embedding column in a worker process.  The fitted model is written to its own checkpoint 
+        instead of being sent back to the parent and warnings raised in the worker are recorded 
+        (deduplicated with counts) instead of being printed.  X and X_testing can be handles from `_share_sparse`.
+        """
+        if isinstance(X, dict):
+            X = annotator._load_shared_sparse(X)
+        if isinstance(X_testing, dict):
+            X_testing = annotator._load_shared_sparse(X_testing)
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter("always")
+            annotator._run_regression_automl(
+                X=X, 
+                Y=Y, 
+                id_column=id_column, 
+                cv=cv, 
+                X_testing=X_testing, 
+                Y_testing=Y_testing, 
+                optimize_with_training_and_testing=optimize_with_training_and_testing, 
+                n_jobs=n_jobs,
+                checkpoint_directory=checkpoint_directory,
+                **kws,
+            )
+        serialized_checkpoint_filepath = annotator._get_checkpoint_filepath(id_column, checkpoint_directory)
+        if not os.path.exists(serialized_checkpoint_filepath):
+            serialized_checkpoint_filepath = None
+        warning_counts = defaultdict(int)
+        for w in caught_warnings:
+            warning_counts[(w.category.__name__, str(w.message))] += 1
+        return id_column, serialized_checkpoint_filepath, [(category, message, count) for (category, message), count in warning_counts.items()]
+
+    @staticmethod
+    def _share_sparse(X, directory, prefix):
+        """
+        Write a pandas sparse DataFrame (single SparseDtype with fill_value=0) once as memory-mappable CSC arrays 
+        and return a small handle for `_load_shared_sparse`.  Other inputs are returned unchanged.
+        """
+        if not isinstance(X, pd.DataFrame):
+            return X
+        dtypes = X.dtypes.unique()
+        if (len(dtypes) != 1) or (not isinstance(dtypes[0], pd.SparseDtype)) or (dtypes[0].fill_value != 0):
+            return X
+        csc = X.sparse.to_coo().tocsc()
+        csc.sort_indices()
+        handle = dict(shape=csc.shape, index=X.index, columns=X.columns)
+        for key, values in [("data", csc.data), ("indices", csc.indices), ("indptr", csc.indptr)]:
+            filepath = os.path.join(directory, f"{prefix}.{key}.npy")
+            np.save(filepath, values)
+            handle[key] = filepath
+        return handle
+
+    @staticmethod
+    def _load_shared_sparse(handle):
+        """
+        Rebuild the sparse DataFrame from `_share_sparse`.  CSC column slices of the memmaps are used directly as 
+        the SparseArray values/indices so the feature matrix is shared between processes instead of copied.  The 
+        memmaps are copy-on-write (mmap_mode="c") because pandas sparse operations require writable buffers.
+        """
+        data, indices, indptr = [np.load(handle[key], mmap_mode="c") for key in ["data", "indices", "indptr"]]
+        csc = sps.csc_matrix((data, indices, indptr), shape=handle["shape"], copy=False)
+        return sparse_frame_from_spmatrix(csc, index=handle["index"], columns=handle["columns"])
+
+    @staticmethod
+    def _allocate_jobs(n_jobs, n_concurrent_models, n_tasks):
+        """
+        Split a core budget between concurrent models (column-level) and n_jobs within each model (model-level).
+
+        Returns
+        -------
+        (n_concurrent_models, n_jobs_per_model)
+        """
+        n_cpus = joblib.cpu_count()
+        if n_jobs is None:
+            n_jobs = 1
+        if n_jobs < 0:
+            n_jobs = max(1, n_cpus + 1 + n_jobs)
+        if n_concurrent_models in {None, "auto"}:
+            n_concurrent_models = n_jobs
+        if n_concurrent_models < 0:
+            n_concurrent_models = max(1, n_cpus + 1 + n_concurrent_models)
+        n_concurrent_models = max(1, min(n_concurrent_models, n_tasks))
+        n_jobs_per_model = max(1, max(n_jobs, n_concurrent_models) // n_concurrent_models)
+        return n_concurrent_models, n_jobs_per_model
+
+    def _parallel_fit(
+        self,
+        X,
+        Y,
+        cv,
+        X_testing,
+        Y_testing,
+        optimize_with_training_and_testing,
+        progressbar_message=None,
+        **kws,
+        ):
+        """
+        Yields (id_column, model) as embedding columns are fit concurrently in worker processes
+        """
+        # Each worker writes its own checkpoint
+        checkpoint_directory = self.checkpoint_directory
+        temporary_directory = None
+        if not checkpoint_directory:
+            temporary_directory = checkpoint_directory = tempfile.mkdtemp(prefix="EmbeddingAnnotator.")
+
+        # Workers get the configuration but none of the fitted attributes
+        annotator = shallow_copy(self)
+        annotator.__dict__ = {k:v for k, v in self.__dict__.items() if not k.endswith("_")}
+
+        # Sparse feature matrices are written once and memory-mapped by the workers
+        shared_directory = tempfile.mkdtemp(prefix="EmbeddingAnnotator.shared.", dir=checkpoint_directory)
+        X = self._share_sparse(X, shared_directory, "X")
+        X_testing = self._share_sparse(X_testing, shared_directory, "X_testing")
+
+        parallel_kws = dict(self.parallel_kws)
+        backend = parallel_kws.pop("backend", "loky")
+        backend_kws = dict(inner_max_num_threads=self.n_jobs_per_model_) if backend == "loky" else dict()
+        try:
+            with joblib.parallel_backend(backend, **backend_kws):
+                output = joblib.Parallel(n_jobs=self.n_concurrent_models_, **parallel_kws)(
+                    joblib.delayed(self._run_regression_automl_worker)(
+                        annotator, 
+                        X, 
+                        Y[[id_column]], 
+                        id_column, 
+                        cv, 
+                        X_testing, 
+                        None if Y_testing is None else Y_testing[[id_column]], 
+                        optimize_with_training_and_testing, 
+                        self.n_jobs_per_model_, 
+                        checkpoint_directory,
+                        **kws,
+                    ) for id_column in tqdm(Y.columns, desc=progressbar_message, total=Y.shape[1], position=0, leave=True)
+                )
+            for id_column, serialized_checkpoint_filepath, warning_counts in output:
+                self.automl_warnings_[id_column] = warning_counts
+                if self.verbose > 0:
+                    for category, message, count in warning_counts:
+                        self.logger.warning(f"Model[{id_column}] {category} (n={count}): {message}")
+                model = None
+                if serialized_checkpoint_filepath is not None:
+                    model = read_pickle(serialized_checkpoint_filepath)
+                else:
+                    self.logger.critical(f"Model[{id_column}] AutoML failed")
+                yield id_column, model
+        finally:
+            shutil.rmtree(shared_directory, ignore_errors=True)
+            if temporary_directory is not None:
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    def _collect_automl_results(self, id_column, model_automl, sort_order):
+        if model_automl is None:
+            self.automl_status_ok_[id_column] = False
+            return
+        if self.save_automl:
+            self.automl_models_[id_column] = model_automl
+        else:
+            self.automl_results_[id_column] = getattr(model_automl, "results_", None)
+
+        is_ok = model_automl.is_fitted
+        self.automl_status_ok_[id_column] = is_ok
+        if is_ok:
+            best_iteration = model_automl.results_.sort_values([f"feature_selected_{sort_order[0]}_score", f"feature_selected_{sort_order[1]}_score"], ascending=[False, False]).iloc[0]
+            self.selected_features_[id_column] = best_iteration["selected_features"]
+            self.feature_weights_[id_column] = model_automl.feature_weights_[best_iteration.name]
+            self.estimators_[id_column] = best_iteration["best_estimator"]
+            self.best_iteration_[id_column] = best_iteration.name
+            self.scores_[id_column]["training"] = best_iteration["feature_selected_training_score"]
+            self.scores_[id_column]["testing"] = best_iteration["feature_selected_testing_score"]
+            self.studies_[id_column] = model_automl.studies_
         
     def fit(
         self,
@@ -1718,23 +2979,19 @@ class EmbeddingAnnotator(object):
                 if self.verbose > 1: self.logger.info(f"Creating checkpoint directory: {self.checkpoint_directory}")
                 os.makedirs(self.checkpoint_directory)
         
-        # Copy
-        self.X_ = X.copy()
+        # Features are stored by reference (not modified) to avoid duplicating large feature matrices
+        self.X_ = X
         self.Y_ = Y.copy()
         if X_testing is not None:
             if Y_testing is None:
                 msg = "If X_testing is provided, user must provide Y_testing"
                 self.logger.error(msg)
                 raise Exception(msg)
-            self.X_testing_ = X_testing.copy()
+            self.X_testing_ = X_testing
             self.Y_testing_ = Y_testing.copy()
             
         progressbar_message = f"Running bayesian AutoML to identify relevant features"
         
-        # This has strangebehavior throwing warnings that do not occur when running indiviudally
-        # self.models_ = joblib.Parallel(n_jobs=self.n_concurrent_trials, prefer="threads")(
-        #         joblib.delayed(self._run_regression_automl)(X, Y, id_column, cv, X_testing, Y_testing, optimize_with_training_and_testing, **kws) for id_column in tqdm(Y.columns, desc=progressbar_message, total=Y.shape[1]) # , position=0, leave=True)
-        #     )
         if set(sort_order) != set(["testing", "training"]):
             msg = "sort_order must contain both [testing, training]"
             raise ValueError(msg)
@@ -1750,36 +3007,39 @@ class EmbeddingAnnotator(object):
         self.estimators_ = dict()
         self.scores_ = defaultdict(dict)
         self.studies_ = dict()
+        self.automl_warnings_ = dict()
         
-
-        for id_column in tqdm(Y.columns, desc=progressbar_message, total=Y.shape[1], position=0, leave=True):
-            model_automl = self._run_regression_automl(
+        # Split cores between concurrent models and n_jobs within each model
+        self.n_concurrent_models_, self.n_jobs_per_model_ = self._allocate_jobs(self.n_jobs, getattr(self, "n_concurrent_models", 1), Y.shape[1])
+        if self.n_concurrent_models_ > 1:
+            self.logger.info(f"Fitting {Y.shape[1]} embeddings with {self.n_concurrent_models_} concurrent models and n_jobs={self.n_jobs_per_model_} per model")
+            for id_column, model_automl in self._parallel_fit(
                 X=X, 
                 Y=Y, 
-                id_column=id_column, 
                 cv=cv, 
                 X_testing=X_testing, 
                 Y_testing=Y_testing, 
                 optimize_with_training_and_testing=optimize_with_training_and_testing, 
+                progressbar_message=progressbar_message,
                 **kws,
-            )
-            if self.save_automl:
-                self.automl_models_[id_column] = model_automl
-            else:
-                self.automl_results_[id_column] = model_automl.results_
-
-            is_ok = model_automl.is_fitted
-            self.automl_status_ok_[id_column] = is_ok
-            if is_ok:
-                best_iteration = model_automl.results_.sort_values([f"feature_selected_{sort_order[0]}_score", f"feature_selected_{sort_order[1]}_score"], ascending=[False, False]).iloc[0]
-                self.selected_features_[id_column] = best_iteration["selected_features"]
-                self.feature_weights_[id_column] = model_automl.feature_weights_[best_iteration.name]
-                self.estimators_[id_column] = best_iteration["best_estimator"]
-                self.best_iteration_[id_column] = best_iteration.name
-                self.scores_[id_column]["training"] = best_iteration["feature_selected_training_score"]
-                self.scores_[id_column]["testing"] = best_iteration["feature_selected_testing_score"]
-                self.studies_[id_column] = model_automl.studies_
-            del model_automl
+                ):
+                self._collect_automl_results(id_column, model_automl, sort_order)
+                del model_automl
+        else:
+            for id_column in tqdm(Y.columns, desc=progressbar_message, total=Y.shape[1], position=0, leave=True):
+                model_automl = self._run_regression_automl(
+                    X=X, 
+                    Y=Y, 
+                    id_column=id_column, 
+                    cv=cv, 
+                    X_testing=X_testing, 
+                    Y_testing=Y_testing, 
+                    optimize_with_training_and_testing=optimize_with_training_and_testing, 
+                    n_jobs=self.n_jobs_per_model_,
+                    **kws,
+                )
+                self._collect_automl_results(id_column, model_automl, sort_order)
+                del model_automl
         self.is_fitted = True
         return self
 
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import os,sys,warnings
+import json
+import uuid
 from typing import Optional
 from collections import defaultdict
 from itertools import combinations
@@ -39,7 +41,6 @@ from pyexeggutor import (
 
 from sklearn.metrics import (
     pairwise_distances,
-    silhouette_score,
 )
 import ensemble_networkx as enx
 import igraph as ig
@@ -50,7 +51,11 @@ import joblib
 from .utils import (
     compile_parameter_space,
     is_square_symmetric,
+    silhouette_score_precomputed,
     stop_when_exceeding_trials,
+    TrialResourceMonitor,
+    check_trial_budget,
+    record_trial_cost,
 )
 
 
@@ -414,6 +419,106 @@ def convert_distance_matrix_to_kneighbors_matrix(
     
 #     return knn_matrix
 
+def kneighbors_triplets_from_rectangular_distance(distance_matrix, n_neighbors:int):
+    """
+    Get the k nearest columns of each row from a rectangular distance matrix as (row, column, distance) triplets.
+
+    Parameters
+    ----------
+    distance_matrix : np.ndarray or scipy.sparse matrix, shape (n_queries, n_references)
+        Dense distances or a sparse kNN distance graph where only the stored entries are candidate neighbors
+    n_neighbors : int
+        Number of nearest neighbors to keep for each row
+
+    Returns
+    -------
+    row, column, distance : np.ndarray
+    """
+    if sps.issparse(distance_matrix):
+        distance_matrix = sps.csr_matrix(distance_matrix)
+        row = np.repeat(np.arange(distance_matrix.shape[0]), np.diff(distance_matrix.indptr))
+        order = np.lexsort((distance_matrix.data, row))
+        rank = np.arange(order.size) - distance_matrix.indptr[row[order]]
+        order = order[rank < n_neighbors]
+        return row[order], distance_matrix.indices[order], distance_matrix.data[order]
+    else:
+        distance_matrix = np.asarray(distance_matrix)
+        n_neighbors = min(n_neighbors, distance_matrix.shape[1])
+        if n_neighbors < distance_matrix.shape[1]:
+            column = np.argpartition(distance_matrix, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        else:
+            column = np.tile(np.arange(distance_matrix.shape[1]), (distance_matrix.shape[0], 1))
+        row = np.repeat(np.arange(distance_matrix.shape[0]), n_neighbors)
+        column = column.ravel()
+        return row, column, distance_matrix[row, column]
+
+def update_kneighbors_graph(connectivities, distance_matrix, n_neighbors:int, updated_nodes):
+    """
+    Update a kNN connectivity graph (self included) after rows/columns of a square distance matrix were added or changed.
+
+    Rows of unchanged nodes only compare their previous neighbors with the updated nodes.  Rows of updated nodes and 
+    of nodes that had an updated node as a neighbor (its distance may have increased) are recomputed from the full row.
+
+    Parameters
+    ----------
+    connectivities : scipy.sparse matrix, shape (n_previous, n_previous)
+        Previous kNN connectivity graph (only the sparsity structure is used)
+    distance_matrix : np.ndarray, shape (n, n)
+        Updated distance matrix where the first n_previous nodes are the previous nodes in the same order
+    n_neighbors : int
+        Number of nearest neighbors of each node (including itself)
+    updated_nodes : array-like of int
+        Positions of changed previous nodes and of all added nodes (≥ n_previous)
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix, shape (n, n)
+        Connectivity graph with ones for the k nearest neighbors of each row
+    """
+    connectivities = sps.csr_matrix(connectivities)
+    n_previous = connectivities.shape[0]
+    n = distance_matrix.shape[0]
+    updated_nodes = np.unique(np.asarray(updated_nodes, dtype=int))
+    if n_neighbors > n:
+        raise ValueError(f"n_neighbors ({n_neighbors}) must be ≤ number of nodes ({n})")
+    if not np.all(np.diff(connectivities.indptr) == n_neighbors):
+        raise ValueError("connectivities must have n_neighbors entries in every row")
+
+    # Rows that need the full distance row
+    is_updated = np.zeros(n, dtype=bool)
+    is_updated[updated_nodes] = True
+    previous_neighbors = connectivities.indices.reshape(n_previous, n_neighbors)
+    recompute = np.zeros(n, dtype=bool)
+    recompute[n_previous:] = True
+    recompute[:n_previous] = is_updated[:n_previous] | is_updated[:n_previous][previous_neighbors].any(axis=1)
+
+    neighbors = np.empty((n, n_neighbors), dtype=int)
+
+    # Unchanged rows: previous neighbors vs. updated nodes
+    rows = np.flatnonzero(~recompute)
+    if rows.size:
+        if updated_nodes.size:
+            candidates = np.hstack([previous_neighbors[rows], np.broadcast_to(updated_nodes, (rows.size, updated_nodes.size))])
+            distances = distance_matrix[rows[:,None], candidates]
+            index = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+            neighbors[rows] = np.take_along_axis(candidates, index, axis=1)
+        else:
+            neighbors[rows] = previous_neighbors[rows]
+
+    # Updated rows: full rows
+    rows = np.flatnonzero(recompute)
+    if rows.size:
+        distances = np.asarray(distance_matrix[rows])
+        if n_neighbors < n:
+            neighbors[rows] = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        else:
+            neighbors[rows] = np.arange(n)
+
+    return sps.csr_matrix(
+        (np.ones(n * n_neighbors, dtype=float), (np.repeat(np.arange(n), n_neighbors), neighbors.ravel())),
+        shape=(n, n),
+    )
+
 class KNeighborsKernel(PCManifoldKernel):
     """
     K-Nearest Neighbors Kernel
@@ -450,18 +555,23 @@ class KNeighborsKernel(PCManifoldKernel):
                 print("Precomputed distance matrix detected. Skipping pairwise distance calculations.", file=sys.stderr, flush=True)
         else:
             distance_matrix = self.distance(X, Y)
-        return self.evaluate(distance_matrix)
+        return self.evaluate(distance_matrix, is_pdist=Y is None)
 
-    def evaluate(self, distance_matrix):
+    def evaluate(self, distance_matrix, is_pdist=None):
 
-        # Compute KNN connectivity kernel
+        # Compute KNN connectivity kernel (component-wise evaluations are always rectangular, even for square blocks)
         distance_matrix_is_square = False
         shape = distance_matrix.shape
-        if shape[0] == shape[1]:
-            if issymmetric(distance_matrix):
-                distance_matrix_is_square = True
+        if is_pdist is None:
+            if shape[0] == shape[1]:
+                if issymmetric(distance_matrix):
+                    distance_matrix_is_square = True
+        else:
+            distance_matrix_is_square = is_pdist
         if distance_matrix_is_square:
             connectivities = kneighbors_graph(distance_matrix, n_neighbors=self.n_neighbors, metric="precomputed", include_self=True, mode="connectivity")
+            # Keep the pairwise graph structure for incremental updates (see `update_kneighbors_graph`)
+            self.connectivities_ = connectivities.copy()
         else:
             connectivities = brute_force_kneighbors_graph_from_rectangular_distance(distance_matrix, n_neighbors=self.n_neighbors, include_self=True, mode="connectivity")
 
@@ -495,6 +605,9 @@ class KNeighborsLeidenClustering(object):
         checkpoint_directory=None,
         study_timeout=None,
         study_callbacks=None,
+        time_penalty:float=None,
+        trial_time_budget:float=None,
+        trial_memory_budget:float=None,
         random_state=0,
         verbose=1,
         stream=sys.stdout,
@@ -531,6 +644,11 @@ class KNeighborsLeidenClustering(object):
         self.study_callbacks = study_callbacks
         self.objective_direction = objective_direction
 
+        # Cost-aware tuning
+        self.time_penalty = time_penalty
+        self.trial_time_budget = trial_time_budget
+        self.trial_memory_budget = trial_memory_budget
+
         # Hyperparameters
         self.is_tuned = True
         if n_neighbors == "auto":
@@ -576,6 +694,20 @@ class KNeighborsLeidenClustering(object):
 
         return transformations[self.method](distances)
     
+    @staticmethod
+    def _integer_coded_distance_matrix(distance_matrix):
+        """
+        Get the observations and a view of the distance matrix labeled by integer positions so graph vertex 
+        names are positions in the distance matrix.
+        """
+        if isinstance(distance_matrix, pd.DataFrame):
+            observations = distance_matrix.index
+            distance_matrix = distance_matrix.to_numpy(copy=False)
+        else:
+            distance_matrix = np.asarray(distance_matrix)
+            observations = pd.RangeIndex(distance_matrix.shape[0])
+        return observations, pd.DataFrame(distance_matrix, copy=False)
+
     def tune(
         self,
         distance_matrix:pd.DataFrame,
@@ -583,7 +715,10 @@ class KNeighborsLeidenClustering(object):
         **study_kws,
         ):
 
+        _, distance_matrix = self._integer_coded_distance_matrix(distance_matrix)
+
         def _objective(trial):
+            monitor = None
             try:
 
                 # Compile parameters
@@ -598,6 +733,9 @@ class KNeighborsLeidenClustering(object):
                 if n_neighbors >= distance_matrix.shape[0]:
                     raise ValueError(f"n_neighbors {n_neighbors} is larger than the number of observations {distance_matrix.shape[0]}")
                 else:
+                    # Skip configurations predicted to exceed the per-trial budget
+                    check_trial_budget(study, trial, params, trial_time_budget=self.trial_time_budget, trial_memory_budget=self.trial_memory_budget, logger=self.logger)
+                    monitor = TrialResourceMonitor(memory_tracker="rss" if self.trial_memory_budget is None else "tracemalloc").start()
 
                     # Convert distance matrix to non-redundant KNN
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Convert distance matrix to non-redundant KNN: n_neighbors={n_neighbors}")
@@ -635,21 +773,22 @@ class KNeighborsLeidenClustering(object):
                     node_to_cluster = pd.Series(enx.get_undirected_igraph_connected_components(graph_clustered))
                     del graph
 
-                    # Calculate silhouette scores
+                    # Calculate silhouette scores (vertex names are positions in the distance matrix)
                     if self.verbose > 1: self.logger.info(f"[Trial {trial.number}] Calculating silhouette scores: n_neighbors={n_neighbors}")
-                    clustered_nodes = node_to_cluster.index
-                    index = clustered_nodes.map(lambda x: distance_matrix.index.get_loc(x)).values
-                    dist = distance_matrix.values[index,:][:,index]
-                    score = silhouette_score(dist, node_to_cluster.values, metric="precomputed", sample_size=None, random_state=None) 
-                    del dist
+                    score = silhouette_score_precomputed(distance_matrix, node_to_cluster.values, index=node_to_cluster.index.values.astype(np.int64))
+
+                    return record_trial_cost(trial, score, monitor, study=study, direction=self.objective_direction, time_penalty=getattr(self, "time_penalty", None))
 
-                    return score
+            except optuna.TrialPruned:
+                raise
 
             except Exception as e:
                 self.logger.error(f"[Trial {trial.number}] Failed due to error: {e}. Marking as pruned.")
                 raise optuna.TrialPruned()  # Prevents skipping trials
 
             finally:
+                if monitor is not None:
+                    monitor.stop()
                 if self.checkpoint_directory:
                     joblib.dump(study, os.path.join(self.checkpoint_directory,  f"{self.name}.Optuna.{self.__class__.__name__}.pkl"))  # Save checkpoint
 
@@ -751,10 +890,13 @@ class KNeighborsLeidenClustering(object):
             for k, v in self.study_.best_params.items():
                 setattr(self,k,v)
             if self.verbose > 0:
-                self.logger.info(f"Tuned parameters (Score={self.study_.best_value}): {self.study_.best_params}")
+                self.logger.info(f"Tuned parameters (Score={self.study_.best_trial.user_attrs.get('score', self.study_.best_value)}): {self.study_.best_params}")
                 self.logger.info("[End] Hyperparameter Tuning")
             self.is_tuned = True
 
+        # Label the distance matrix with integer positions so clustered nodes are positions without lookups
+        observations, distance_matrix = self._integer_coded_distance_matrix(distance_matrix)
+
         # Convert distance matrix to non-redundant KNN
         knn = convert_distance_matrix_to_kneighbors_matrix(distance_matrix, n_neighbors=self.n_neighbors, redundant_form=False)
 
@@ -783,15 +925,23 @@ class KNeighborsLeidenClustering(object):
 
         # Get clustered graph
         self.graph_clustered_ = graph.subgraph_edges(clustered_edgelist, delete_vertices=True)
-        self.labels_ = pd.Series(enx.get_undirected_igraph_connected_components(self.graph_clustered_, cluster_prefix=self.cluster_prefix))
+        node_to_cluster = pd.Series(enx.get_undirected_igraph_connected_components(self.graph_clustered_, cluster_prefix=self.cluster_prefix))
         del graph
 
-        # Calculate silhouette scores
-        clustered_nodes = self.labels_.index
-        index = clustered_nodes.map(lambda x: distance_matrix.index.get_loc(x)).values
-        dist = distance_matrix.values[index,:][:,index]
-        self.score_ = silhouette_score(dist, self.labels_.values, metric="precomputed", sample_size=None, random_state=None) 
-        del dist
+        # Calculate silhouette scores (vertex names are positions in the distance matrix)
+        clustered_positions = node_to_cluster.index.values.astype(np.int64)
+        self.score_ = silhouette_score_precomputed(distance_matrix, node_to_cluster.values, index=clustered_positions)
+
+        # Restore observation names
+        self.graph_clustered_.vs["name"] = observations[np.asarray(self.graph_clustered_.vs["name"], dtype=np.int64)].tolist()
+        self.labels_ = pd.Series(node_to_cluster.values, index=observations[clustered_positions])
+
+        # Compact neighbor index for out-of-sample assignment
+        self.observations_ = observations
+        label_codes, self.classes_ = pd.factorize(self.labels_, sort=True)
+        self.label_codes_ = np.full(len(self.observations_), -1, dtype=np.int32)
+        self.label_codes_[clustered_positions] = label_codes
+        self.classes_ = pd.Index(self.classes_)
         
         self.n_observations_ = distance_matrix.shape[0]
         self.n_clusters_ = self.labels_.nunique()
@@ -808,6 +958,76 @@ class KNeighborsLeidenClustering(object):
         self.fit(**kws)
         return self.labels_
             
+    def predict(
+        self,
+        X,
+        n_neighbors:int=None,
+        minimum_consistency:float=0.5,
+        unassigned_label=np.nan,
+        return_consistency:bool=False,
+        ):
+        """
+        Assign new observations to the fitted clusters by a similarity-weighted vote of their k nearest fitted observations.
+
+        Parameters
+        ----------
+        X : pd.DataFrame, np.ndarray, or scipy.sparse matrix, shape (n_new_observations, n_fitted_observations)
+            Distances from new observations (rows) to the fitted observations (columns).  pd.DataFrame columns are aligned
+            to the fitted observations.  np.ndarray and scipy.sparse columns must be in the fitted order (`observations_`).
+            With a scipy.sparse kNN distance graph, only the stored entries are used as candidate neighbors.
+        n_neighbors : int
+            Number of nearest fitted observations to vote [Default: n_neighbors from fit]
+        minimum_consistency : float
+            Minimum fraction of the neighbor similarity that must support the winning cluster.  Observations below this 
+            threshold (or with no clustered neighbors) are unassigned.  Neighbors that were disconnected during fit do not vote
+            but count towards the total.
+        unassigned_label : 
+            Label for unassigned observations [Default: np.nan]
+        return_consistency : bool
+            If True, return a pd.DataFrame with the labels and consistency of each observation
+
+        Returns
+        -------
+        pd.Series of labels (or pd.DataFrame with columns ["label", "consistency"])
+        """
+        if not self.is_fitted:
+            raise Exception("Please fit model before using predict")
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+
+        label_codes = self.label_codes_
+        if isinstance(X, pd.DataFrame):
+            missing_observations = X.columns.difference(self.observations_)
+            if len(missing_observations):
+                raise ValueError(f"X has {len(missing_observations)} columns that are not fitted observations (e.g., {missing_observations[0]})")
+            if not X.columns.equals(self.observations_):
+                label_codes = self.label_codes_[self.observations_.get_indexer(X.columns)]
+            index = X.index
+            X = X.values
+        else:
+            if X.shape[1] != len(self.observations_):
+                raise ValueError(f"X must have one column per fitted observation ({len(self.observations_)}).  Provided {X.shape[1]} columns.")
+            index = pd.RangeIndex(X.shape[0])
+
+        # Similarity-weighted vote over the k nearest fitted observations
+        row, column, distance = kneighbors_triplets_from_rectangular_distance(X, n_neighbors=n_neighbors)
+        weight = np.clip(self.distance_to_similarity(np.asarray(distance, dtype=float)), 0, None)
+        n_queries = X.shape[0]
+        total = np.bincount(row, weights=weight, minlength=n_queries)
+        neighbor_codes = label_codes[column]
+        is_clustered = neighbor_codes >= 0
+        votes = sps.csr_matrix((weight[is_clustered], (row[is_clustered], neighbor_codes[is_clustered])), shape=(n_queries, len(self.classes_)))
+        best = np.asarray(votes.argmax(axis=1)).ravel()
+        best_votes = votes.max(axis=1).toarray().ravel()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            consistency = np.where(total > 0, best_votes / total, 0.0)
+
+        labels = pd.Series(self.classes_.values[best], index=index, name=self.name, dtype=object)
+        labels[(consistency < minimum_consistency) | (best_votes <= 0)] = unassigned_label
+        if return_consistency:
+            return pd.DataFrame({"label":labels, "consistency":consistency}, index=index)
+        return labels
+
     def to_file(self, filepath):
         # stream = self.stream
         # self.stream = None
@@ -819,6 +1039,140 @@ class KNeighborsLeidenClustering(object):
         cls = read_pickle(filepath)
         return cls
 
+    _directory_params = [
+        "name", "observation_type", "feature_type", "class_type", "method", "initial_distance_metric", "scoring_distance_metric", "n_neighbors",
+        "n_iter", "converge_iter", "minimum_membership_consistency", "cluster_prefix",
+        "n_trials", "n_jobs", "n_concurrent_trials", "initial_params", "objective_direction", "checkpoint_directory", "study_timeout",
+        "time_penalty", "trial_time_budget", "trial_memory_budget", "random_state", "verbose",
+    ]
+
+    @staticmethod
+    def _index_to_array(index:pd.Index):
+        if index.dtype == object or pd.api.types.is_string_dtype(index.dtype):
+            return np.asarray(index.astype(str), dtype=str)
+        return np.asarray(index)
+
+    @staticmethod
+    def _array_to_index(values:np.ndarray):
+        if values.dtype.kind == "U":
+            return pd.Index(values.astype(object))
+        return pd.Index(values)
+
+    def to_directory(self, directory:str, include_data:bool=False):
+        """
+        Write a fitted model to a directory without pickling the object:
+
+            manifest.json: parameters, scores, and the files written
+            labels.npz: fitted observations, labels as a categorical (classes and int codes), and the compact neighbor index used by `predict`
+            graph.npz: clustered graph as edge arrays (vertices are positions in the fitted observations)
+            study.pkl: optuna study (joblib) if the model was tuned
+            X.pkl: input data if include_data=True and the data was stored during fit (copy=True)
+
+        Use `from_directory` to load all or some of the components (e.g., labels only).
+        """
+        if not self.is_fitted:
+            raise Exception("Please fit model before using to_directory")
+        os.makedirs(directory, exist_ok=True)
+        files = dict()
+
+        # Labels
+        label_positions = self.observations_.get_indexer(self.labels_.index)
+        np.savez_compressed(
+            os.path.join(directory, "labels.npz"), 
+            observations=self._index_to_array(self.observations_), 
+            classes=self._index_to_array(self.classes_), 
+            label_positions=label_positions.astype(np.int64), 
+            label_codes=self.label_codes_[label_positions],
+        )
+        files["labels"] = "labels.npz"
+
+        # Clustered graph
+        graph = self.graph_clustered_
+        vertices = self.observations_.get_indexer(graph.vs["name"]) if "name" in graph.vs.attributes() else np.arange(graph.vcount())
+        edges = np.asarray(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        edge_attributes = {f"edge_{attribute}":np.asarray(graph.es[attribute], dtype=float) for attribute in graph.es.attributes()}
+        np.savez_compressed(
+            os.path.join(directory, "graph.npz"), 
+            vertices=vertices.astype(np.int64), 
+            source=edges[:,0], 
+            target=edges[:,1], 
+            **edge_attributes,
+        )
+        files["graph"] = "graph.npz"
+
+        # Study
+        if hasattr(self, "study_"):
+            joblib.dump(self.study_, os.path.join(directory, "study.pkl"))
+            files["study"] = "study.pkl"
+
+        # Data
+        if include_data and hasattr(self, "X_"):
+            write_pickle(self.X_, os.path.join(directory, "X.pkl"))
+            files["data"] = "X.pkl"
+
+        manifest = {
+            "class":self.__class__.__name__,
+            "params":{k:getattr(self, k) for k in self._directory_params},
+            "is_tuned":self.is_tuned,
+            "score":self.score_,
+            "n_observations":self.n_observations_,
+            "n_clusters":self.n_clusters_,
+            "best_params":self.study_.best_params if hasattr(self, "study_") else None,
+            "best_value":self.study_.best_value if hasattr(self, "study_") else None,
+            "files":files,
+        }
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=4, default=lambda x: x.item() if isinstance(x, np.generic) else str(x))
+
+    @classmethod
+    def from_directory(cls, directory:str, load_graph:bool=True, load_study:bool=True, load_data:bool=True, stream=sys.stdout):
+        """
+        Load a model written with `to_directory`.  Labels (and the neighbor index for `predict`) are always loaded
+        while the clustered graph, study, and input data are only deserialized if requested.
+        """
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        files = manifest["files"]
+
+        # Parameters that are no longer supported (e.g., score_per_time) are ignored
+        params = {k:v for k, v in manifest["params"].items() if k in cls._directory_params}
+        model = cls(**params, stream=stream)
+        model.is_tuned = manifest["is_tuned"]
+        model.score_ = manifest["score"]
+        model.n_observations_ = manifest["n_observations"]
+        model.n_clusters_ = manifest["n_clusters"]
+
+        # Labels
+        with np.load(os.path.join(directory, files["labels"]), allow_pickle=False) as labels:
+            model.observations_ = cls._array_to_index(labels["observations"])
+            model.classes_ = cls._array_to_index(labels["classes"])
+            label_positions = labels["label_positions"]
+            label_codes = labels["label_codes"]
+        model.label_codes_ = np.full(len(model.observations_), -1, dtype=np.int32)
+        model.label_codes_[label_positions] = label_codes
+        model.labels_ = pd.Series(model.classes_.values[label_codes], index=model.observations_[label_positions])
+
+        # Clustered graph
+        if load_graph:
+            with np.load(os.path.join(directory, files["graph"]), allow_pickle=False) as graph:
+                vertices = graph["vertices"]
+                model.graph_clustered_ = ig.Graph(n=vertices.size, edges=np.column_stack([graph["source"], graph["target"]]).tolist(), directed=False)
+                model.graph_clustered_.vs["name"] = model.observations_[vertices].tolist()
+                for key in graph.files:
+                    if key.startswith("edge_"):
+                        model.graph_clustered_.es[key[len("edge_"):]] = graph[key].tolist()
+
+        # Study
+        if load_study and ("study" in files):
+            model.study_ = joblib.load(os.path.join(directory, files["study"]))
+
+        # Data
+        if load_data and ("data" in files):
+            model.X_ = read_pickle(os.path.join(directory, files["data"]))
+
+        model.is_fitted = True
+        return model
+
     # =======
     # Built-in
     # =======
@@ -1,38 +1,189 @@
 #!/usr/bin/env python
 import sys
 import os
-from tqdm import tqdm
+import json
+import hashlib
+import time
+import threading
 import numpy as np
 import pandas as pd
+import scipy.sparse as sps
 import optuna
 
-def fast_groupby(X: pd.DataFrame, y: pd.Series, method: str = "sum"):
-    if not np.all(X.shape[0] == y.size):
+def sparse_frame_from_spmatrix(matrix, index=None, columns=None):
+    """
+    Same as `pd.DataFrame.sparse.from_spmatrix` but the columns are pd.SparseDtype(dtype, fill_value=0) for every dtype.
+
+    pandas uses a NaN fill_value for float matrices so implicit zeros would be read as NaN (e.g., by sparse `sum` 
+    or `mean`).  The values and indices of each column are not copied.
+    """
+    df = pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=columns)
+    dtype = pd.SparseDtype(matrix.dtype, fill_value=np.zeros(1, dtype=matrix.dtype)[0].item())
+    arrays = dict()
+    for j in range(df.shape[1]):
+        array = df.iloc[:, j].array
+        arrays[j] = pd.arrays.SparseArray(array.sp_values, sparse_index=array.sp_index, dtype=dtype)
+    output = pd.DataFrame(arrays, index=df.index, copy=False)
+    output.columns = df.columns
+    return output
+
+def fast_groupby(X, y, method: str = "sum"):
+    """
+    Group the rows of X by the classes in y with a single sparse matrix product.
+
+    A sparse one-hot class indicator (n_classes, n_observations) is built from the category codes of y
+    and multiplied with X so all features are aggregated in one pass.  Sparse inputs are not densified.
+
+    Parameters
+    ----------
+    X : pd.DataFrame, np.ndarray, or scipy.sparse matrix (n_observations, n_features)
+        Values to aggregate.  pd.DataFrame objects with pd.SparseDtype columns are treated as sparse.
+    y : pd.Series or array-like (n_observations,)
+        Class labels.  Rows of the output follow the category order of y (unused categories are dropped).
+    method : str
+        One of {sum, mean, any, max}.  `any` (and `max` on boolean tables) returns a boolean table.
+
+    Returns
+    -------
+    pd.DataFrame (n_classes, n_features)
+        If X is sparse, the columns are pd.SparseDtype
+    """
+    if method not in {"sum", "mean", "any", "max"}:
+        raise ValueError("Unsupported method. Use 'sum', 'mean', 'any', or 'max'.")
+    if not np.all(X.shape[0] == len(y)):
         raise IndexError("X.shape[0] must equal y.size")
-    if not np.all(X.index == y.index):
-        raise IndexError("X.index must equal y.index")
-    if not isinstance(y, pd.CategoricalDtype):
+    if isinstance(X, pd.DataFrame) and isinstance(y, pd.Series):
+        if not np.all(X.index == y.index):
+            raise IndexError("X.index must equal y.index")
+    if not isinstance(y, pd.Series):
+        y = pd.Series(y)
+    if not isinstance(y.dtype, pd.CategoricalDtype):
         y = y.astype("category")
-    
-    # Convert y to numeric indices
-    unique_classes, y_indices = np.unique(y, return_inverse=True)
-    
-    arrays = []
-    for col in tqdm(X.columns, "Grouping rows by", unit=" column"):
-        summed_values = np.bincount(y_indices, weights=X[col].values, minlength=len(unique_classes))
-        
-        if method == "sum":
-            result_values = summed_values
-        elif method == "mean":
-            counts = np.bincount(y_indices, minlength=len(unique_classes))
-            result_values = np.divide(summed_values, counts, out=np.zeros_like(summed_values), where=counts > 0)
+    y = y.cat.remove_unused_categories()
+
+    # Class indicator
+    codes = y.cat.codes.values.astype(np.int64)
+    if np.any(codes < 0):
+        raise ValueError("y must not contain missing values")
+    classes = y.cat.categories
+    n_observations, n_classes = codes.size, classes.size
+    class_sizes = np.bincount(codes, minlength=n_classes)
+    indicator = sps.csr_matrix((np.ones(n_observations), (codes, np.arange(n_observations))), shape=(n_classes, n_observations))
+
+    # Values
+    if isinstance(X, pd.DataFrame):
+        columns = X.columns
+        if X.shape[1] > 0 and all(isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes):
+            values = X.sparse.to_coo().tocsr()
         else:
-            raise ValueError("Unsupported method. Use 'sum' or 'mean'.")
-        
-        arrays.append(result_values)
-    
-    X_grouped = np.vstack(arrays).T
-    return pd.DataFrame(X_grouped, index=unique_classes, columns=X.columns)
+            values = X.to_numpy()
+    else:
+        columns = pd.RangeIndex(X.shape[1])
+        values = sps.csr_matrix(X) if sps.issparse(X) else np.asarray(X)
+    is_sparse = sps.issparse(values)
+
+    # Aggregate
+    if method == "max" and values.dtype != bool:
+        if is_sparse:
+            # Maximum of stored values for each (class, feature) with implicit zeros for incomplete groups
+            values = values.tocoo()
+            keys = codes[values.row] * values.shape[1] + values.col
+            order = np.argsort(keys, kind="stable")
+            keys, starts = np.unique(keys[order], return_index=True)
+            maxima = np.maximum.reduceat(values.data[order], starts) if keys.size else values.data[:0]
+            nnz_per_key = np.diff(np.append(starts, order.size))
+            class_index, feature_index = np.divmod(keys, values.shape[1])
+            maxima = np.where(nnz_per_key < class_sizes[class_index], np.maximum(maxima, 0), maxima)
+            X_grouped = sps.csr_matrix((maxima, (class_index, feature_index)), shape=(n_classes, values.shape[1]))
+        else:
+            order = np.argsort(codes, kind="stable")
+            starts = np.concatenate([[0], np.cumsum(class_sizes)[:-1]])
+            X_grouped = np.maximum.reduceat(values[order], starts, axis=0)
+    else:
+        X_grouped = indicator @ values
+        if method in {"any", "max"}:
+            X_grouped = X_grouped > 0
+        elif method == "mean":
+            if is_sparse:
+                X_grouped = sps.diags(1 / class_sizes) @ X_grouped
+            else:
+                X_grouped = X_grouped / class_sizes.reshape(-1, 1)
+
+    if is_sparse:
+        return sparse_frame_from_spmatrix(sps.csr_matrix(X_grouped), index=classes, columns=columns)
+    else:
+        return pd.DataFrame(np.asarray(X_grouped), index=classes, columns=columns)
+
+def md5hash_data(data) -> str:
+    """Compute a content-based MD5 hash of a pd.DataFrame, pd.Series, or np.ndarray (including index and columns)."""
+    hasher = hashlib.md5()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        hasher.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        if isinstance(data, pd.DataFrame):
+            hasher.update(pd.util.hash_pandas_object(data.columns.to_series(), index=False).values.tobytes())
+    else:
+        data = np.ascontiguousarray(data)
+        hasher.update(str((data.shape, data.dtype.str)).encode())
+        hasher.update(memoryview(data).cast("B"))
+    return hasher.hexdigest()
+
+def cached_groupby(X: pd.DataFrame, y: pd.Series, method: str = "sum", cache_directory: str = None, logger=None):
+    """
+    Content-addressed cache for `fast_groupby`.
+
+    The grouped matrix is keyed by the MD5 hashes of X, y, and method and is stored in `cache_directory` as
+    `fast_groupby.{key}.npz` (CSR values of sparse results), `fast_groupby.{key}.npy` (values of dense results), 
+    and `fast_groupby.{key}.json` (index and columns).  A cache hit returns the same representation as a miss: 
+    sparse results are rebuilt as sparse DataFrames and dense values are loaded with `mmap_mode="c"` (zero-copy 
+    and writeable as copy-on-write).  Only calls with identical X, y, and method (e.g., reruns of the same step) 
+    share entries.  If `cache_directory` is None, the grouping is computed.
+    """
+    if cache_directory is None:
+        return fast_groupby(X, y, method=method)
+
+    # Dtypes are part of the key because the content hash is the same for dense and sparse (or bool and float) X
+    representation = f"{type(X).__name__}:{sorted(set(map(str, X.dtypes)))}" if isinstance(X, pd.DataFrame) else f"{type(X).__name__}:{getattr(X, 'dtype', None)}"
+    key = hashlib.md5("|".join([md5hash_data(X), md5hash_data(y), method, representation]).encode()).hexdigest()
+    sparse_values_filepath = os.path.join(cache_directory, f"fast_groupby.{key}.npz")
+    dense_values_filepath = os.path.join(cache_directory, f"fast_groupby.{key}.npy")
+    labels_filepath = os.path.join(cache_directory, f"fast_groupby.{key}.json")
+
+    if os.path.exists(labels_filepath):
+        with open(labels_filepath, "r") as f:
+            labels = json.load(f)
+        values_filepath = sparse_values_filepath if labels.get("is_sparse") else dense_values_filepath
+        if ("is_sparse" in labels) and os.path.exists(values_filepath):
+            if logger is not None:
+                logger.info(f"Loading grouped matrix from cache: {values_filepath}")
+            if labels["is_sparse"]:
+                X_grouped = sparse_frame_from_spmatrix(sps.load_npz(values_filepath), index=labels["index"], columns=labels["columns"])
+            else:
+                X_grouped = pd.DataFrame(np.load(values_filepath, mmap_mode="c"), index=labels["index"], columns=labels["columns"], copy=False)
+            X_grouped.index.name = labels["index_name"]
+            X_grouped.columns.name = labels["columns_name"]
+            return X_grouped
+
+    X_grouped = fast_groupby(X, y, method=method)
+
+    os.makedirs(cache_directory, exist_ok=True)
+    is_sparse = hasattr(X_grouped, "sparse")
+    if is_sparse:
+        values_filepath = sparse_values_filepath
+        sps.save_npz(values_filepath, X_grouped.sparse.to_coo().tocsr())
+    else:
+        values_filepath = dense_values_filepath
+        np.save(values_filepath, np.ascontiguousarray(X_grouped.values))
+    if logger is not None:
+        logger.info(f"Writing grouped matrix to cache: {values_filepath}")
+    with open(labels_filepath, "w") as f:
+        json.dump({
+            "index":X_grouped.index.tolist(),
+            "columns":X_grouped.columns.tolist(),
+            "index_name":X_grouped.index.name,
+            "columns_name":X_grouped.columns.name,
+            "is_sparse":is_sparse,
+            }, f)
+    return X_grouped
 
 def compile_parameter_space(trial, param_space): # This should be merged with `compile_parameter_space` from clairvoyance
     params = dict()
@@ -48,18 +199,127 @@ def compile_parameter_space(trial, param_space): # This should be merged with `c
         params[k] = suggestion
     return params
 
-def is_square_symmetric(matrix, tol=1e-8, raise_exception=True):
-    """Check if a matrix is square and symmetric."""
-    matrix = np.array(matrix)  # Ensure it's a NumPy array
-    same_shape = matrix.shape[0] == matrix.shape[1]
-    all_close = np.allclose(matrix, matrix.T, atol=tol)
-    all_notnull = not np.any(np.isnan(matrix))
+def _get_matrix_values(matrix):
+    """Get the underlying values of a pd.DataFrame, np.ndarray, or np.memmap without copying when possible."""
+    if isinstance(matrix, pd.DataFrame):
+        return matrix.to_numpy(copy=False)
+    if isinstance(matrix, np.ndarray):
+        return matrix
+    return np.asarray(matrix)
+
+def is_square_symmetric(matrix, tol=1e-8, raise_exception=True, block_size:int=2048):
+    """
+    Check if a matrix is square, symmetric, and does not contain NaN.
+
+    Tiles of the upper triangle are compared with the transposed tiles of the lower triangle so no full-size
+    temporary arrays are created (works on np.memmap) and the check stops at the first failing tile.
+    """
+    values = _get_matrix_values(matrix)
+    same_shape = (values.ndim == 2) and (values.shape[0] == values.shape[1])
+    all_close = same_shape
+    all_notnull = same_shape
+    failed_tile = None
+    if same_shape:
+        n = values.shape[0]
+        for i in range(0, n, block_size):
+            for j in range(i, n, block_size):
+                upper = values[i:i+block_size, j:j+block_size]
+                lower = values[j:j+block_size, i:i+block_size]
+                if np.isnan(upper).any() or np.isnan(lower).any():
+                    all_notnull = False
+                elif not np.allclose(upper, lower.T, atol=tol):
+                    all_close = False
+                if not (all_notnull and all_close):
+                    failed_tile = (i, j)
+                    break
+            if failed_tile is not None:
+                break
     status_ok = all([same_shape, all_close, all_notnull])
     if raise_exception:
         if not status_ok:
-            raise ValueError(f"Not symmetric\n * Square: {same_shape}\n * Upper/lower triangle close (tol={tol}): {all_close}\n * All not NaN {all_notnull}")
+            raise ValueError(f"Not symmetric\n * Square: {same_shape}\n * Upper/lower triangle close (tol={tol}): {all_close}\n * All not NaN {all_notnull}\n * First failing tile (row, column): {failed_tile}")
     return status_ok
 
+def symmetrize_inplace(matrix, method:str="mean", block_size:int=2048):
+    """
+    Symmetrize a square matrix in-place tile by tile using the mean, maximum, or minimum of the upper and lower triangles.
+
+    Only one pair of tiles is held in memory at a time so this works on np.memmap inputs.
+    pd.DataFrame inputs are modified in-place only if their values are a writeable view (single dtype block without 
+    copy-on-write), otherwise a ValueError is raised instead of silently symmetrizing a copy.
+    """
+    functions = {
+        "mean": lambda a, b: (a + b) / 2,
+        "maximum": np.maximum,
+        "minimum": np.minimum,
+    }
+    if method not in functions:
+        raise ValueError(f"Unknown method: {method}. Choose from {list(functions.keys())}")
+    values = _get_matrix_values(matrix)
+    if not ((values.ndim == 2) and (values.shape[0] == values.shape[1])):
+        raise ValueError("Matrix must be square")
+    if not values.flags.writeable:
+        raise ValueError("Matrix values are read-only (e.g., pandas copy-on-write).  Please provide a writeable np.ndarray or np.memmap")
+    if isinstance(matrix, pd.DataFrame) and not np.shares_memory(values, _get_matrix_values(matrix)):
+        raise ValueError("pd.DataFrame values are not a view (e.g., multiple dtype blocks) so the DataFrame cannot be modified in-place.  Please provide a writeable np.ndarray or np.memmap")
+
+    n = values.shape[0]
+    for i in range(0, n, block_size):
+        for j in range(i, n, block_size):
+            tile = functions[method](values[i:i+block_size, j:j+block_size], values[j:j+block_size, i:i+block_size].T)
+            values[i:i+block_size, j:j+block_size] = tile
+            values[j:j+block_size, i:i+block_size] = tile.T
+    return matrix
+
+def silhouette_score_precomputed(distance_matrix, labels, index=None, block_size:int=2048):
+    """
+    Mean silhouette coefficient from a precomputed distance matrix evaluated in row blocks.
+
+    Same as `sklearn.metrics.silhouette_score(distance_matrix[index][:,index], labels, metric="precomputed")` but the 
+    submatrix of `index` is never materialized.  Per-cluster distance sums of each row block are computed with a sparse
+    one-hot product over all columns (columns not in `index` have no cluster) so only a block of rows is copied at a time.
+
+    Parameters
+    ----------
+    distance_matrix : pd.DataFrame, np.ndarray, or np.memmap, shape (n, n)
+        Precomputed distances
+    labels : array-like, shape (m,)
+        Cluster labels of the observations at `index`
+    index : array-like of int, shape (m,)
+        Positions of the labeled observations in `distance_matrix` [Default: all observations]
+    block_size : int
+        Number of rows evaluated at a time
+
+    Returns
+    -------
+    float
+    """
+    values = _get_matrix_values(distance_matrix)
+    n = values.shape[0]
+    index = np.arange(n) if index is None else np.asarray(index, dtype=np.int64)
+    codes, uniques = pd.factorize(np.asarray(labels))
+    n_labels = len(uniques)
+    m = index.size
+    if not 1 < n_labels < m:
+        raise ValueError(f"Number of labels is {n_labels}. Valid values are 2 to n_samples - 1 (inclusive)")
+
+    cluster_sizes = np.bincount(codes, minlength=n_labels).astype(float)
+    indicators = sps.csr_matrix((np.ones(m), (index, codes)), shape=(n, n_labels))
+    scores = np.empty(m)
+    for start in range(0, m, block_size):
+        block = slice(start, start + block_size)
+        block_codes = codes[block]
+        rows = np.arange(block_codes.size)
+        cluster_sums = np.asarray(indicators.T.dot(values[index[block]].T).T)
+        intra = cluster_sums[rows, block_codes] / np.maximum(cluster_sizes[block_codes] - 1, 1)
+        cluster_means = cluster_sums / cluster_sizes
+        cluster_means[rows, block_codes] = np.inf
+        inter = cluster_means.min(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block_scores = (inter - intra) / np.maximum(intra, inter)
+        block_scores[cluster_sizes[block_codes] <= 1] = 0.0
+        scores[block] = np.nan_to_num(block_scores)
+    return float(scores.mean())
 
 def stop_when_exceeding_trials(n_trials, logger):
     def callback(study, trial):
@@ -79,3 +339,354 @@ def stop_when_exceeding_trials(n_trials, logger):
             study.stop()
     
     return callback  # Return the function with access to `n_trials` and `logger`
+
+_TRACEMALLOC_LOCK = threading.Lock()
+_TRACEMALLOC_STATE = {"n_monitors":0, "started":False}
+
+class TrialResourceMonitor(object):
+    """
+    Record wall time (seconds) and peak memory (bytes) of a block of code.
+
+    memory_tracker="rss": resident memory is sampled from a background thread using `psutil` (installed with 
+        `memory_profiler`) and reported as the increase relative to the start of the block.  RSS does not return 
+        to the baseline between blocks (the allocator keeps freed pages) so a block that reuses freed memory 
+        reports less than its true peak, and with concurrent blocks memory of the whole process is included.  
+        This is cheap but only a rough indicator.
+    memory_tracker="tracemalloc": per-block peak of memory allocated through Python's allocator (includes NumPy 
+        and pandas arrays but not native libraries such as igraph or Annoy) relative to the start of the block.  
+        Tracing slows allocation-heavy code and with concurrent blocks the peak is shared by the process.
+
+    # Usage:
+    monitor = TrialResourceMonitor().start()
+    ...
+    monitor.stop()
+    monitor.wall_time_, monitor.peak_memory_
+    """
+    def __init__(self, interval:float=0.1, memory_tracker:str="rss"):
+        if memory_tracker not in {"rss", "tracemalloc"}:
+            raise ValueError("memory_tracker must be either 'rss' or 'tracemalloc'")
+        self.interval = interval
+        self.memory_tracker = memory_tracker
+        self.wall_time_ = None
+        self.peak_memory_ = None
+        self._process = None
+        self._thread = None
+        self._is_tracing = False
+        self._stop_event = threading.Event()
+
+    def _sample(self):
+        while not self._stop_event.wait(self.interval):
+            self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+
+    def start(self):
+        if self.memory_tracker == "tracemalloc":
+            import tracemalloc
+            with _TRACEMALLOC_LOCK:
+                if (_TRACEMALLOC_STATE["n_monitors"] == 0) and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _TRACEMALLOC_STATE["started"] = True
+                _TRACEMALLOC_STATE["n_monitors"] += 1
+                tracemalloc.reset_peak()
+                self._baseline_traced, _ = tracemalloc.get_traced_memory()
+            self._is_tracing = True
+            self._start_time = time.time()
+            return self
+        try:
+            import psutil
+            self._process = psutil.Process()
+            self._baseline_rss = self._peak_rss = self._process.memory_info().rss
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        except ImportError:
+            self._process = None
+        self._start_time = time.time()
+        return self
+
+    def stop(self):
+        if self.wall_time_ is None:
+            self.wall_time_ = time.time() - self._start_time
+            if self._is_tracing:
+                import tracemalloc
+                with _TRACEMALLOC_LOCK:
+                    _, peak_traced = tracemalloc.get_traced_memory()
+                    self.peak_memory_ = max(peak_traced - self._baseline_traced, 0)
+                    _TRACEMALLOC_STATE["n_monitors"] -= 1
+                    if (_TRACEMALLOC_STATE["n_monitors"] == 0) and _TRACEMALLOC_STATE["started"]:
+                        tracemalloc.stop()
+                        _TRACEMALLOC_STATE["started"] = False
+                self._is_tracing = False
+            if self._process is not None:
+                self._stop_event.set()
+                self._thread.join()
+                self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+                self.peak_memory_ = self._peak_rss - self._baseline_rss
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+def fit_trial_cost_model(study, cost_attr:str="wall_time", minimum_trials:int=3):
+    """
+    Fit a log-linear model of trial cost from the recorded history of an Optuna study:
+
+        log(cost) = b0 + sum_i b_i * log(1 + |param_i|)
+
+    Parameters
+    ----------
+    study : optuna.Study
+        Study with completed trials that have `cost_attr` stored in `trial.user_attrs`
+    cost_attr : str
+        User attribute to model (e.g., wall_time, peak_memory)
+    minimum_trials : int
+        Minimum number of recorded trials required to fit the model
+
+    Returns
+    -------
+    predict : callable or None
+        Function that takes a parameter dictionary and returns the predicted cost.  None if there are
+        not enough recorded trials.
+    """
+    trials = [
+        t for t in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+        if t.user_attrs.get(cost_attr) is not None and t.user_attrs[cost_attr] > 0
+    ]
+    if not trials:
+        return None
+    param_names = sorted(k for k, v in trials[-1].params.items() if isinstance(v, (int, float)) and not isinstance(v, bool))
+    trials = [t for t in trials if all(k in t.params for k in param_names)]
+    if len(trials) < max(minimum_trials, len(param_names) + 1):
+        return None
+
+    def _design(list_of_params):
+        A = np.log1p(np.abs(np.asarray([[params[k] for k in param_names] for params in list_of_params], dtype=float)))
+        return np.hstack([np.ones((A.shape[0], 1)), A])
+
+    A = _design([t.params for t in trials])
+    b = np.log([t.user_attrs[cost_attr] for t in trials])
+    coef, *_ = np.linalg.lstsq(A, b, rcond=None)
+
+    def predict(params:dict):
+        return float(np.exp(_design([params]) @ coef)[0])
+    return predict
+
+def check_trial_budget(study, trial, params:dict, trial_time_budget:float=None, trial_memory_budget:float=None, logger=None, minimum_trials:int=3):
+    """
+    Skip a trial (optuna.TrialPruned) if its predicted wall time (seconds) or peak memory (bytes)
+    exceeds the per-trial budget.  Predictions are fit from trials recorded with `record_trial_cost`.
+    Memory budgets should be used with trials monitored by `TrialResourceMonitor(memory_tracker="tracemalloc")` 
+    because RSS deltas are not reliable per-trial peaks.
+    """
+    for cost_attr, budget in [("wall_time", trial_time_budget), ("peak_memory", trial_memory_budget)]:
+        if budget is None:
+            continue
+        predict = fit_trial_cost_model(study, cost_attr=cost_attr, minimum_trials=minimum_trials)
+        if predict is None:
+            continue
+        predicted_cost = predict(params)
+        trial.set_user_attr(f"predicted_{cost_attr}", predicted_cost)
+        if predicted_cost > budget:
+            if logger is not None:
+                logger.warning(f"[Trial {trial.number}] Skipping {params}: predicted {cost_attr}={predicted_cost:.3f} exceeds budget={budget}")
+            trial.set_user_attr("memo", f"exceeds_{cost_attr}_budget")
+            raise optuna.TrialPruned()
+
+def record_trial_cost(trial, score:float, monitor:TrialResourceMonitor, study=None, direction:str="maximize", time_penalty:float=None):
+    """
+    Store the score and cost of a trial in `trial.user_attrs` and return the objective value.
+
+    Trials are ranked on the raw score.  If `time_penalty` is provided, the score is penalized (subtracted if 
+    direction="maximize", added if "minimize") by `time_penalty * log2(wall_time / median wall time)` of the 
+    completed trials in `study`, i.e., `time_penalty` is the score a trial must gain to justify doubling the 
+    wall time of a typical trial.  Trials faster than the median receive a bonus and the first trial is not 
+    penalized.  The raw score is in `trial.user_attrs["score"]`.
+    """
+    if direction not in {"maximize", "minimize"}:
+        raise ValueError("direction must be either 'maximize' or 'minimize'")
+    monitor.stop()
+    trial.set_user_attr("score", score)
+    trial.set_user_attr("wall_time", monitor.wall_time_)
+    trial.set_user_attr("peak_memory", monitor.peak_memory_)
+    if time_penalty:
+        if study is None:
+            study = trial.study
+        wall_times = [
+            t.user_attrs["wall_time"] for t in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+            if t.user_attrs.get("wall_time")
+        ]
+        if wall_times:
+            penalty = time_penalty * np.log2(max(monitor.wall_time_, 1e-12) / np.median(wall_times))
+            trial.set_user_attr("time_penalty", penalty)
+            return score - penalty if direction == "maximize" else score + penalty
+    return score
+
+class ClusterExport(object):
+    """
+    Lazy reader for the compact .npz export written by `edgelist_to_clusters.py --export_clusters`.
+
+    Arrays are read from the archive on first access and cached.  Graphs are only built when
+    `to_networkx` or `to_igraph` are called.  The archive stays open until `close` is called (or the 
+    context manager exits) and cached arrays (see `load`) remain available after closing.
+
+    # Usage:
+    with read_cluster_export("clusters.npz") as clusters:
+        clusters.get_node_to_cluster()
+        clusters.get_cluster_members("c-1")
+        graph = clusters.to_networkx()
+    """
+    def __init__(self, filepath:str):
+        self.filepath = filepath
+        self._archive = np.load(filepath, allow_pickle=False)
+        self._arrays = dict()
+        self.metadata_ = json.loads(str(self["metadata"]))
+        self.edge_attributes_ = [key[len("edge_"):] for key in self._archive.files if key.startswith("edge_")]
+
+    def __getitem__(self, key:str):
+        if key not in self._arrays:
+            if self._archive is None:
+                raise ValueError(f"{self.filepath} is closed and {key} was not loaded before closing")
+            self._arrays[key] = self._archive[key]
+        return self._arrays[key]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def load(self, keys=None):
+        """Read all (or `keys`) arrays into memory so they remain available after `close`"""
+        if keys is None:
+            keys = self._archive.files if self._archive is not None else []
+        for key in keys:
+            self[key]
+        return self
+
+    def get_edge_attributes(self):
+        return {name:self[f"edge_{name}"] for name in self.edge_attributes_}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(filepath={self.filepath}, number_of_nodes={self.number_of_nodes}, number_of_edges={self.number_of_edges}, number_of_clusters={self.number_of_clusters})"
+
+    @property
+    def nodes(self):
+        return self["nodes"]
+
+    @property
+    def clusters(self):
+        return self["clusters"]
+
+    @property
+    def number_of_nodes(self):
+        return self["labels"].size
+
+    @property
+    def number_of_edges(self):
+        return self["source"].size
+
+    @property
+    def number_of_clusters(self):
+        return self["cluster_indptr"].size - 1
+
+    def get_node_to_cluster(self):
+        return pd.Series(self.clusters[self["labels"]], index=pd.Index(self.nodes, name="id_node"), name="id_cluster")
+
+    def get_cluster_members(self, id_cluster:str):
+        k = pd.Index(self.clusters).get_loc(id_cluster)
+        indptr = self["cluster_indptr"]
+        return self.nodes[self["cluster_indices"][indptr[k]:indptr[k+1]]]
+
+    def get_cluster_sizes(self):
+        return pd.Series(np.diff(self["cluster_indptr"]), index=self.clusters, name="number_of_nodes")
+
+    def get_representatives(self):
+        representative = self["representative"]
+        return pd.Series(self.nodes[representative], index=pd.Index(self.clusters[self["labels"][representative]], name="id_cluster"), name="id_node")
+
+    def to_dict(self):
+        """
+        {id_cluster: {id_a, id_b, ...}} (same as `--export_dict`)
+        """
+        nodes = self.nodes.astype(object)
+        indptr = self["cluster_indptr"]
+        return dict(zip(self.clusters.astype(object), map(set, np.split(nodes[self["cluster_indices"]], indptr[1:-1]))))
+
+    def to_edgelist(self):
+        """
+        Edge table with node identifiers and edge attributes.
+        """
+        df = pd.DataFrame({"source":self.nodes[self["source"]], "target":self.nodes[self["target"]]})
+        for name in self.edge_attributes_:
+            df[name] = self[f"edge_{name}"]
+        return df
+
+    def _get_singletons(self):
+        is_connected = np.zeros(self.number_of_nodes, dtype=bool)
+        is_connected[self["source"]] = True
+        is_connected[self["target"]] = True
+        return np.flatnonzero(~is_connected)
+
+    def _get_singleton_attributes(self):
+        if self.metadata_.get("n_columns") == 5:
+            return {"weight":np.nan, "alignment_fraction":100.0}
+        return {name:np.nan for name in self.edge_attributes_}
+
+    def to_networkx(self, singleton_self_loops:bool=True):
+        """
+        Build a nx.Graph with the same node and edge attributes as `--export_graph`.
+        """
+        import networkx as nx
+
+        nodes = self.nodes.astype(object)
+        graph = nx.Graph()
+        graph.add_nodes_from(nodes)
+        edge_attributes = [self[f"edge_{name}"] for name in self.edge_attributes_]
+        graph.add_edges_from(zip(
+            nodes[self["source"]], 
+            nodes[self["target"]], 
+            map(lambda values: dict(zip(self.edge_attributes_, values)), zip(*edge_attributes)),
+        ))
+        if singleton_self_loops:
+            singleton_attributes = self._get_singleton_attributes()
+            for id in nodes[self._get_singletons()]:
+                graph.add_edge(id, id, **singleton_attributes)
+        nx.set_node_attributes(graph, dict(zip(nodes, self.clusters.astype(object)[self["labels"]])), "id_cluster")
+        nx.set_node_attributes(graph, dict(zip(nodes, self["intra-cluster_connectivity"])), "intra-cluster_connectivity")
+        nx.set_node_attributes(graph, dict(zip(nodes, self["representative"])), "representative")
+        return graph
+
+    def to_igraph(self, singleton_self_loops:bool=False):
+        """
+        Build an igraph.Graph where vertex i is node code i (vertex attribute `name` has the node identifiers).
+        """
+        import igraph as ig
+
+        source, target = self["source"], self["target"]
+        edge_attributes = {name:self[f"edge_{name}"] for name in self.edge_attributes_}
+        if singleton_self_loops:
+            singletons = self._get_singletons()
+            source, target = np.concatenate([source, singletons]), np.concatenate([target, singletons])
+            singleton_attributes = self._get_singleton_attributes()
+            edge_attributes = {name:np.concatenate([values, np.full(singletons.size, singleton_attributes.get(name, np.nan))]) for name, values in edge_attributes.items()}
+
+        graph = ig.Graph(n=self.number_of_nodes, edges=np.column_stack([source, target]).tolist(), directed=False)
+        for name, values in edge_attributes.items():
+            graph.es[name] = values.tolist()
+        graph.vs["name"] = self.nodes.tolist()
+        graph.vs["id_cluster"] = self.clusters[self["labels"]].tolist()
+        graph.vs["intra-cluster_connectivity"] = self["intra-cluster_connectivity"].tolist()
+        graph.vs["representative"] = self["representative"].tolist()
+        return graph
+
+def read_cluster_export(filepath:str):
+    """
+    Read the compact .npz export written by `edgelist_to_clusters.py --export_clusters`.
+    """
+    return ClusterExport(filepath)
@@ -0,0 +1,115 @@
+import os
+import sys
+import subprocess
+import importlib.util
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("networkx")
+pytest.importorskip("tqdm")
+
+script_filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bin", "edgelist_to_clusters.py")
+spec = importlib.util.spec_from_file_location("edgelist_to_clusters", script_filepath)
+edgelist_to_clusters = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(edgelist_to_clusters)
+
+
+def _random_edges(rng, n_nodes, n_edges, low=0):
+    source = rng.randint(low, n_nodes, size=n_edges)
+    target = rng.randint(low, n_nodes, size=n_edges)
+    return source, target
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_components_match_full_recompute(seed):
+    rng = np.random.RandomState(seed)
+    n_previous, n_nodes = 30, 45
+    previous_source, previous_target = _random_edges(rng, n_previous, 15)
+    new_source, new_target = _random_edges(rng, n_nodes, 12)
+
+    previous_labels, n_previous_clusters = edgelist_to_clusters.get_connected_components(
+        n_previous, previous_source, previous_target, in_graph=np.ones(n_previous, dtype=bool), node_order=np.arange(n_previous),
+    )
+    in_graph = np.ones(n_nodes, dtype=bool)
+    node_order = np.arange(n_nodes)
+    labels, n_clusters = edgelist_to_clusters.get_incremental_components(
+        n_nodes, previous_labels, n_previous_clusters, new_source, new_target, in_graph=in_graph, node_order=node_order,
+    )
+    expected_labels, expected_n_clusters = edgelist_to_clusters.get_connected_components(
+        n_nodes, np.concatenate([previous_source, new_source]), np.concatenate([previous_target, new_target]), in_graph=in_graph, node_order=node_order,
+    )
+    assert n_clusters == expected_n_clusters
+    np.testing.assert_array_equal(labels, expected_labels)
+
+
+def test_incremental_components_without_new_edges():
+    previous_labels = np.array([0, 0, 1, 2, 1])
+    labels, n_clusters = edgelist_to_clusters.get_incremental_components(
+        5, previous_labels, 3, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), in_graph=np.ones(5, dtype=bool), node_order=np.arange(5),
+    )
+    assert n_clusters == 3
+    np.testing.assert_array_equal(labels, previous_labels)
+
+
+def _write_edgelist(filepath, edges):
+    pd.DataFrame(edges).to_csv(filepath, sep="\t", header=None, index=None)
+    return str(filepath)
+
+
+def _run(*args):
+    subprocess.run([sys.executable, script_filepath, *map(str, args)], check=True, capture_output=True)
+
+
+def _read_partition(filepath):
+    node_to_cluster = pd.read_csv(filepath, sep="\t", header=None, index_col=0).iloc[:, 0]
+    return {frozenset(nodes) for nodes in node_to_cluster.groupby(node_to_cluster).groups.values()}
+
+
+@pytest.fixture
+def edgelists(tmp_path):
+    previous_edges = [("a", "b", 0.9), ("b", "c", 0.8), ("d", "e", 0.7), ("f", "f", 1.0)]
+    new_edges = [("c", "d", 0.95), ("g", "h", 0.6)]
+    return {
+        "previous":_write_edgelist(tmp_path / "previous.tsv", previous_edges),
+        "new":_write_edgelist(tmp_path / "new.tsv", new_edges),
+        "combined":_write_edgelist(tmp_path / "combined.tsv", previous_edges + new_edges),
+    }
+
+
+def test_incremental_update_matches_full_run(edgelists, tmp_path):
+    pytest.importorskip("nichespace.utils")
+    _run("-i", edgelists["previous"], "-o", tmp_path / "previous.clusters.tsv", "-e", tmp_path / "previous.npz")
+    _run("-i", edgelists["new"], "-o", tmp_path / "updated.clusters.tsv", "-u", tmp_path / "previous.npz")
+    _run("-i", edgelists["combined"], "-o", tmp_path / "combined.clusters.tsv")
+    assert _read_partition(tmp_path / "updated.clusters.tsv") == _read_partition(tmp_path / "combined.clusters.tsv")
+
+
+def test_incremental_update_with_empty_edgelist(edgelists, tmp_path):
+    pytest.importorskip("nichespace.utils")
+    empty = tmp_path / "empty.tsv"
+    empty.write_text("")
+    _run("-i", edgelists["previous"], "-o", tmp_path / "previous.clusters.tsv", "-e", tmp_path / "previous.npz")
+    _run("-i", empty, "-o", tmp_path / "updated.clusters.tsv", "-u", tmp_path / "previous.npz")
+    assert _read_partition(tmp_path / "updated.clusters.tsv") == _read_partition(tmp_path / "previous.clusters.tsv")
+
+
+def test_cluster_export(edgelists, tmp_path):
+    utils = pytest.importorskip("nichespace.utils")
+    _run("-i", edgelists["combined"], "-o", tmp_path / "clusters.tsv", "-e", tmp_path / "clusters.npz")
+    node_to_cluster = pd.read_csv(tmp_path / "clusters.tsv", sep="\t", header=None, index_col=0).iloc[:, 0]
+
+    with utils.read_cluster_export(str(tmp_path / "clusters.npz")) as clusters:
+        pd.testing.assert_series_equal(clusters.get_node_to_cluster().astype(object), node_to_cluster.astype(object), check_names=False, check_index_type=False)
+        assert clusters.number_of_nodes == 8
+        assert clusters.number_of_clusters == 3
+        id_cluster = node_to_cluster["a"]
+        assert set(clusters.get_cluster_members(id_cluster)) == {"a", "b", "c", "d", "e"}
+        assert clusters.to_dict()[id_cluster] == {"a", "b", "c", "d", "e"}
+        assert set(clusters.get_edge_attributes()) == set(clusters.edge_attributes_)
+        clusters.load(["labels"])
+
+    # Loaded arrays remain available after closing
+    assert clusters["labels"].size == 8
+    with pytest.raises(ValueError):
+        clusters["source"]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+manifold = pytest.importorskip("nichespace.manifold")
+
+
+@pytest.fixture(scope="module")
+def hns():
+    rng = np.random.RandomState(0)
+    n_observations, n_classes, n_features = 120, 30, 20
+    y1 = pd.Series([f"class_{i % n_classes}" for i in range(n_observations)], index=[f"observation_{i}" for i in range(n_observations)])
+    y2 = y1.map(lambda x: f"group_{int(x.split('_')[1]) % 3}")
+    X = pd.DataFrame(rng.randint(0, 3, size=(n_observations, n_features)), index=y1.index, columns=[f"feature_{j}" for j in range(n_features)])
+    model = manifold.HierarchicalNicheSpace(
+        kernel_distance_metric="euclidean",
+        n_neighbors=10,
+        n_components=3,
+        alpha=0.5,
+        minimum_nfeatures=0,
+        n_jobs=1,
+        verbose=0,
+    )
+    model.fit(X, y1, y2)
+    return model, X
+
+
+@pytest.mark.parametrize("transform_batch_size", [1, 7, 256])
+def test_batched_transform_matches_per_row(hns, transform_batch_size):
+    model, X = hns
+    X_query = X.iloc[:25].astype(float)
+    expected = np.vstack([model._process_row(model.model_, row) for row in X_query.values])
+
+    model.transform_batch_size = transform_batch_size
+    dmap = model._parallel_transform(X_query, model.model_)
+    np.testing.assert_allclose(dmap, expected)
+
+    X_transformed = model.transform(X_query)
+    assert X_transformed.shape[0] == X_query.shape[0]
+    assert list(X_transformed.index) == list(X_query.index)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+utils = pytest.importorskip("nichespace.utils")
+
+
+@pytest.fixture
+def grouping_data():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(
+        rng.randint(0, 4, size=(40, 12)) * (rng.rand(40, 12) < 0.4),
+        index=[f"genome_{i}" for i in range(40)],
+        columns=[f"feature_{j}" for j in range(12)],
+    ).astype(float)
+    y = pd.Series(rng.choice(["a", "b", "c", "d"], size=40), index=X.index)
+    return X, y
+
+
+def _to_dense(df):
+    return df.sparse.to_dense() if hasattr(df, "sparse") else df
+
+
+@pytest.mark.parametrize("method", ["sum", "mean", "max"])
+def test_fast_groupby_matches_pandas(grouping_data, method):
+    X, y = grouping_data
+    expected = getattr(X.groupby(y), method)()
+    for X_input in [X, X.astype(pd.SparseDtype(float, fill_value=0.0))]:
+        X_grouped = utils.fast_groupby(X_input, y, method=method)
+        pd.testing.assert_frame_equal(_to_dense(X_grouped).astype(float), expected, check_names=False)
+
+
+def test_fast_groupby_any(grouping_data):
+    X, y = grouping_data
+    expected = (X > 0).groupby(y).any()
+    X_grouped = utils.fast_groupby(X > 0, y, method="any")
+    pd.testing.assert_frame_equal(X_grouped, expected, check_names=False)
+
+
+def test_fast_groupby_sparse_fill_value_is_zero(grouping_data):
+    X, y = grouping_data
+    X_grouped = utils.fast_groupby(X.astype(pd.SparseDtype(float, fill_value=0.0)), y, method="mean")
+    assert all(dtype.fill_value == 0 for dtype in X_grouped.dtypes)
+    np.testing.assert_allclose(X_grouped.mean().values, X.groupby(y).mean().mean().values)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_cached_groupby_round_trip(grouping_data, tmp_path, sparse):
+    X, y = grouping_data
+    if sparse:
+        X = X.astype(pd.SparseDtype(float, fill_value=0.0))
+    miss = utils.cached_groupby(X, y, method="sum", cache_directory=str(tmp_path))
+    hit = utils.cached_groupby(X, y, method="sum", cache_directory=str(tmp_path))
+    assert list(miss.dtypes) == list(hit.dtypes)
+    assert list(miss.index) == list(hit.index)
+    assert list(miss.columns) == list(hit.columns)
+    pd.testing.assert_frame_equal(_to_dense(hit), _to_dense(miss), check_names=False)
+
+
+def test_cached_groupby_separates_dense_and_sparse(grouping_data, tmp_path):
+    X, y = grouping_data
+    utils.cached_groupby(X, y, method="sum", cache_directory=str(tmp_path))
+    X_grouped = utils.cached_groupby(X.astype(pd.SparseDtype(float, fill_value=0.0)), y, method="sum", cache_directory=str(tmp_path))
+    assert hasattr(X_grouped, "sparse")
+
+
+@pytest.mark.parametrize("method, function", [("mean", lambda a, b: (a + b) / 2), ("maximum", np.maximum), ("minimum", np.minimum)])
+def test_symmetrize_inplace(method, function):
+    rng = np.random.RandomState(0)
+    values = rng.rand(7, 7)
+    expected = function(values, values.T)
+    output = utils.symmetrize_inplace(values, method=method, block_size=3)
+    assert output is values
+    np.testing.assert_allclose(values, expected)
+    assert utils.is_square_symmetric(values, raise_exception=False)
+
+
+def test_symmetrize_inplace_memmap(tmp_path):
+    rng = np.random.RandomState(0)
+    values = np.lib.format.open_memmap(str(tmp_path / "distances.npy"), mode="w+", dtype=float, shape=(9, 9))
+    values[:] = rng.rand(9, 9)
+    expected = (values + values.T) / 2
+    utils.symmetrize_inplace(values, method="mean", block_size=4)
+    np.testing.assert_allclose(values, expected)
+
+
+def test_symmetrize_inplace_rejects_copies():
+    rng = np.random.RandomState(0)
+    values = rng.rand(4, 4)
+    df = pd.concat([pd.DataFrame(values[:, :2]), pd.DataFrame(values[:, 2:].astype(np.float32), columns=[2, 3])], axis=1)
+    with pytest.raises(ValueError):
+        utils.symmetrize_inplace(df)
+    with pytest.raises(ValueError):
+        utils.symmetrize_inplace(rng.rand(3, 4))
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 2048])
+def test_silhouette_score_precomputed(block_size):
+    metrics = pytest.importorskip("sklearn.metrics")
+    from scipy.spatial.distance import pdist, squareform
+
+    rng = np.random.RandomState(0)
+    distance_matrix = squareform(pdist(rng.rand(30, 4)))
+    index = np.sort(rng.choice(30, size=20, replace=False))
+    labels = rng.choice(["a", "b", "c"], size=20)
+    expected = metrics.silhouette_score(distance_matrix[index][:, index], labels, metric="precomputed")
+    score = utils.silhouette_score_precomputed(distance_matrix, labels, index=index, block_size=block_size)
+    assert score == pytest.approx(expected)